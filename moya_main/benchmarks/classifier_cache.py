@@ -0,0 +1,105 @@
+"""
+Benchmark of CachedAgent in front of an LLMClassifier, against a local stub
+Ollama server.
+
+The classifier agent uses default settings, as most deployments do, and
+routes ``--messages`` user messages drawn from ``--distinct`` different
+ones. Reports the time per classification and the cache statistics with
+and without CachedAgent, and checks that the cached run answers repeats
+from the cache.
+
+    python -m benchmarks.classifier_cache --messages 500 --distinct 20 --latency 20
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from moya.agents.agent_info import AgentInfo
+from moya.agents.base_agent import AgentConfig
+from moya.agents.cached_agent import CachedAgent
+from moya.agents.ollama_agent import OllamaAgent
+from moya.classifiers.llm_classifier import LLMClassifier
+
+
+AGENTS = [
+    AgentInfo(name="rules_agent", description="Answers questions about the game rules", type="OllamaAgent"),
+    AgentInfo(name="narrator_agent", description="Narrates the story", type="OllamaAgent"),
+]
+
+
+def make_handler(latency):
+    class StubOllamaHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Buffer each response so headers and body go out in one write
+        wbufsize = 64 * 1024
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self._send_json({"models": []})
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(latency)
+            answer = "rules_agent" if "rule" in request["prompt"].split("User message:")[-1] else "narrator_agent"
+            self._send_json({"response": answer, "done": True})
+
+    return StubOllamaHandler
+
+
+def run(name, classifier, messages):
+    start = time.perf_counter()
+    for message in messages:
+        classifier.classify(message, available_agents=AGENTS)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<10} {elapsed / len(messages) * 1000:>8.2f} ms/classification   {elapsed:>6.2f} s total")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--distinct", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=20.0, help="stub latency per request in ms")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency / 1000.0))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # Default settings: llm_config only names the server and model
+    agent = OllamaAgent(AgentConfig(
+        agent_name="classifier",
+        agent_type="OllamaAgent",
+        description="Routes messages to agents",
+        llm_config={"base_url": f"http://127.0.0.1:{server.server_port}", "model_name": "stub"}
+    ))
+    rng = random.Random(7)
+    pool = [f"What does rule {i} say?" if i % 2 else f"The party opens door {i}" for i in range(args.distinct)]
+    messages = [rng.choice(pool) for _ in range(args.messages)]
+
+    run("uncached", LLMClassifier(agent, default_agent="narrator_agent"), messages)
+
+    cached = CachedAgent(agent)
+    run("cached", LLMClassifier(cached, default_agent="narrator_agent"), messages)
+    print(f"cache      {cached.stats.to_dict()}")
+    assert cached.stats.bypasses == 0
+    assert cached.stats.hits == args.messages - len(set(messages))
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
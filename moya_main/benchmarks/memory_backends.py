@@ -0,0 +1,76 @@
+"""
+Benchmark comparing the file system and SQLite memory repositories.
+
+Writes ``--threads`` threads of ``--messages`` messages each, interleaving
+appends across threads the way concurrent games do, then times tail reads
+and full thread loads.
+
+    python -m benchmarks.memory_backends --threads 10000 --messages 500
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from moya.conversation.message import Message
+from moya.memory.file_system_repo import FileSystemRepository
+from moya.memory.sqlite_repository import SQLiteMemoryRepository
+
+
+def run(name, repo, thread_ids, messages, reads):
+    start = time.perf_counter()
+    for i in range(messages):
+        for thread_id in thread_ids:
+            repo.append_message(thread_id, Message(
+                thread_id=thread_id,
+                sender="user" if i % 2 == 0 else "narrator",
+                content=f"Turn {i}: the party moves deeper into the dungeon."
+            ))
+    if hasattr(repo, "flush"):
+        repo.flush()
+    write_time = time.perf_counter() - start
+
+    sample = random.Random(0).choices(thread_ids, k=reads)
+    start = time.perf_counter()
+    for thread_id in sample:
+        repo.get_last_n_messages(thread_id, 10)
+    tail_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for thread_id in sample[:max(1, reads // 10)]:
+        repo.get_thread(thread_id)
+    load_time = time.perf_counter() - start
+
+    total = len(thread_ids) * messages
+    print(
+        f"{name:<12} append: {total / write_time:>10,.0f} msg/s   "
+        f"tail(10): {tail_time / reads * 1e6:>8.1f} us   "
+        f"get_thread: {load_time / max(1, reads // 10) * 1e3:>8.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=10000)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--reads", type=int, default=1000)
+    args = parser.parse_args()
+
+    thread_ids = [f"game-{i}" for i in range(args.threads)]
+    workdir = tempfile.mkdtemp(prefix="moya-bench-")
+    try:
+        run("filesystem", FileSystemRepository(os.path.join(workdir, "fs")),
+            thread_ids, args.messages, args.reads)
+
+        sqlite_repo = SQLiteMemoryRepository(os.path.join(workdir, "memory.db"))
+        run("sqlite", sqlite_repo, thread_ids, args.messages, args.reads)
+        sqlite_repo.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
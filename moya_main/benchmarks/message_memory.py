@@ -0,0 +1,61 @@
+"""
+Benchmark of resident memory per Message.
+
+Compares the slotted Message (integer timestamp, lazy metadata) with the
+previous dict-backed layout (per-instance __dict__, datetime timestamp and
+an always-allocated metadata dict), and reports the cost per 1M messages.
+
+    python -m benchmarks.message_memory --messages 1000000
+"""
+
+import argparse
+import gc
+import tracemalloc
+from datetime import datetime
+
+from moya.conversation.message import Message, FrozenMessage
+
+
+class DictMessage:
+    """The pre-slots Message layout, kept here only as a baseline."""
+
+    def __init__(self, thread_id, sender, content, message_id=None, timestamp=None, metadata=None):
+        self.message_id = message_id
+        self.thread_id = thread_id
+        self.sender = sender
+        self.content = content
+        self.timestamp = timestamp or datetime.utcnow()
+        self.metadata = metadata or {}
+
+
+def measure(cls, count, contents):
+    gc.collect()
+    tracemalloc.start()
+    messages = [cls("game-1", "narrator", contents[i % len(contents)]) for i in range(count)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del messages
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    # Shared content strings so the numbers reflect per-message overhead only
+    contents = [f"The dragon stirs in chamber {i}." for i in range(100)]
+    scale = 1_000_000 / args.messages
+
+    baseline = measure(DictMessage, args.messages, contents)
+    for name, cls in (("dict (old)", DictMessage), ("slotted", Message), ("frozen", FrozenMessage)):
+        used = baseline if cls is DictMessage else measure(cls, args.messages, contents)
+        print(
+            f"{name:<12} {used / args.messages:>7.1f} B/msg   "
+            f"{used * scale / 2 ** 20:>8.1f} MiB per 1M   "
+            f"saves {(baseline - used) * scale / 2 ** 20:>7.1f} MiB per 1M"
+        )
+
+
+if __name__ == "__main__":
+    main()
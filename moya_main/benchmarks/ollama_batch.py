@@ -0,0 +1,101 @@
+"""
+Benchmark of OllamaAgent batching against a local stub Ollama server.
+
+The stub answers /api/generate after ``--latency`` milliseconds, standing in
+for a server running several requests in parallel (OLLAMA_NUM_PARALLEL).
+Compares one request at a time with handle_messages_batch() and its async
+variant.
+
+    python -m benchmarks.ollama_batch --prompts 500 --latency 20 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from moya.agents.base_agent import AgentConfig
+from moya.agents.ollama_agent import OllamaAgent
+
+
+def make_handler(latency):
+    class StubOllamaHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Buffer each response so headers and body go out in one write
+        wbufsize = 64 * 1024
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self._send_json({"models": []})
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(latency)
+            self._send_json({"response": f"summary of {request['prompt']}", "done": True})
+
+    return StubOllamaHandler
+
+
+def report(name, prompts, elapsed):
+    print(f"{name:<14} {prompts / elapsed:>10,.1f} prompts/s   {elapsed:>7.2f} s total")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--prompts", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=20.0, help="stub latency per request in ms")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency / 1000.0))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    agent = OllamaAgent(AgentConfig(
+        agent_name="bench",
+        agent_type="OllamaAgent",
+        description="Batching benchmark agent",
+        llm_config={
+            "base_url": f"http://127.0.0.1:{server.server_port}",
+            "model_name": "stub",
+            "batch_concurrency": args.concurrency,
+        }
+    ))
+    prompts = [f"Summarize game thread {i:06d}" for i in range(args.prompts)]
+    # Warm up the health check and a pooled connection
+    agent.handle_message(prompts[0])
+
+    sequential = prompts[:max(1, args.prompts // 10)]
+    start = time.perf_counter()
+    for prompt in sequential:
+        agent.handle_message(prompt)
+    report("sequential", len(sequential), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    results = agent.handle_messages_batch(prompts)
+    report("batch", len(prompts), time.perf_counter() - start)
+    assert all(prompt in result for prompt, result in zip(prompts, results))
+
+    async def run_async():
+        start = time.perf_counter()
+        await agent.handle_messages_batch_async(prompts)
+        report("batch (async)", len(prompts), time.perf_counter() - start)
+
+    asyncio.run(run_async())
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
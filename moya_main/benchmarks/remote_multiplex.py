@@ -0,0 +1,97 @@
+"""
+Benchmark of RemoteAgent transports against the local echo agent server.
+
+Runs ``--threads`` game threads, each sending ``--requests`` messages and
+streaming the reply, once over HTTP and once over the multiplexed WebSocket
+transport, and reports throughput and the peak number of open sockets to
+the server.
+
+    python -m benchmarks.remote_multiplex --threads 200 --requests 5 --delay 0.005
+"""
+
+import argparse
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import uvicorn
+
+from examples.echo_agent_server import create_echo_app
+from moya.agents.remote_agent import RemoteAgent, RemoteAgentConfig
+
+
+def open_sockets(port):
+    """Count established TCP connections to the server port (Linux only)."""
+    try:
+        with open("/proc/net/tcp") as f:
+            rows = f.read().splitlines()[1:]
+    except OSError:
+        return -1
+    suffix = f":{port:04X}"
+    return sum(1 for row in rows if row.split()[2].endswith(suffix) and row.split()[3] == "01")
+
+
+def run(agent, threads, requests, port):
+    peak = 0
+    stop = threading.Event()
+
+    def sample():
+        nonlocal peak
+        while not stop.is_set():
+            peak = max(peak, open_sockets(port))
+            time.sleep(0.01)
+
+    def game_thread(i):
+        for j in range(requests):
+            message = f"thread {i} turn {j} the party rests"
+            assert "".join(agent.handle_message_stream(message)) == message + " "
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        list(executor.map(game_thread, range(threads)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    sampler.join()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5)
+    parser.add_argument("--delay", type=float, default=0.005, help="echo server delay per streamed word")
+    args = parser.parse_args()
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(
+        create_echo_app(args.delay), host="127.0.0.1", port=port, log_level="warning", backlog=4096
+    ))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    total = args.threads * args.requests
+    for transport in ("http", "websocket"):
+        agent = RemoteAgent(RemoteAgentConfig(
+            agent_name="bench",
+            agent_type="RemoteAgent",
+            description="Transport benchmark agent",
+            base_url=f"http://127.0.0.1:{port}",
+            transport=transport
+        ))
+        # requests.Session keeps at most 10 idle connections per host
+        agent.session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=args.threads))
+        elapsed, peak = run(agent, args.threads, args.requests, port)
+        print(f"{transport:<10} {total / elapsed:>8,.1f} streams/s   {elapsed:>6.2f} s   peak sockets {peak}")
+
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
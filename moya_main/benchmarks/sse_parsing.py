@@ -0,0 +1,108 @@
+"""
+Microbenchmark of RemoteAgent stream parsing on a ~1 MB event stream.
+
+Compares the previous line-based parsing, which re-split and rejoined the
+words of every data line, with moya.utils.sse.SSEDecoder fed raw network
+chunks. No server is involved; the stream is built in memory in the format
+examples/remote_agent_server.py sends.
+
+    python -m benchmarks.sse_parsing --size 1048576 --chunk-size 4096 --repeat 5
+"""
+
+import argparse
+import time
+
+from moya.utils.sse import SSEDecoder
+
+
+WORDS = ("The", "party", "enters", "the", "ruined", "keep,", "torches", "raised", "-", "ready.")
+
+
+def build_stream(size):
+    """Return (stream text, expected text) of at least ``size`` bytes."""
+    events, texts, total, i = [], [], 0, 0
+    while total < size:
+        text = " ".join(WORDS[(i + j) % len(WORDS)] for j in range(3)) + " "
+        event = f"data: {text}\n\n"
+        events.append(event)
+        texts.append(text)
+        total += len(event)
+        i += 1
+    return "".join(events), "".join(texts)
+
+
+def chunked(stream, chunk_size):
+    return [stream[i:i + chunk_size] for i in range(0, len(stream), chunk_size)]
+
+
+def legacy_parse(chunks):
+    """The parsing RemoteAgent.handle_message_stream used before SSEDecoder."""
+    # requests.iter_lines: re-split buffered chunks into lines
+    pending = None
+    lines = []
+    for chunk in chunks:
+        if pending is not None:
+            chunk = pending + chunk
+        split = chunk.splitlines()
+        pending = split.pop() if split and split[-1] and chunk[-1] == split[-1][-1] else None
+        lines.extend(split)
+    if pending is not None:
+        lines.append(pending)
+
+    out = []
+    for line in lines:
+        if line and line.startswith("data:"):
+            content = line[5:].strip()
+            if content and content != "done":
+                words = []
+                for word in content.replace('\u00A0', ' ').split(' '):
+                    if word:
+                        if any(c.isalnum() for c in word):
+                            words.append(word)
+                        elif words:
+                            words[-1] = words[-1] + word
+                        else:
+                            words.append(word)
+                if words:
+                    out.append(' '.join(words) + ' ')
+    return out
+
+
+def decoder_parse(chunks):
+    decoder = SSEDecoder()
+    out = []
+    for chunk in chunks:
+        for event in decoder.feed(chunk):
+            out.append(event.data)
+    return out
+
+
+def best_of(fn, chunks, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(chunks)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=1024 * 1024, help="stream size in bytes")
+    parser.add_argument("--chunk-size", type=int, default=4096, help="bytes per network read")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    stream, expected = build_stream(args.size)
+    chunks = chunked(stream, args.chunk_size)
+    megabytes = len(stream) / (1024 * 1024)
+
+    for name, fn in (("line + rejoin", legacy_parse), ("SSEDecoder", decoder_parse)):
+        elapsed, result = best_of(fn, chunks, args.repeat)
+        print(f"{name:<14} {megabytes / elapsed:>8,.1f} MB/s   {elapsed * 1000:>8.1f} ms")
+        if fn is decoder_parse:
+            assert "".join(result) == expected
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark of RemoteAgent wire formats for a request carrying a 50-turn context.
+
+Reports the bytes on the wire and the time to encode and decode the body, as
+RemoteAgent and the agent server do, for JSON and msgpack, with and without
+zstd compression.
+
+    python -m benchmarks.wire_format --turns 50 --repeat 2000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from moya.utils.wire_format import JSON, MSGPACK, ZSTD, decode_body, encode_body
+
+
+WORDS = (
+    "the", "party", "enters", "ruined", "keep", "torches", "raised", "goblin", "ambush",
+    "roll", "initiative", "dragon", "treasure", "spell", "slot", "healing", "potion", "tavern",
+    "quest", "giver", "sword", "shield", "armor", "class", "saving", "throw", "dexterity"
+)
+
+
+def build_request(turns, seed=7):
+    """A request body like RemoteAgent sends, with the thread's recent turns as context."""
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, 20, 0)
+    context = []
+    for i in range(turns):
+        context.append({
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 120))) + ".",
+            "timestamp": (start + timedelta(seconds=30 * i)).isoformat(),
+            "metadata": {"turn": i, "tokens": rng.randint(20, 400)}
+        })
+    return {
+        "message": "The rogue checks the chest for traps before opening it.",
+        "thread_id": "campaign-042",
+        "context": context
+    }
+
+
+def measure(body, content_type, compression, repeat):
+    data, headers = encode_body(body, content_type, compression, threshold=0)
+    assert decode_body(data, headers["Content-Type"], headers.get("Content-Encoding")) == body
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        encode_body(body, content_type, compression, threshold=0)
+    encode_time = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        decode_body(data, headers["Content-Type"], headers.get("Content-Encoding"))
+    decode_time = (time.perf_counter() - start) / repeat
+    return len(data), encode_time, decode_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    body = build_request(args.turns)
+    baseline = None
+    print(f"{'format':<16} {'bytes':>8} {'ratio':>7} {'encode':>10} {'decode':>10}")
+    for name, content_type, compression in (
+        ("json", JSON, None),
+        ("msgpack", MSGPACK, None),
+        ("json+zstd", JSON, ZSTD),
+        ("msgpack+zstd", MSGPACK, ZSTD),
+    ):
+        size, encode_time, decode_time = measure(body, content_type, compression, args.repeat)
+        baseline = baseline or size
+        print(
+            f"{name:<16} {size:>8,} {size / baseline:>7.2f} "
+            f"{encode_time * 1e6:>8.1f}us {decode_time * 1e6:>8.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,70 @@
+from collections import deque
+
+# Rough characters-per-token ratio used to budget prompt context without a tokenizer.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
 class MemoryAgent:
-    def __init__(self):
+    def __init__(self, capacity: int = 200, context_tokens: int = 1500):
+        # Each thread keeps at most `capacity` entries; older ones fall off the ring buffer.
+        self.capacity = capacity
+        self.context_tokens = context_tokens
+        # thread -> deque of (message, token_count)
         self.memory_store = {}
+        # thread -> {max_tokens: joined context}, dropped on every write to the thread
+        self._context_cache = {}
 
     def store_memory(self, thread: str, message: str):
-        if thread not in self.memory_store:
-            self.memory_store[thread] = []
-        self.memory_store[thread].append(message)
+        entries = self.memory_store.get(thread)
+        if entries is None:
+            entries = self.memory_store[thread] = deque(maxlen=self.capacity)
+        entries.append((message, estimate_tokens(message)))
+        self._context_cache.pop(thread, None)
+
+    def clear_memory(self, thread: str):
+        self.memory_store.pop(thread, None)
+        self._context_cache.pop(thread, None)
 
     def get_memory(self, thread: str, limit: int = 10):
-        return self.memory_store.get(thread, [])[-limit:]
+        entries = self.memory_store.get(thread, ())
+        recent = []
+        for message, _ in reversed(entries):
+            if len(recent) >= limit:
+                break
+            recent.append(message)
+        recent.reverse()
+        return recent
 
-    def summarize_memory(self, thread: str) -> str:
-        messages = self.memory_store.get(thread, [])
-        if not messages:
+    def get_context(self, thread: str, max_tokens: int) -> str:
+        """
+        Return as much of the most recent memory as fits in max_tokens, oldest first.
+        Only the entries that end up in the result are visited, and the joined
+        string is cached until the thread is written to again.
+        """
+        if max_tokens <= 0:
             return ""
-        summary = "\n".join(messages[-5:])
-        return summary
+        cached = self._context_cache.setdefault(thread, {})
+        if max_tokens in cached:
+            return cached[max_tokens]
+
+        selected = []
+        used = 0
+        for message, tokens in reversed(self.memory_store.get(thread, ())):
+            if used + tokens > max_tokens:
+                if not selected:
+                    # The newest entry alone is too long; keep its most recent part.
+                    selected.append(message[-max_tokens * CHARS_PER_TOKEN:])
+                break
+            selected.append(message)
+            used += tokens
+        selected.reverse()
+
+        context = cached[max_tokens] = "\n".join(selected)
+        return context
+
+    def summarize_memory(self, thread: str, max_tokens: int = None) -> str:
+        return self.get_context(thread, max_tokens or self.context_tokens)
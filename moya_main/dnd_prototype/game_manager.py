@@ -1,15 +1,38 @@
+import logging
+import time
+from collections import deque
+
 from agents.narrator_agent import NarratorAgent
 from agents.memory_agent import MemoryAgent
 
 
 # game_manager.py
 
+logger = logging.getLogger(__name__)
+
+# Instructions opening the prompt for each turn: process_move() uses the first
+# (the Streamlit app), run_game() the Dungeon Master variant (the CLI game).
+MOVE_INSTRUCTIONS = (
+    "Continue the story by integrating the current narrative and the player's move. "
+    "Keep the narrative coherent and evolving."
+)
+DM_MOVE_INSTRUCTIONS = (
+    "You are a Dungeon Master guiding an epic tabletop role-playing game. "
+    "Continue the story by integrating the current narrative with the player's move. "
+    "Make the narrative engaging, coherent, and evolve the plot accordingly."
+)
+
+
 class GameManager:
     def __init__(self):
         self.memory_agent = MemoryAgent()
-        self.dm_agent = NarratorAgent(memory_agent=self.memory_agent)
+        # The game manager is the only writer of the narrative thread, so the
+        # narrator is not given the memory agent (it would store every reply again).
+        self.dm_agent = NarratorAgent()
         self.game_details = {}
         self.players = {}
+        # Per-turn latency breakdown in seconds, most recent last.
+        self.turn_timings = deque(maxlen=100)
 
     def game_setup_initial(self, setting: str, player1: str, player2: str) -> str:
         # Save game details and player sketches.
@@ -28,66 +51,72 @@ class GameManager:
             f"Player 2 Sketch: {player2}\n\n"
             "Initial Narrative:"
         )
-        
+
         # Generate and store the initial narrative only once.
         initial_narrative = self.dm_agent.handle_message(init_prompt, {"narrative": ""})
         # Clear any previous narrative before storing.
-        self.memory_agent.memory_store["narrative"] = [initial_narrative]
+        self.memory_agent.clear_memory("narrative")
+        self.memory_agent.store_memory("narrative", initial_narrative)
         return initial_narrative
 
-    def process_move(self, move: str) -> str:
-        # Build a prompt for updating the narrative based on the move.
+    def process_move(self, move: str, player: str = "Player", instructions: str = MOVE_INSTRUCTIONS) -> str:
+        start = time.perf_counter()
+
+        # Build the context and prompt once for this turn.
         current_narrative = self.memory_agent.summarize_memory("narrative")
         update_prompt = (
-            "Continue the story by integrating the current narrative and the player's move. "
-            "Keep the narrative coherent and evolving.\n\n"
+            f"{instructions}\n\n"
             f"Current Narrative:\n{current_narrative}\n\n"
-            f"Player's Move: {move}\n\n"
+            f"{player}'s Move: {move}\n\n"
             "Updated Narrative:"
         )
+        prompt_built = time.perf_counter()
+
         updated_narrative = self.dm_agent.handle_message(update_prompt, {"narrative": current_narrative})
-        # Instead of appending the whole narrative again, update with the new part only:
+        llm_done = time.perf_counter()
+
+        # Single memory write per turn: store only the new part of the narrative.
         self.memory_agent.store_memory("narrative", updated_narrative)
+        stored = time.perf_counter()
+
+        timings = {
+            "prompt_build": prompt_built - start,
+            "llm_call": llm_done - prompt_built,
+            "memory_write": stored - llm_done,
+            "total": stored - start,
+        }
+        self.turn_timings.append(timings)
+        logger.info(
+            "Turn timings: prompt build %.1f ms, LLM call %.1f ms, memory write %.1f ms, total %.1f ms",
+            *(timings[key] * 1000 for key in ("prompt_build", "llm_call", "memory_write", "total"))
+        )
         return updated_narrative
 
     def run_game(self):
         print("The game is now starting!\n")
-        
+
         # Show the initial narrative.
         current_narrative = self.memory_agent.summarize_memory("narrative")
         print("Dungeon Master (DM) sets the scene:")
         print(current_narrative)
         print("\n")
-        
+
         turn = 1
         while True:
             # Alternate turns between Player 1 and Player 2.
             current_player = "Player 1" if turn % 2 == 1 else "Player 2"
-            
+
             print(f"{current_player}, it's your move!")
             player_move = input("Enter your move (or type 'exit' to end the game): ")
             if player_move.lower() == "exit":
                 print("Exiting game. Thank you for playing!")
                 break
-            
-            # Build a prompt for the DM to update the narrative based on the player's move.
-            update_prompt = (
-                "You are a Dungeon Master guiding an epic tabletop role-playing game. "
-                "Continue the story by integrating the current narrative with the player's move. "
-                "Make the narrative engaging, coherent, and evolve the plot accordingly.\n\n"
-                f"Current Narrative:\n{self.memory_agent.summarize_memory('narrative')}\n\n"
-                f"{current_player}'s Move: {player_move}\n\n"
-                "Updated Narrative:"
-            )
-            
-            # Generate the updated narrative.
-            updated_narrative = self.dm_agent.handle_message(update_prompt, {"narrative": self.memory_agent.summarize_memory("narrative")})
-            
-            # Save the updated narrative.
-            self.memory_agent.store_memory("narrative", updated_narrative)
-            
+
+            # Generate and save the updated narrative.
+            updated_narrative = self.process_move(player_move, current_player, DM_MOVE_INSTRUCTIONS)
+
             print("\n--- Updated Narrative ---\n")
             print(updated_narrative)
             print("\n-------------------------\n")
-            
+
             turn += 1
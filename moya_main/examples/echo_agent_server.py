@@ -0,0 +1,62 @@
+"""
+A local agent server that echoes every message back, for testing RemoteAgent
+and its transports without an LLM or API key.
+
+    python -m examples.echo_agent_server --port 8000
+
+Streamed responses are sent one word at a time, ``--delay`` seconds apart.
+Connect with a RemoteAgent using transport="http" or transport="websocket".
+"""
+
+import argparse
+import asyncio
+import uvicorn
+from typing import AsyncIterator, Iterator
+
+from moya.agents.base_agent import Agent, AgentConfig
+from moya.server.agent_server import AgentServerConfig, create_app
+
+
+class EchoAgent(Agent):
+    """An agent whose response is the message it was sent."""
+
+    def __init__(self, config: AgentConfig, delay: float = 0.0):
+        super().__init__(config=config)
+        self.delay = delay
+
+    def handle_message(self, message: str, **kwargs) -> str:
+        return message
+
+    def handle_message_stream(self, message: str, **kwargs) -> Iterator[str]:
+        for word in message.split(" "):
+            yield word + " "
+
+    async def handle_message_async(self, message: str, **kwargs) -> str:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return message
+
+    async def handle_message_stream_async(self, message: str, **kwargs) -> AsyncIterator[str]:
+        for word in message.split(" "):
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            yield word + " "
+
+
+def create_echo_app(delay: float = 0.0, max_concurrency: int = 1024):
+    """Create the echo server application."""
+    agent = EchoAgent(AgentConfig(
+        agent_name="echo_agent",
+        agent_type="EchoAgent",
+        description="Echoes every message back"
+    ), delay=delay)
+    return create_app(agent, AgentServerConfig(max_concurrency=max_concurrency, store_messages=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local echo agent server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds per response or streamed word")
+    args = parser.parse_args()
+    uvicorn.run(create_echo_app(args.delay), host=args.host, port=args.port)
@@ -19,19 +19,18 @@ def setup_agent():
 
     # Create Bedrock agent with memory capabilities
     agent_config = BedrockAgentConfig(
+        agent_name="bedrock_chat",
+        agent_type="BedrockAgent",
+        description="An interactive chat agent with memory using AWS Bedrock",
         system_prompt="You are a helpful AI assistant with memory capabilities.",
+        tool_registry=tool_registry,
         model_id="anthropic.claude-v2",
         region="us-east-1",
         temperature=0.7,
         max_tokens_to_sample=2000
     )
 
-    agent = BedrockAgent(
-        agent_name="bedrock_chat",
-        description="An interactive chat agent with memory using AWS Bedrock",
-        agent_config=agent_config,
-        tool_registry=tool_registry
-    )
+    agent = BedrockAgent(agent_config)
     agent.setup()
 
     # Set up registry and orchestrator
@@ -89,8 +89,7 @@ def main():
         session_memory.append_message(thread_id, Message(thread_id=thread_id, sender="user",content=user_input))
 
         # Get conversation context
-        thread = session_memory.get_thread(thread_id)
-        previous_messages = thread.get_last_n_messages(n=5)
+        previous_messages = session_memory.get_last_n_messages(thread_id, n=5)
 
         if previous_messages:
             context = format_conversation_context(previous_messages)
@@ -0,0 +1,105 @@
+"""
+AgentWrapper for Moya.
+
+Base class for agents that wrap another agent to add behaviour around its
+calls (caching, request coalescing, ...) while looking like the wrapped
+agent to registries, classifiers and orchestrators.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Iterable, Optional
+from moya.agents.base_agent import Agent
+
+
+class AgentWrapper(Agent):
+    """
+    An agent that delegates to a wrapped agent. Attributes not defined on
+    the wrapper (agent_name, description, llm_config, ...) are read from
+    the wrapped agent, and setting system_prompt updates the wrapped agent.
+    Wrappers can be stacked.
+    """
+
+    def __init__(self, agent: Agent, ignored_kwargs: Iterable[str] = ("thread_id",)):
+        """
+        :param agent: The agent being wrapped.
+        :param ignored_kwargs: handle_message keyword arguments left out of
+                               request keys. thread_id is ignored by default so
+                               identical prompts from different threads match.
+        """
+        # The wrapped agent owns all configuration, so Agent.__init__ is not called.
+        self.agent = agent
+        self.ignored_kwargs = frozenset(ignored_kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not found on the wrapper itself
+        if name == "agent":
+            raise AttributeError(name)
+        return getattr(self.agent, name)
+
+    @property
+    def system_prompt(self) -> str:
+        return self.agent.system_prompt
+
+    @system_prompt.setter
+    def system_prompt(self, value: str) -> None:
+        self.agent.system_prompt = value
+
+    @property
+    def rate_limiter(self):
+        return self.agent.rate_limiter
+
+    def setup(self) -> None:
+        setup = getattr(self.agent, "setup", None)
+        if setup is not None:
+            setup()
+
+    @staticmethod
+    def normalize_message(message: str) -> str:
+        """
+        Normalize a prompt for use in a request key: unify line endings and
+        drop leading/trailing blank space and trailing spaces on each line.
+        """
+        return "\n".join(line.rstrip() for line in message.strip().splitlines())
+
+    def sampling_temperature(self, **kwargs) -> Optional[float]:
+        return self.agent.sampling_temperature(**kwargs)
+
+    def temperature(self, **kwargs) -> Optional[float]:
+        """
+        Return the sampling temperature the wrapped agent sends with this
+        request, or None if it sends none (see Agent.sampling_temperature()).
+        """
+        return self.agent.sampling_temperature(**kwargs)
+
+    def request_key(self, message: str, **kwargs) -> str:
+        """
+        Build a key identifying a request from the model, system prompt,
+        normalized message, LLM parameters and the remaining kwargs.
+        """
+        llm_config = getattr(self.agent, "llm_config", None) or {}
+        model = (
+            getattr(self.agent, "model_name", None)
+            or getattr(self.agent, "model_id", None)
+            or llm_config.get("model_name")
+        )
+        request: Dict[str, Any] = {
+            "agent_type": getattr(self.agent, "agent_type", None),
+            "model": model,
+            "system_prompt": self.normalize_message(self.agent.system_prompt or ""),
+            "message": self.normalize_message(message),
+            "params": llm_config,
+            "temperature": self.temperature(**kwargs),
+            "kwargs": {k: v for k, v in kwargs.items() if k not in self.ignored_kwargs},
+        }
+        encoded = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+        return "v2:" + hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _as_chunks(stream):
+        # Some agents return the whole response instead of a generator
+        if stream is None:
+            return []
+        if isinstance(stream, str):
+            return [stream]
+        return stream
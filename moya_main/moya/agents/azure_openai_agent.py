@@ -7,11 +7,12 @@ to generate responses, pulling API key from the environment.
 
 
 import os
-from openai import AzureOpenAI
+from openai import AsyncAzureOpenAI, AzureOpenAI
 from dataclasses import dataclass
 
 from typing import Any, Dict, List, Optional
 from moya.agents.openai_agent import OpenAIAgent, OpenAIAgentConfig
+from moya.utils.constants import LLMProviders
 
 
 @dataclass
@@ -52,3 +53,16 @@ class AzureOpenAIAgent(OpenAIAgent):
                                   azure_endpoint=api_base, 
                                   api_version=api_version,
                                   organization=config.organization)
+        self.api_base = api_base
+        self.api_version = api_version
+        self.organization = config.organization
+
+    def rate_limit_key(self):
+        # Azure quotas apply per deployment, which the model name selects
+        return (LLMProviders.AZURE_OPENAI, self.model_name, self.api_base)
+
+    def _create_async_client(self):
+        return AsyncAzureOpenAI(api_key=self.api_key,
+                                azure_endpoint=self.api_base,
+                                api_version=self.api_version,
+                                organization=self.organization)
@@ -9,6 +9,9 @@ Agents can:
 - Expose an 'agent_type' to facilitate registry logic,
 - Initialize themselves with 'setup()',
 - Handle incoming messages via 'handle_message()',
+- Handle messages from asyncio code via 'handle_message_async()' and
+  'handle_message_stream_async()',
+- Share a client-side rate limiter per provider deployment ('rate_limiter'),
 - Dynamically call external tools via 'call_tool()',
 - Discover available tools via 'discover_tools()',
 - Optionally retrieve conversation memory (summary, last n messages)
@@ -17,11 +20,15 @@ Agents can:
 
 
 import abc
-from typing import Any, Dict, List, Optional
+import asyncio
+import functools
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from moya.tools.base_tool import BaseTool
 from moya.tools.tool_registry import ToolRegistry
 from moya.memory.base_repository import BaseMemoryRepository
+from moya.utils.rate_limiter import RateLimiter, get_rate_limiter, rate_limiter_settings
 @dataclass
 class AgentConfig:
     """
@@ -126,6 +133,105 @@ class Agent(abc.ABC):
         """
         raise NotImplementedError("Subclasses must implement handle_message_stream().")
 
+    async def handle_message_async(self, message: str, **kwargs) -> str:
+        """
+        Coroutine variant of handle_message().
+
+        The default implementation runs handle_message() in the event loop's
+        default executor so that blocking agents do not stall the loop.
+        Agents with a native async client should override it.
+
+        :param message: The user or system prompt to be handled.
+        :param kwargs: Additional context or parameters, as for handle_message().
+        :return: The agent's response as a string.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.handle_message, message, **kwargs)
+        )
+
+    async def handle_message_stream_async(self, message: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Async-generator variant of handle_message_stream().
+
+        The default implementation drives the synchronous stream from the event
+        loop's default executor, one chunk per hop. Agents with a native async
+        client should override it.
+
+        :param message: The user or system prompt to be handled.
+        :param kwargs: Additional context or parameters, as for handle_message_stream().
+        :yield: Chunks of the agent's response as strings.
+        """
+        loop = asyncio.get_running_loop()
+        stream = await loop.run_in_executor(
+            None, functools.partial(self.handle_message_stream, message, **kwargs)
+        )
+        if isinstance(stream, str):
+            # Some agents return the whole response instead of a generator
+            yield stream
+            return
+
+        iterator = iter(stream)
+        done = object()
+        # next() and close() must not overlap: a next() still running in the
+        # executor when this generator is cancelled finishes before the close
+        lock = threading.Lock()
+
+        def step():
+            with lock:
+                return next(iterator, done)
+
+        def close():
+            with lock:
+                stream.close()
+
+        finished = False
+        try:
+            while True:
+                chunk = await loop.run_in_executor(None, step)
+                if chunk is done:
+                    finished = True
+                    break
+                yield chunk
+        finally:
+            # Closing an abandoned stream releases its upstream connection now
+            # rather than whenever it is garbage collected
+            if not finished and hasattr(stream, "close"):
+                await loop.run_in_executor(None, close)
+
+    def sampling_temperature(self, **kwargs) -> Optional[float]:
+        """
+        Return the sampling temperature this agent sends with a request, or
+        None if it leaves the choice to the provider. Agents that send one
+        should override it; wrappers such as CachedAgent use it to decide
+        whether a response is deterministic enough to reuse.
+
+        :param kwargs: The keyword arguments of the request.
+        """
+        return None
+
+    def rate_limit_key(self) -> Tuple[str, Optional[str], Optional[str]]:
+        """
+        Return the (provider, model, deployment) key whose rate limiter this
+        agent shares. Agents that call a provider should override it.
+        """
+        return (self.agent_type, self.llm_config.get("model_name"), None)
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """
+        The process-wide RateLimiter for this agent's rate_limit_key(), created
+        on first use from the requests_per_minute, tokens_per_minute,
+        max_concurrency and max_retries keys of llm_config. Limits apply only
+        when configured; without them the limiter just retries throttled calls.
+        """
+        limiter = self.__dict__.get("_rate_limiter")
+        if limiter is None:
+            limiter = self._rate_limiter = get_rate_limiter(
+                *self.rate_limit_key(), **rate_limiter_settings(self.llm_config)
+            )
+        return limiter
+
     def call_tool(self, tool_name: str, method_name: str, *args, **kwargs) -> Any:
         """
         Call a method on a registered tool by name.
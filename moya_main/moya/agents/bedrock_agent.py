@@ -3,15 +3,101 @@ BedrockAgent for Moya.
 
 An Agent that uses AWS Bedrock API to generate responses,
 pulling AWS credentials from environment or AWS configuration.
+
+Agents share one boto3 client per (region, profile) with a sized connection
+pool and botocore's adaptive retry mode, since creating clients is slow.
 """
 
+import asyncio
 import json
+import threading
 import boto3
-from typing import Any, Dict, Optional
+from botocore.config import Config
+from json.decoder import scanstring
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 from moya.agents.base_agent import Agent, AgentConfig
+from moya.utils.constants import LLMProviders
+from moya.utils.tokens import estimate_tokens
 from dataclasses import dataclass
 
 
+# Defaults for the botocore client configuration
+DEFAULT_MAX_POOL_CONNECTIONS = 50
+DEFAULT_MAX_ATTEMPTS = 5
+
+_clients: Dict[Tuple[str, Optional[str], int, int], Any] = {}
+_lock = threading.Lock()
+
+# Stands in for the prompt while the request-body template is serialized
+_PROMPT_PLACEHOLDER = "\x00moya-prompt\x00"
+# Keys holding generated text in stream chunks (Anthropic, Amazon Titan)
+_TEXT_KEYS = ('"completion":', '"outputText":')
+
+
+def get_bedrock_client(
+    region: str,
+    profile: Optional[str] = None,
+    max_pool_connections: int = DEFAULT_MAX_POOL_CONNECTIONS,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+):
+    """
+    Return the process-wide bedrock-runtime client for the given region and
+    AWS profile, creating it on first use. boto3 clients are thread-safe and
+    slow to create, so every BedrockAgent with the same settings shares one
+    client and its connection pool.
+
+    :param region: AWS region name.
+    :param profile: AWS profile name, or None for the default credential chain.
+    :param max_pool_connections: Maximum connections kept open to Bedrock.
+    :param max_attempts: Total attempts per call, including retries made by
+                         botocore's adaptive retry mode.
+    :return: A shared boto3 bedrock-runtime client.
+    """
+    key = (region, profile, max_pool_connections, max_attempts)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                # Sessions are not thread-safe, so each client gets its own
+                session = boto3.session.Session(profile_name=profile)
+                client = _clients[key] = session.client(
+                    service_name='bedrock-runtime',
+                    region_name=region,
+                    config=Config(
+                        max_pool_connections=max_pool_connections,
+                        retries={"mode": "adaptive", "total_max_attempts": max_attempts},
+                        tcp_keepalive=True
+                    )
+                )
+    return client
+
+
+def _extract_text(data: bytes) -> str:
+    """
+    Return the generated text of one stream chunk. Only the text field is
+    decoded; the rest of the chunk (stop reason, metrics) is not parsed.
+    """
+    text = data.decode('utf-8')
+    for key in _TEXT_KEYS:
+        index = text.find(key)
+        if index < 0:
+            continue
+        try:
+            index += len(key)
+            while text[index] in ' \t\r\n':
+                index += 1
+            if text[index] == '"':
+                return scanstring(text, index + 1)[0]
+            # A null or non-string value carries no text
+            return ''
+        except (IndexError, ValueError):
+            # Not the layout we expect; decode the whole chunk instead
+            chunk = json.loads(text)
+            return chunk.get('completion') or chunk.get('outputText') or ''
+    return ''
+
+
 @dataclass
 class BedrockAgentConfig(AgentConfig):
     model_id: str = "anthropic.claude-v2"
@@ -20,6 +106,10 @@ class BedrockAgentConfig(AgentConfig):
     temperature: float = 0.7
     top_p: float = 0.9
     top_k: int = 250
+    # AWS profile for credentials; None uses the default credential chain
+    profile: Optional[str] = None
+    max_pool_connections: int = DEFAULT_MAX_POOL_CONNECTIONS
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
 
 
 class BedrockAgent(Agent):
@@ -29,74 +119,103 @@ class BedrockAgent(Agent):
 
     def __init__(
         self,
-        agent_name: str,
-        description: str,
-        config: Optional[Dict[str, Any]] = None,
-        tool_registry: Optional[Any] = None,
-        agent_config: Optional[BedrockAgentConfig] = None
+        config: BedrockAgentConfig
     ):
         """
-        :param agent_name: Unique name or identifier for the agent.
-        :param description: A brief explanation of the agent's capabilities.
-        :param model_id: The Bedrock model ID (e.g., "anthropic.claude-v2").
-        :param config: Optional config dict (can include AWS region).
-        :param tool_registry: Optional ToolRegistry to enable tool calling.
-        :param system_prompt: Default system prompt for context.
-        """
-        super().__init__(
-            agent_name=agent_name,
-            agent_type="BedrockAgent",
-            description=description,
-            config=config,
-            tool_registry=tool_registry
-        )
-        self.agent_config = agent_config or BedrockAgentConfig()
-        self.system_prompt = self.agent_config.system_prompt
-        self.model_id = self.agent_config.model_id
-        self.region = self.agent_config.region
+        Initialize the BedrockAgent.
+
+        :param config: Configuration for the agent, including the Bedrock
+                       model ID, region and client settings.
+        """
+        super().__init__(config=config)
+        self.agent_config = config
+        self.model_id = config.model_id
+        self.region = config.region
+        self.client = None
+        self._body_template = None
+        self._body_template_key = None
+
+    def rate_limit_key(self):
+        return (LLMProviders.BEDROCK, self.model_id, self.region)
+
+    def sampling_temperature(self, **kwargs) -> Optional[float]:
+        return self.agent_config.temperature
 
     def setup(self) -> None:
         """
-        Initialize the Bedrock client using boto3.
+        Attach the shared Bedrock client for this agent's region and profile.
         AWS credentials should be configured via environment variables
         or AWS configuration files.
         """
         try:
-            self.client = boto3.client(
-                service_name='bedrock-runtime',
-                region_name=self.region
+            self.client = get_bedrock_client(
+                self.region,
+                self.agent_config.profile,
+                self.agent_config.max_pool_connections,
+                self.agent_config.max_attempts
             )
         except Exception as e:
             raise EnvironmentError(
                 f"Failed to initialize Bedrock client: {str(e)}"
             )
 
-    def handle_message(self, message: str, **kwargs) -> str:
+    def _template(self) -> Tuple[str, str]:
         """
-        Calls AWS Bedrock to handle the user's message.
+        Return the request body for the configured model serialized around
+        the prompt, as (prefix, suffix). Rebuilt only when the model or its
+        parameters change.
         """
-        try:
-            # Construct the prompt based on the model
+        key = (self.model_id, self.agent_config.max_tokens_to_sample, self.agent_config.temperature)
+        if self._body_template_key != key:
+            # Construct the body based on the model
             if "anthropic" in self.model_id:
-                prompt = f"\n\nHuman: {message}\n\nAssistant:"
                 body = {
-                    "prompt": self.system_prompt + prompt,
+                    "prompt": _PROMPT_PLACEHOLDER,
                     "max_tokens_to_sample": self.agent_config.max_tokens_to_sample,
                     "temperature": self.agent_config.temperature
                 }
             else:
                 # Handle other model types here
                 body = {
-                    "inputText": message,
+                    "inputText": _PROMPT_PLACEHOLDER,
                     "textGenerationConfig": {
                         "maxTokenCount": self.agent_config.max_tokens_to_sample,
                         "temperature": self.agent_config.temperature
                     }
                 }
+            prefix, suffix = json.dumps(body).split(json.dumps(_PROMPT_PLACEHOLDER))
+            self._body_template = (prefix, suffix)
+            self._body_template_key = key
+        return self._body_template
 
-            response = self.client.invoke_model(
+    def _build_body(self, message: str) -> str:
+        """
+        Build the JSON request body for the configured model.
+        """
+        if "anthropic" in self.model_id:
+            prompt = f"{self.system_prompt}\n\nHuman: {message}\n\nAssistant:"
+        else:
+            prompt = message
+        prefix, suffix = self._template()
+        return prefix + json.dumps(prompt) + suffix
+
+    @staticmethod
+    def _chunk_text(event: Dict[str, Any]) -> str:
+        """
+        Extract the generated text from one response stream event.
+        """
+        return _extract_text(event['chunk']['bytes'])
+
+    def handle_message(self, message: str, **kwargs) -> str:
+        """
+        Calls AWS Bedrock to handle the user's message.
+        """
+        try:
+            response = self.rate_limiter.run(
+                self.client.invoke_model,
+                tokens=estimate_tokens(message),
                 modelId=self.model_id,
-                body=json.dumps(body)
+                body=self._build_body(message)
             )
 
             response_body = json.loads(response['body'].read())
@@ -110,33 +229,70 @@ class BedrockAgent(Agent):
         Calls AWS Bedrock to handle the user's message with streaming support.
         """
         try:
-            if "anthropic" in self.model_id:
-                prompt = f"\n\nHuman: {message}\n\nAssistant:"
-                body = {
-                    "prompt": self.system_prompt + prompt,
-                    "max_tokens_to_sample": self.agent_config.max_tokens_to_sample,
-                    "temperature": self.agent_config.temperature
-                }
-            else:
-                body = {
-                    "inputText": message,
-                    "textGenerationConfig": {
-                        "maxTokenCount": self.agent_config.max_tokens_to_sample,
-                        "temperature": self.agent_config.temperature
-                    }
-                }
-
-            response = self.client.invoke_model_with_response_stream(
+            response = self.rate_limiter.run(
+                self.client.invoke_model_with_response_stream,
+                tokens=estimate_tokens(message),
                 modelId=self.model_id,
-                body=json.dumps(body)
+                body=self._build_body(message)
             )
 
             for event in response['body']:
-                chunk = json.loads(event['chunk']['bytes'])
-                if 'completion' in chunk:
-                    yield chunk['completion']
-                elif 'outputText' in chunk:
-                    yield chunk['outputText']
+                text = self._chunk_text(event)
+                if text:
+                    yield text
+
+        except Exception as e:
+            error_message = f"[BedrockAgent error: {str(e)}]"
+            print(error_message)
+            yield error_message
+
+    async def handle_message_async(self, message: str, **kwargs) -> str:
+        """
+        Calls AWS Bedrock to handle the user's message from asyncio code.
+        boto3 has no async API, so only the blocking call itself runs in a
+        worker thread; the request body is built on the event loop.
+        """
+        try:
+            body = self._build_body(message)
+            response = await self.rate_limiter.run_async(
+                asyncio.to_thread,
+                self.client.invoke_model,
+                tokens=estimate_tokens(message),
+                modelId=self.model_id,
+                body=body
+            )
+
+            response_body = json.loads(await asyncio.to_thread(response['body'].read))
+            return response_body.get('completion', response_body.get('outputText', ''))
+
+        except Exception as e:
+            return f"[BedrockAgent error: {str(e)}]"
+
+    async def handle_message_stream_async(self, message: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Calls AWS Bedrock with streaming support from asyncio code. Each read
+        from the response stream runs in a worker thread.
+        """
+        try:
+            body = self._build_body(message)
+            response = await self.rate_limiter.run_async(
+                asyncio.to_thread,
+                self.client.invoke_model_with_response_stream,
+                tokens=estimate_tokens(message),
+                modelId=self.model_id,
+                body=body
+            )
+
+            loop = asyncio.get_running_loop()
+            events = iter(response['body'])
+            done = object()
+            while True:
+                event = await loop.run_in_executor(None, next, events, done)
+                if event is done:
+                    break
+                text = self._chunk_text(event)
+                if text:
+                    yield text
 
         except Exception as e:
             error_message = f"[BedrockAgent error: {str(e)}]"
@@ -0,0 +1,166 @@
+"""
+CachedAgent for Moya.
+
+Wraps another agent and serves repeated, deterministic requests from a
+response cache instead of calling the LLM again. Useful for classifier and
+control prompts (LLMClassifier, ReAct's final-answer check) that send the
+same (model, system prompt, message, parameters) over and over.
+"""
+
+import re
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+from moya.agents.agent_wrapper import AgentWrapper
+from moya.agents.base_agent import Agent
+from moya.cache.base_cache import BaseResponseCache, CacheStats
+from moya.cache.in_memory_cache import InMemoryResponseCache
+
+
+# Agents report failures as responses such as "[OpenAIAgent error: ...]",
+# or as the last chunk of a stream that failed part-way; those must not be cached.
+_ERROR_RESPONSE = re.compile(r"^\[\w+ error:")
+
+
+class CachedAgent(AgentWrapper):
+    """
+    An agent that answers from a response cache when it can and delegates
+    to the wrapped agent otherwise.
+
+    Requests are only cached when the temperature the wrapped agent sends
+    is 0, or when it sends none (see Agent.sampling_temperature()), unless
+    allow_nondeterministic is True. Cache keys come from
+    AgentWrapper.request_key().
+    """
+
+    def __init__(
+        self,
+        agent: Agent,
+        cache: Optional[BaseResponseCache] = None,
+        allow_nondeterministic: bool = False,
+        ignored_kwargs: Iterable[str] = ("thread_id",)
+    ):
+        """
+        :param agent: The agent whose responses are cached.
+        :param cache: Cache backend; defaults to an InMemoryResponseCache.
+        :param allow_nondeterministic: Cache responses even when temperature > 0.
+        :param ignored_kwargs: handle_message keyword arguments left out of the
+                               cache key. thread_id is ignored by default so that
+                               identical prompts from different threads share entries.
+        """
+        super().__init__(agent, ignored_kwargs=ignored_kwargs)
+        self.cache = cache if cache is not None else InMemoryResponseCache()
+        self.allow_nondeterministic = allow_nondeterministic
+
+    @property
+    def stats(self) -> CacheStats:
+        """Hit/miss counters of the underlying cache."""
+        return self.cache.stats
+
+    def _key_or_bypass(self, message: str, kwargs: Dict[str, Any]) -> Optional[str]:
+        temperature = self.temperature(**kwargs)
+        if not self.allow_nondeterministic and temperature is not None and temperature > 0:
+            self.cache.stats.record("bypasses")
+            return None
+        return self.request_key(message, **kwargs)
+
+    @staticmethod
+    def should_cache(response: Any) -> bool:
+        """
+        Return True if a response may be stored; empty and error responses are not.
+        """
+        return isinstance(response, str) and bool(response) and not _ERROR_RESPONSE.match(response)
+
+    @staticmethod
+    def is_error_chunk(chunk: Any) -> bool:
+        """
+        Return True if a streamed chunk is an agent's error message.
+        """
+        return isinstance(chunk, str) and _ERROR_RESPONSE.match(chunk) is not None
+
+    def _store(self, key: str, response: Any) -> None:
+        if self.should_cache(response):
+            self.cache.set(key, response)
+
+    def handle_message(self, message: str, **kwargs) -> str:
+        """
+        Return the cached response for this request, or call the wrapped agent and cache its response.
+        """
+        key = self._key_or_bypass(message, kwargs)
+        if key is None:
+            return self.agent.handle_message(message, **kwargs)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = self.agent.handle_message(message, **kwargs)
+        self._store(key, response)
+        return response
+
+    def handle_message_stream(self, message: str, **kwargs):
+        """
+        Stream the wrapped agent's response, or yield the cached response in one chunk.
+        A streamed response is cached once it has been read to the end without an
+        error chunk.
+        """
+        key = self._key_or_bypass(message, kwargs)
+        if key is None:
+            yield from self._as_chunks(self.agent.handle_message_stream(message, **kwargs))
+            return
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        # Only a stream read to the end without an error chunk is cached; one
+        # that raises or is closed early never reaches _store()
+        chunks = []
+        failed = False
+        for chunk in self._as_chunks(self.agent.handle_message_stream(message, **kwargs)):
+            failed = failed or self.is_error_chunk(chunk)
+            chunks.append(chunk)
+            yield chunk
+        if not failed:
+            self._store(key, "".join(chunks))
+
+    async def handle_message_async(self, message: str, **kwargs) -> str:
+        """
+        Coroutine variant of handle_message().
+        """
+        key = self._key_or_bypass(message, kwargs)
+        if key is None:
+            return await self.agent.handle_message_async(message, **kwargs)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = await self.agent.handle_message_async(message, **kwargs)
+        self._store(key, response)
+        return response
+
+    async def handle_message_stream_async(self, message: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Async-generator variant of handle_message_stream().
+        """
+        key = self._key_or_bypass(message, kwargs)
+        if key is None:
+            async for chunk in self.agent.handle_message_stream_async(message, **kwargs):
+                yield chunk
+            return
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        chunks = []
+        failed = False
+        async with aclosing(self.agent.handle_message_stream_async(message, **kwargs)) as stream:
+            async for chunk in stream:
+                failed = failed or self.is_error_chunk(chunk)
+                chunks.append(chunk)
+                yield chunk
+        if not failed:
+            self._store(key, "".join(chunks))
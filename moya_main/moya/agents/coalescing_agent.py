@@ -0,0 +1,271 @@
+"""
+CoalescingAgent for Moya.
+
+Wraps another agent so that concurrent identical requests share a single
+upstream call ("single-flight"): the first caller makes the call and every
+caller that arrives while it is in flight receives the same result. Streams
+are fanned out the same way, with late subscribers replaying the chunks
+they missed.
+
+Coalescing only joins requests that overlap in time; it does not keep
+results afterwards. Combine it with CachedAgent for that:
+CachedAgent(CoalescingAgent(agent)).
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+from moya.agents.agent_wrapper import AgentWrapper
+from moya.agents.base_agent import Agent
+
+
+class _Flight:
+    """One in-flight synchronous call shared by all its waiters."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class _StreamFlight:
+    """
+    One upstream stream shared by several subscribers. Chunks are buffered so
+    each subscriber reads the whole stream at its own pace; whichever
+    subscriber runs out of buffered chunks first pulls the next one upstream.
+
+    Synchronous flights are guarded by a threading.Condition. Async flights
+    run on one event loop and need no lock; each upstream read runs as its
+    own task, so cancelling the subscriber that started it does not
+    interrupt the stream for the others.
+    """
+
+    def __init__(self, open_upstream, condition=None):
+        # The upstream stream is opened by the first pull, outside any lock
+        self.open_upstream = open_upstream
+        self.upstream = None
+        self.condition = condition
+        self.pull_task: Optional[asyncio.Task] = None
+        self.chunks: List[str] = []
+        self.finished = False
+        self.pulling = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+
+
+class CoalescingAgent(AgentWrapper):
+    """
+    An agent that merges concurrent identical requests into one call to the
+    wrapped agent. Requests are identical when their AgentWrapper.request_key()
+    matches. Exceptions raised by the shared call are raised to every waiter.
+    """
+
+    def __init__(self, agent: Agent, ignored_kwargs: Iterable[str] = ("thread_id",)):
+        """
+        :param agent: The agent whose calls are coalesced.
+        :param ignored_kwargs: handle_message keyword arguments left out of the
+                               request key (thread_id by default).
+        """
+        super().__init__(agent, ignored_kwargs=ignored_kwargs)
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._stream_flights: Dict[str, _StreamFlight] = {}
+        # Async flights are bound to the event loop they were started on
+        self._async_flights = weakref.WeakKeyDictionary()
+        self._async_stream_flights = weakref.WeakKeyDictionary()
+        # Number of upstream calls made and of requests served by joining one
+        self.upstream_calls = 0
+        self.coalesced = 0
+
+    def _count(self, joined: bool) -> None:
+        # Called with self._lock held
+        if joined:
+            self.coalesced += 1
+        else:
+            self.upstream_calls += 1
+
+    def handle_message(self, message: str, **kwargs) -> str:
+        """
+        Call the wrapped agent, or wait for an identical call already in flight.
+        """
+        key = self.request_key(message, **kwargs)
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            self._count(not leader)
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self.agent.handle_message(message, **kwargs)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def handle_message_stream(self, message: str, **kwargs):
+        """
+        Stream the wrapped agent's response, sharing one upstream stream with
+        identical requests in flight.
+        """
+        key = self.request_key(message, **kwargs)
+        with self._lock:
+            flight = self._stream_flights.get(key)
+            joined = flight is not None
+            if not joined:
+                flight = self._stream_flights[key] = _StreamFlight(
+                    lambda: iter(self._as_chunks(self.agent.handle_message_stream(message, **kwargs))),
+                    threading.Condition()
+                )
+            flight.subscribers += 1
+            self._count(joined)
+        return self._subscribe(key, flight)
+
+    def _subscribe(self, key: str, flight: _StreamFlight):
+        index = 0
+        try:
+            while True:
+                with flight.condition:
+                    while index >= len(flight.chunks) and not flight.finished and flight.pulling:
+                        flight.condition.wait()
+                    if index < len(flight.chunks):
+                        chunk = flight.chunks[index]
+                        index += 1
+                    elif flight.finished:
+                        if flight.error is not None:
+                            raise flight.error
+                        return
+                    else:
+                        flight.pulling = True
+                        chunk = None
+
+                if chunk is None:
+                    self._pull(key, flight)
+                    continue
+                yield chunk
+        finally:
+            self._unsubscribe(key, flight)
+
+    def _pull(self, key: str, flight: _StreamFlight) -> None:
+        chunk = None
+        end = False
+        try:
+            if flight.upstream is None:
+                flight.upstream = flight.open_upstream()
+            chunk = next(flight.upstream)
+        except StopIteration:
+            end = True
+        except Exception as e:
+            flight.error = e
+            end = True
+        finally:
+            if end:
+                # Identical requests from now on start a new upstream call
+                with self._lock:
+                    if self._stream_flights.get(key) is flight:
+                        del self._stream_flights[key]
+            with flight.condition:
+                if end:
+                    flight.finished = True
+                elif chunk is not None:
+                    flight.chunks.append(chunk)
+                # Also reached when the pull was interrupted, so another
+                # subscriber can take over
+                flight.pulling = False
+                flight.condition.notify_all()
+
+    def _unsubscribe(self, key: str, flight: _StreamFlight) -> None:
+        with self._lock:
+            flight.subscribers -= 1
+            abandoned = flight.subscribers == 0 and not flight.finished
+            if abandoned and self._stream_flights.get(key) is flight:
+                del self._stream_flights[key]
+        if abandoned:
+            # Every subscriber stopped early; release the upstream stream
+            close = getattr(flight.upstream, "close", None) if flight.upstream is not None else None
+            if close is not None:
+                close()
+
+    async def handle_message_async(self, message: str, **kwargs) -> str:
+        """
+        Coroutine variant of handle_message(). Cancelling one waiter does not
+        cancel the shared call while others still wait for it.
+        """
+        key = self.request_key(message, **kwargs)
+        with self._lock:
+            flights = self._async_flights.setdefault(asyncio.get_running_loop(), {})
+            task = flights.get(key)
+            self._count(task is not None)
+        if task is None:
+            task = flights[key] = asyncio.ensure_future(self.agent.handle_message_async(message, **kwargs))
+            task.add_done_callback(lambda _: flights.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def handle_message_stream_async(self, message: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Async-generator variant of handle_message_stream().
+        """
+        key = self.request_key(message, **kwargs)
+        with self._lock:
+            flights = self._async_stream_flights.setdefault(asyncio.get_running_loop(), {})
+            flight = flights.get(key)
+            self._count(flight is not None)
+        if flight is None:
+            flight = flights[key] = _StreamFlight(
+                lambda: self.agent.handle_message_stream_async(message, **kwargs)
+            )
+        flight.subscribers += 1
+
+        index = 0
+        try:
+            while True:
+                if index < len(flight.chunks):
+                    index += 1
+                    yield flight.chunks[index - 1]
+                elif flight.finished:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+                else:
+                    if flight.pull_task is None:
+                        flight.pull_task = asyncio.ensure_future(self._pull_async(key, flights, flight))
+                    await asyncio.shield(flight.pull_task)
+        finally:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.finished:
+                # Every subscriber stopped early; release the upstream stream
+                if flights.get(key) is flight:
+                    del flights[key]
+                if flight.pull_task is not None:
+                    flight.pull_task.cancel()
+                elif flight.upstream is not None:
+                    await flight.upstream.aclose()
+
+    async def _pull_async(self, key: str, flights: Dict[str, _StreamFlight], flight: _StreamFlight) -> None:
+        try:
+            if flight.upstream is None:
+                flight.upstream = flight.open_upstream()
+            flight.chunks.append(await flight.upstream.__anext__())
+        except StopAsyncIteration:
+            flight.finished = True
+        except Exception as e:
+            flight.error = e
+            flight.finished = True
+        finally:
+            flight.pull_task = None
+            if flight.finished and flights.get(key) is flight:
+                # Identical requests from now on start a new upstream call
+                del flights[key]
@@ -2,13 +2,99 @@
 OllamaAgent for Moya.
 
 An Agent that uses Ollama's API to generate responses using locally hosted models.
+
+All OllamaAgents in a process share pooled keep-alive HTTP sessions, so turns
+reuse open connections instead of paying TCP setup on every request. The
+server health probe runs lazily on first use and its result is cached per
+base URL, so constructing many agents does not touch the network.
+
+Ollama's generate endpoint takes one prompt per request, so batches are sent
+as concurrent requests over the pooled connections, with identical prompts
+in a batch sent only once.
 """
 
+import asyncio
+import httpx
 import requests
 import json
-from typing import Any, Dict, Optional
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from moya.agents.base_agent import Agent, AgentConfig
+from moya.utils.constants import LLMProviders
+from moya.utils.tokens import estimate_tokens
+
+
+# Defaults for the llm_config keys that tune the HTTP client
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 32
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 300.0
+# Seconds a successful health probe of a base URL stays valid
+HEALTH_CHECK_TTL = 300.0
+# Defaults for the llm_config keys that tune batching
+DEFAULT_BATCH_CONCURRENCY = 8
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_BATCH_WINDOW = 0.01
+
+_sessions: Dict[Tuple[int, int], requests.Session] = {}
+# Async clients are bound to the event loop they were created on
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[int, int], httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+_healthy_until: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def get_shared_session(
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE
+) -> requests.Session:
+    """
+    Return the process-wide keep-alive session for the given pool sizes,
+    creating it on first use.
+
+    :param pool_connections: Number of per-host connection pools to cache.
+    :param pool_maxsize: Maximum connections kept open per host.
+    :return: A requests.Session shared by every caller with the same pool sizes.
+    """
+    key = (pool_connections, pool_maxsize)
+    session = _sessions.get(key)
+    if session is None:
+        with _lock:
+            session = _sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _sessions[key] = session
+    return session
+
+
+def get_shared_async_client(
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE
+) -> httpx.AsyncClient:
+    """
+    Return the keep-alive httpx.AsyncClient shared by every caller on the
+    running event loop with the same pool sizes, creating it on first use.
+
+    :param pool_connections: Number of idle keep-alive connections to retain.
+    :param pool_maxsize: Maximum number of concurrent connections.
+    :return: An httpx.AsyncClient bound to the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    key = (pool_connections, pool_maxsize)
+    clients = _async_clients.setdefault(loop, {})
+    client = clients.get(key)
+    if client is None:
+        client = clients[key] = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_connections)
+        )
+    return client
 
 
 class OllamaAgent(Agent):
@@ -22,35 +108,107 @@ class OllamaAgent(Agent):
     ):
         """
         :param agent_config: AgentConfig configuration details for Ollama Agent.
+
+        Optional llm_config keys for the HTTP client: pool_connections,
+        pool_maxsize, connect_timeout and read_timeout (seconds). Batching is
+        tuned by batch_concurrency, batch_size and batch_window (seconds).
         """
         super().__init__(agent_config)
         self.base_url = self.llm_config["base_url"] or ""
         self.model_name = self.llm_config["model_name"] or "llama3.1"
+        self.session = get_shared_session(
+            self.llm_config.get("pool_connections", DEFAULT_POOL_CONNECTIONS),
+            self.llm_config.get("pool_maxsize", DEFAULT_POOL_MAXSIZE)
+        )
+        self.timeout = (
+            self.llm_config.get("connect_timeout", DEFAULT_CONNECT_TIMEOUT),
+            self.llm_config.get("read_timeout", DEFAULT_READ_TIMEOUT)
+        )
+        # Batch requests never need more threads than the pool has connections
+        self.batch_concurrency = min(
+            self.llm_config.get("batch_concurrency", DEFAULT_BATCH_CONCURRENCY),
+            self.llm_config.get("pool_maxsize", DEFAULT_POOL_MAXSIZE)
+        )
+        self.batch_size = self.llm_config.get("batch_size", DEFAULT_BATCH_SIZE)
+        self.batch_window = self.llm_config.get("batch_window", DEFAULT_BATCH_WINDOW)
+        self._batch_executor: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Tuple[str, Future]] = []
+        self._pending_timer: Optional[threading.Timer] = None
+        self._batch_lock = threading.Lock()
+
+    def rate_limit_key(self):
+        return (LLMProviders.OLLAMA, self.model_name, self.base_url)
+
+    def check_health(self) -> None:
+        """
+        Verify the Ollama server is reachable. The result is cached per base URL
+        for HEALTH_CHECK_TTL seconds, so only the first call per interval hits
+        the network.
+
+        :raises ConnectionError: If the server cannot be reached.
+        """
+        if _healthy_until.get(self.base_url, 0.0) > time.monotonic():
+            return
         try:
-            response = requests.get(f"{self.base_url}/api/tags")
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=self.timeout)
             if response.status_code != 200:
                 raise ConnectionError("Unable to connect to Ollama server")
         except Exception as e:
             raise ConnectionError(f"Failed to connect to Ollama server: {str(e)}")
+        _healthy_until[self.base_url] = time.monotonic() + HEALTH_CHECK_TTL
 
+    def _async_client(self) -> httpx.AsyncClient:
+        return get_shared_async_client(
+            self.llm_config.get("pool_connections", DEFAULT_POOL_CONNECTIONS),
+            self.llm_config.get("pool_maxsize", DEFAULT_POOL_MAXSIZE)
+        )
+
+    def _async_timeout(self) -> httpx.Timeout:
+        connect_timeout, read_timeout = self.timeout
+        return httpx.Timeout(read_timeout, connect=connect_timeout)
+
+    async def check_health_async(self) -> None:
+        """
+        Coroutine variant of check_health(), sharing the same cached result.
+
+        :raises ConnectionError: If the server cannot be reached.
+        """
+        if _healthy_until.get(self.base_url, 0.0) > time.monotonic():
+            return
+        try:
+            response = await self._async_client().get(
+                f"{self.base_url}/api/tags", timeout=self._async_timeout()
+            )
+            if response.status_code != 200:
+                raise ConnectionError("Unable to connect to Ollama server")
+        except Exception as e:
+            raise ConnectionError(f"Failed to connect to Ollama server: {str(e)}")
+        _healthy_until[self.base_url] = time.monotonic() + HEALTH_CHECK_TTL
 
     def handle_message(self, message: str, **kwargs) -> str:
         """
         Calls Ollama API to handle the user's message.
         """
         try:
+            self.check_health()
+
             # Combine system prompt and user message
             prompt = f"{self.system_prompt}\n\nUser: {message}\nAssistant:"
             
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model_name,
-                    "prompt": prompt,
-                    "stream": False
-                }
-            )
-            response.raise_for_status()
+            def generate():
+                response = self.session.post(
+                    f"{self.base_url}/api/generate",
+                    json={
+                        "model": self.model_name,
+                        "prompt": prompt,
+                        "stream": False
+                    },
+                    timeout=self.timeout
+                )
+                response.raise_for_status()
+                return response
+
+            response = self.rate_limiter.run(generate, tokens=estimate_tokens(prompt))
             data = response.json()
             return data.get("response", "")
         except Exception as e:
@@ -61,30 +219,212 @@ class OllamaAgent(Agent):
         Calls Ollama API to handle the user's message with streaming support.
         """
         try:
+            self.check_health()
+
             # Combine system prompt and user message
             prompt = f"{self.system_prompt}\n\nUser: {message}\nAssistant:"
             
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model_name,
-                    "prompt": prompt,
-                    "stream": True
-                },
-                stream=True
-            )
-            response.raise_for_status()
-            
-            for line in response.iter_lines():
-                if line:
-                    try:
-                        chunk = json.loads(line.decode('utf-8'))
-                        if "response" in chunk:
-                            yield chunk["response"]
-                    except json.JSONDecodeError:
-                        continue
+            def open_stream():
+                response = self.session.post(
+                    f"{self.base_url}/api/generate",
+                    json={
+                        "model": self.model_name,
+                        "prompt": prompt,
+                        "stream": True
+                    },
+                    stream=True,
+                    timeout=self.timeout
+                )
+                try:
+                    response.raise_for_status()
+                except Exception:
+                    response.close()
+                    raise
+                return response
+
+            # Closing the response returns its connection to the shared pool,
+            # even if the caller stops iterating early.
+            with self.rate_limiter.run(open_stream, tokens=estimate_tokens(prompt)) as response:
+                for line in response.iter_lines():
+                    if line:
+                        try:
+                            chunk = json.loads(line.decode('utf-8'))
+                            if "response" in chunk:
+                                yield chunk["response"]
+                        except json.JSONDecodeError:
+                            continue
                             
         except Exception as e:
             error_message = f"[OllamaAgent error: {str(e)}]"
             print(error_message)
             yield error_message
+
+    async def handle_message_async(self, message: str, **kwargs) -> str:
+        """
+        Calls Ollama API through the shared async client to handle the user's message.
+        """
+        try:
+            await self.check_health_async()
+
+            # Combine system prompt and user message
+            prompt = f"{self.system_prompt}\n\nUser: {message}\nAssistant:"
+
+            async def generate():
+                response = await self._async_client().post(
+                    f"{self.base_url}/api/generate",
+                    json={
+                        "model": self.model_name,
+                        "prompt": prompt,
+                        "stream": False
+                    },
+                    timeout=self._async_timeout()
+                )
+                response.raise_for_status()
+                return response
+
+            response = await self.rate_limiter.run_async(generate, tokens=estimate_tokens(prompt))
+            data = response.json()
+            return data.get("response", "")
+        except Exception as e:
+            return f"[OllamaAgent error: {str(e)}]"
+
+    async def handle_message_stream_async(self, message: str, **kwargs):
+        """
+        Calls Ollama API through the shared async client with streaming support.
+        """
+        try:
+            await self.check_health_async()
+
+            # Combine system prompt and user message
+            prompt = f"{self.system_prompt}\n\nUser: {message}\nAssistant:"
+
+            client = self._async_client()
+
+            async def open_stream():
+                request = client.build_request(
+                    "POST",
+                    f"{self.base_url}/api/generate",
+                    json={
+                        "model": self.model_name,
+                        "prompt": prompt,
+                        "stream": True
+                    },
+                    timeout=self._async_timeout()
+                )
+                response = await client.send(request, stream=True)
+                try:
+                    response.raise_for_status()
+                except Exception:
+                    await response.aclose()
+                    raise
+                return response
+
+            response = await self.rate_limiter.run_async(open_stream, tokens=estimate_tokens(prompt))
+            try:
+                async for line in response.aiter_lines():
+                    if line:
+                        try:
+                            chunk = json.loads(line)
+                            if "response" in chunk:
+                                yield chunk["response"]
+                        except json.JSONDecodeError:
+                            continue
+            finally:
+                await response.aclose()
+
+        except Exception as e:
+            error_message = f"[OllamaAgent error: {str(e)}]"
+            print(error_message)
+            yield error_message
+
+    @property
+    def batch_executor(self) -> ThreadPoolExecutor:
+        """
+        Thread pool that sends batched requests, created on first use and
+        sized by batch_concurrency.
+        """
+        with self._batch_lock:
+            if self._batch_executor is None:
+                self._batch_executor = ThreadPoolExecutor(
+                    max_workers=self.batch_concurrency,
+                    thread_name_prefix=f"{self.agent_name}-batch"
+                )
+            return self._batch_executor
+
+    def handle_messages_batch(self, messages: List[str], **kwargs) -> List[str]:
+        """
+        Handle many messages at once. Requests are sent concurrently, at most
+        batch_concurrency at a time, and identical messages are sent once.
+
+        :param messages: The messages to handle.
+        :return: The responses, in the same order as messages.
+        """
+        unique = list(dict.fromkeys(messages))
+        responses = self.batch_executor.map(lambda message: self.handle_message(message, **kwargs), unique)
+        by_message = dict(zip(unique, responses))
+        return [by_message[message] for message in messages]
+
+    async def handle_messages_batch_async(self, messages: List[str], **kwargs) -> List[str]:
+        """
+        Coroutine variant of handle_messages_batch(), using the shared async client.
+
+        :param messages: The messages to handle.
+        :return: The responses, in the same order as messages.
+        """
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+        async def handle(message):
+            async with semaphore:
+                return await self.handle_message_async(message, **kwargs)
+
+        unique = list(dict.fromkeys(messages))
+        by_message = dict(zip(unique, await asyncio.gather(*(handle(message) for message in unique))))
+        return [by_message[message] for message in messages]
+
+    def submit_message(self, message: str) -> Future:
+        """
+        Queue a message for the next batch and return a Future for its
+        response. A batch is sent once batch_size messages are queued or
+        batch_window seconds after its first message, whichever comes first.
+
+        :param message: The message to handle.
+        :return: A concurrent.futures.Future resolving to the response.
+        """
+        future = Future()
+        with self._batch_lock:
+            self._pending.append((message, future))
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+            elif self._pending_timer is None:
+                self._pending_timer = threading.Timer(self.batch_window, self.flush_batch)
+                self._pending_timer.daemon = True
+                self._pending_timer.start()
+        return future
+
+    def flush_batch(self) -> None:
+        """
+        Send the queued messages now instead of waiting for the batch window.
+        """
+        with self._batch_lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._pending_timer is not None:
+            self._pending_timer.cancel()
+            self._pending_timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        def run():
+            try:
+                responses = self.handle_messages_batch([message for message, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                return
+            for (_, future), response in zip(batch, responses):
+                future.set_result(response)
+
+        # Sent from a separate thread so submit_message never blocks on the network
+        threading.Thread(target=run, name=f"{self.agent_name}-batch-flush", daemon=True).start()
@@ -6,9 +6,12 @@ to generate responses, pulling API key from the environment.
 """
 
 
+import asyncio
 import os
-from openai import OpenAI
-from dataclasses import dataclass
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from openai import AsyncOpenAI, OpenAI
 from dataclasses import dataclass
 
 from typing import Any, Dict, List, Optional
@@ -17,6 +20,8 @@ from moya.agents.base_agent import AgentConfig
 from moya.tools.base_tool import BaseTool
 from moya.tools.tool_registry import ToolRegistry
 from moya.memory.base_repository import BaseMemoryRepository
+from moya.utils.constants import LLMProviders
+from moya.utils.tokens import estimate_tokens
 
 @dataclass
 class OpenAIAgentConfig(AgentConfig):
@@ -26,6 +31,19 @@ class OpenAIAgentConfig(AgentConfig):
     model_name: str = "gpt-4o"
     api_key: str = None
     tool_choice: Optional[str] = None
+    # Sampling temperature sent with every request; None leaves it to the
+    # API default
+    temperature: Optional[float] = None
+    # Run the tool calls of one model turn concurrently instead of one by one
+    parallel_tool_calls: bool = False
+    # Maximum number of tool calls running at once (per agent on the sync
+    # path, per turn on the async path)
+    max_tool_concurrency: int = 4
+    # Seconds a tool may run before its result is replaced by a timeout
+    # message; None means no limit
+    tool_timeout: Optional[float] = None
+    # Per-tool overrides of tool_timeout, keyed by tool name
+    tool_timeouts: Optional[Dict[str, float]] = None
 
 class OpenAIAgent(Agent):
     """
@@ -46,9 +64,20 @@ class OpenAIAgent(Agent):
         if not config.api_key:
             raise ValueError("OpenAI API key is required for OpenAIAgent.")
         self.client = OpenAI(api_key=config.api_key)
+        self.api_key = config.api_key
+        self._async_client = None
         self.system_prompt = config.system_prompt
         self.tool_choice = config.tool_choice if config.tool_choice else None
+        self.temperature = config.temperature
         self.max_iterations = 5
+        self.parallel_tool_calls = config.parallel_tool_calls
+        if config.max_tool_concurrency < 1:
+            raise ValueError("max_tool_concurrency must be at least 1.")
+        self.max_tool_concurrency = config.max_tool_concurrency
+        self.tool_timeout = config.tool_timeout
+        self.tool_timeouts = config.tool_timeouts or {}
+        self._tool_executor = None
+        self._tool_executor_lock = threading.Lock()
 
     def get_tool_definitions(self) -> List[Dict[str, Any]]:
         """
@@ -56,32 +85,9 @@ class OpenAIAgent(Agent):
         """
         if not self.tool_registry:
             return None
-        
-        # Generate tool definitions for OpenAI ChatCompletion
-        tools = [
-            {
-            "type": "function",
-            "function": {
-                "name": tool.name,
-                "description": tool.description,
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        name: {
-                            "type": info["type"],
-                            "description": info["description"]
-                        } for name, info in tool.parameters.items()
-                    },
-                    "required": [
-                        name for name, info in tool.parameters.items() 
-                        if info.get("required", False)
-                    ]
-                }
-            }
-        }
-        for tool in self.tool_registry.get_tools()
-        ]
-        return tools
+
+        # Definitions are cached by the registry until its tools change
+        return self.tool_registry.get_tool_definitions(LLMProviders.OPENAI)
 
     
     def handle_message(self, message: str, **kwargs) -> str:
@@ -93,8 +99,9 @@ class OpenAIAgent(Agent):
     def handle_message_stream(self, message: str, **kwargs):
         """
         Calls OpenAI ChatCompletion to handle the user's message with streaming support.
+        Content deltas are yielded as they arrive from the API.
         """
-        return self.handle(message)
+        return self.handle_stream(message)
 
     def handle(self, user_message):
         """
@@ -114,33 +121,103 @@ class OpenAIAgent(Agent):
 
         while iteration < self.max_iterations:
             message = self.get_response(conversation)
-            # Extract message content
-            if isinstance(message, dict):
-                content = message.get("content", "")
-                tool_calls = message.get("tool_calls", [])
-            else:
-                content = message.content if message.content is not None else ""
-                tool_calls = message.tool_calls if hasattr(message, "tool_calls") and message.tool_calls else []
-                # Convert to list of dicts if it's not already
-                if tool_calls and not isinstance(tool_calls[0], dict):
-                    tool_calls = [tc.dict() for tc in tool_calls]
-                    
-            # Create assistant message entry
-            entry = {"role": "assistant", "content": content}
+            tool_calls = self._append_assistant_message(conversation, message)
+
+            # Process tool calls if any
             if tool_calls:
-                entry["tool_calls"] = tool_calls
-            conversation.append(entry)
+                self._append_tool_responses(conversation, tool_calls, self.run_tool_calls(tool_calls))
+                iteration += 1
+            else:
+                break
+
+        final_message = conversation[-1].get("content", "")
+        return final_message
+
+    def handle_stream(self, user_message):
+        """
+        Streaming variant of handle(): yields content deltas as the API
+        delivers them. Tool-call deltas are collected alongside; once a
+        response ends with tool calls, the tools are run and streaming resumes
+        with the next completion.
+
+        Args:
+            user_message (str): The initial message from the user.
+
+        Yields:
+            str: Chunks of the assistant's response.
+        """
+        conversation = [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": user_message}
+        ]
+        iteration = 0
+
+        while iteration < self.max_iterations:
+            response = self.rate_limiter.run(
+                self.client.chat.completions.create,
+                tokens=self.estimate_tokens(conversation),
+                model=self.model_name,
+                messages=conversation,
+                tools=self.get_tool_definitions() or None,
+                tool_choice=self.tool_choice if self.tool_registry else None,
+                **self.sampling_params(),
+                stream=True
+            )
+            content = []
+            tool_calls = []
+
+            for chunk in response:
+                delta = self._accumulate_delta(chunk, tool_calls)
+                if delta:
+                    content.append(delta)
+                    yield delta
+
+            message = {"content": "".join(content), "tool_calls": tool_calls}
+            tool_calls = self._append_assistant_message(conversation, message)
+            if not tool_calls:
+                break
+
+            self._append_tool_responses(conversation, tool_calls, self.run_tool_calls(tool_calls))
+            iteration += 1
+
+    async def handle_message_async(self, message: str, **kwargs) -> str:
+        """
+        Calls OpenAI ChatCompletion through the async client to handle the user's message.
+        """
+        return await self.handle_async(message)
+
+    async def handle_message_stream_async(self, message: str, **kwargs):
+        """
+        Calls OpenAI ChatCompletion through the async client with streaming support.
+        Content deltas are yielded as they arrive from the API.
+        """
+        async for delta in self.handle_stream_async(message):
+            yield delta
+
+    async def handle_async(self, user_message):
+        """
+        Coroutine variant of handle(): resolves tool calls iteratively without
+        blocking the event loop. Tool functions run in worker threads.
+
+        Args:
+            user_message (str): The initial message from the user.
+
+        Returns:
+            str: Final response after tool call processing.
+        """
+        conversation = [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": user_message}
+        ]
+        iteration = 0
+
+        while iteration < self.max_iterations:
+            message = await self.get_response_async(conversation)
+            tool_calls = self._append_assistant_message(conversation, message)
 
             # Process tool calls if any
             if tool_calls:
-                for tool_call in tool_calls:
-                    tool_response = self.handle_tool_call(tool_call)
-                    
-                    conversation.append({
-                            "role": "tool",
-                            "tool_call_id": tool_call.get("id"),
-                            "content": tool_response
-                    })
+                self._append_tool_responses(conversation, tool_calls, await self.run_tool_calls_async(tool_calls))
                 iteration += 1
             else:
                 break
@@ -148,6 +225,126 @@ class OpenAIAgent(Agent):
         final_message = conversation[-1].get("content", "")
         return final_message
 
+    async def handle_stream_async(self, user_message):
+        """
+        Async-generator variant of handle_stream(), using the async OpenAI client.
+
+        Args:
+            user_message (str): The initial message from the user.
+
+        Yields:
+            str: Chunks of the assistant's response.
+        """
+        conversation = [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": user_message}
+        ]
+        iteration = 0
+
+        while iteration < self.max_iterations:
+            response = await self.rate_limiter.run_async(
+                self.async_client.chat.completions.create,
+                tokens=self.estimate_tokens(conversation),
+                model=self.model_name,
+                messages=conversation,
+                tools=self.get_tool_definitions() or None,
+                tool_choice=self.tool_choice if self.tool_registry else None,
+                **self.sampling_params(),
+                stream=True
+            )
+            content = []
+            tool_calls = []
+
+            async for chunk in response:
+                delta = self._accumulate_delta(chunk, tool_calls)
+                if delta:
+                    content.append(delta)
+                    yield delta
+
+            message = {"content": "".join(content), "tool_calls": tool_calls}
+            tool_calls = self._append_assistant_message(conversation, message)
+            if not tool_calls:
+                break
+
+            self._append_tool_responses(conversation, tool_calls, await self.run_tool_calls_async(tool_calls))
+            iteration += 1
+
+    def run_tool_calls(self, tool_calls) -> List[str]:
+        """
+        Execute the tool calls of one turn, in parallel if configured.
+
+        Returns:
+            list: Tool outputs in the same order as tool_calls.
+        """
+        if self.parallel_tool_calls:
+            return self.run_tool_calls_parallel(tool_calls)
+        # One by one, but still honouring any timeout set for the tool
+        return [
+            self.run_tool_calls_parallel([tool_call])[0]
+            if self.get_tool_timeout(tool_call) is not None
+            else self.handle_tool_call(tool_call)
+            for tool_call in tool_calls
+        ]
+
+    async def run_tool_calls_async(self, tool_calls) -> List[str]:
+        """
+        Coroutine variant of run_tool_calls(); tools run in worker threads.
+        """
+        if self.parallel_tool_calls:
+            return await self.run_tool_calls_parallel_async(tool_calls)
+        return [
+            (await self.run_tool_calls_parallel_async([tool_call]))[0]
+            if self.get_tool_timeout(tool_call) is not None
+            else await asyncio.to_thread(self.handle_tool_call, tool_call)
+            for tool_call in tool_calls
+        ]
+
+    @staticmethod
+    def _append_tool_responses(conversation, tool_calls, tool_responses):
+        for tool_call, tool_response in zip(tool_calls, tool_responses):
+            conversation.append({
+                    "role": "tool",
+                    "tool_call_id": tool_call.get("id"),
+                    "content": tool_response
+            })
+
+    @staticmethod
+    def _append_assistant_message(conversation, message):
+        """
+        Append the assistant's message to the conversation and return its
+        tool calls as a list of dicts (empty if there are none).
+        """
+        # Extract message content
+        if isinstance(message, dict):
+            content = message.get("content", "")
+            tool_calls = message.get("tool_calls", [])
+        else:
+            content = message.content if message.content is not None else ""
+            tool_calls = message.tool_calls if hasattr(message, "tool_calls") and message.tool_calls else []
+            # Convert to list of dicts if it's not already
+            if tool_calls and not isinstance(tool_calls[0], dict):
+                tool_calls = [tc.dict() for tc in tool_calls]
+
+        # Create assistant message entry
+        entry = {"role": "assistant", "content": content}
+        if tool_calls:
+            entry["tool_calls"] = tool_calls
+        conversation.append(entry)
+        return tool_calls
+
+    @property
+    def async_client(self):
+        """
+        The async OpenAI client, created on first use so that agents which are
+        only used synchronously never open an async connection pool.
+        """
+        if self._async_client is None:
+            self._async_client = self._create_async_client()
+        return self._async_client
+
+    def _create_async_client(self):
+        return AsyncOpenAI(api_key=self.api_key)
+
     def get_response(self, conversation):
         """
         Generate a response via the OpenAI ChatCompletion API with tool call support.
@@ -160,74 +357,274 @@ class OpenAIAgent(Agent):
         """
         
         if self.is_streaming:
-            response = self.client.chat.completions.create(
+            response = self.rate_limiter.run(
+                self.client.chat.completions.create,
+                tokens=self.estimate_tokens(conversation),
                 model=self.model_name,
                 messages=conversation,
                 tools=self.get_tool_definitions() or None,
                 tool_choice=self.tool_choice if self.tool_registry else None,
+                **self.sampling_params(),
                 stream=True
             )
             response_text = ""
             tool_calls = []
-            current_tool_call = None
             
             for chunk in response:
-                delta = chunk.choices[0].delta
-                if delta:
-                    if delta.content is not None:
-                        response_text += delta.content
-                        
-                    if delta.tool_calls:
-                        for tool_call_delta in delta.tool_calls:
-                            tool_call_index = tool_call_delta.index
-                            
-                            # Ensure we have enough slots in our tool_calls list
-                            while len(tool_calls) <= tool_call_index:
-                                tool_calls.append({"id": "", "type": "function", "function": {"name": "", "arguments": ""}})
-                                
-                            current_tool_call = tool_calls[tool_call_index]
-                            
-                            # Update tool call information from this chunk
-                            if tool_call_delta.id:
-                                current_tool_call["id"] = tool_call_delta.id
-                                
-                            if tool_call_delta.function:
-                                if tool_call_delta.function.name:
-                                    current_tool_call["function"]["name"] = tool_call_delta.function.name
-                                    
-                                if tool_call_delta.function.arguments:
-                                    current_tool_call["function"]["arguments"] = (
-                                        current_tool_call["function"].get("arguments", "") + 
-                                        tool_call_delta.function.arguments
-                                    )
+                response_text += self._accumulate_delta(chunk, tool_calls)
             
             result = {"content": response_text}
             if tool_calls:
                 result["tool_calls"] = tool_calls
             return result
         else:
-            response = self.client.chat.completions.create(
+            tokens = self.estimate_tokens(conversation)
+            response = self.rate_limiter.run(
+                self.client.chat.completions.create,
+                tokens=tokens,
                 model=self.model_name,
                 messages=conversation,
                 tools=self.get_tool_definitions(),
-                tool_choice=self.tool_choice if self.tool_registry else None
+                tool_choice=self.tool_choice if self.tool_registry else None,
+                **self.sampling_params()
             )
-            message = response.choices[0].message
-            
-            # Convert the response to a dict for uniform handling
-            result = {"content": message.content or ""}
-            
-            if message.tool_calls:
-                # Convert tool_calls to a list of dicts
-                if isinstance(message.tool_calls, list):
-                    if not isinstance(message.tool_calls[0], dict):
-                        result["tool_calls"] = [tc.dict() for tc in message.tool_calls]
-                    else:
-                        result["tool_calls"] = message.tool_calls
-                else:
-                    result["tool_calls"] = [message.tool_calls.dict()]
-                    
+            self._record_usage(response, tokens)
+            return self._message_to_result(response.choices[0].message)
+
+    async def get_response_async(self, conversation):
+        """
+        Coroutine variant of get_response(), using the async OpenAI client.
+
+        Args:
+            conversation (list): Current chat messages.
+
+        Returns:
+            dict: Message from the assistant, which may include 'tool_calls'.
+        """
+        if self.is_streaming:
+            response = await self.rate_limiter.run_async(
+                self.async_client.chat.completions.create,
+                tokens=self.estimate_tokens(conversation),
+                model=self.model_name,
+                messages=conversation,
+                tools=self.get_tool_definitions() or None,
+                tool_choice=self.tool_choice if self.tool_registry else None,
+                **self.sampling_params(),
+                stream=True
+            )
+            response_text = ""
+            tool_calls = []
+
+            async for chunk in response:
+                response_text += self._accumulate_delta(chunk, tool_calls)
+
+            result = {"content": response_text}
+            if tool_calls:
+                result["tool_calls"] = tool_calls
             return result
+        else:
+            tokens = self.estimate_tokens(conversation)
+            response = await self.rate_limiter.run_async(
+                self.async_client.chat.completions.create,
+                tokens=tokens,
+                model=self.model_name,
+                messages=conversation,
+                tools=self.get_tool_definitions(),
+                tool_choice=self.tool_choice if self.tool_registry else None,
+                **self.sampling_params()
+            )
+            self._record_usage(response, tokens)
+            return self._message_to_result(response.choices[0].message)
+
+    def rate_limit_key(self):
+        return (LLMProviders.OPENAI, self.model_name, None)
+
+    @staticmethod
+    def estimate_tokens(conversation) -> int:
+        """
+        Estimate the prompt tokens of a conversation, for the rate limiter's token budget.
+        """
+        return sum(
+            estimate_tokens(entry["content"])
+            for entry in conversation
+            if isinstance(entry.get("content"), str)
+        )
+
+    def _record_usage(self, response, estimated_tokens: int) -> None:
+        # Charge the difference between the estimate and the reported usage
+        usage = getattr(response, "usage", None)
+        total_tokens = getattr(usage, "total_tokens", None)
+        if isinstance(total_tokens, int):
+            self.rate_limiter.record_tokens(total_tokens - estimated_tokens)
+
+    @staticmethod
+    def _accumulate_delta(chunk, tool_calls):
+        """
+        Merge one streamed chunk into the tool calls collected so far and
+        return its content delta ("" if it carries none).
+        """
+        delta = chunk.choices[0].delta if chunk.choices else None
+        if not delta:
+            return ""
+
+        if delta.tool_calls:
+            for tool_call_delta in delta.tool_calls:
+                tool_call_index = tool_call_delta.index
+
+                # Ensure we have enough slots in our tool_calls list
+                while len(tool_calls) <= tool_call_index:
+                    tool_calls.append({"id": "", "type": "function", "function": {"name": "", "arguments": ""}})
+
+                current_tool_call = tool_calls[tool_call_index]
+
+                # Update tool call information from this chunk
+                if tool_call_delta.id:
+                    current_tool_call["id"] = tool_call_delta.id
+
+                if tool_call_delta.function:
+                    if tool_call_delta.function.name:
+                        current_tool_call["function"]["name"] = tool_call_delta.function.name
+
+                    if tool_call_delta.function.arguments:
+                        current_tool_call["function"]["arguments"] = (
+                            current_tool_call["function"].get("arguments", "") +
+                            tool_call_delta.function.arguments
+                        )
+
+        return delta.content or ""
+
+    @staticmethod
+    def _message_to_result(message):
+        """
+        Convert a non-streamed assistant message to a dict for uniform handling.
+        """
+        result = {"content": message.content or ""}
+
+        if message.tool_calls:
+            # Convert tool_calls to a list of dicts
+            if isinstance(message.tool_calls, list):
+                if not isinstance(message.tool_calls[0], dict):
+                    result["tool_calls"] = [tc.dict() for tc in message.tool_calls]
+                else:
+                    result["tool_calls"] = message.tool_calls
+            else:
+                result["tool_calls"] = [message.tool_calls.dict()]
+
+        return result
+
+    def sampling_temperature(self, **kwargs) -> Optional[float]:
+        return self.temperature
+
+    def sampling_params(self) -> Dict[str, Any]:
+        """
+        Return the sampling arguments passed to chat.completions.create().
+        """
+        return {} if self.temperature is None else {"temperature": self.temperature}
+
+    def get_tool_timeout(self, tool_call) -> Optional[float]:
+        """
+        Return the timeout in seconds for a tool call, or None if the tool
+        may run without limit.
+        """
+        name = tool_call.get("function", {}).get("name")
+        return self.tool_timeouts.get(name, self.tool_timeout)
+
+    @staticmethod
+    def _timeout_message(tool_call, timeout) -> str:
+        name = tool_call.get("function", {}).get("name")
+        return f"[Tool '{name}' timed out after {timeout}s]"
+
+    @property
+    def tool_executor(self) -> ThreadPoolExecutor:
+        """
+        Thread pool used for parallel tool calls, created on first use and
+        sized by max_tool_concurrency.
+        """
+        with self._tool_executor_lock:
+            if self._tool_executor is None:
+                self._tool_executor = ThreadPoolExecutor(
+                    max_workers=self.max_tool_concurrency,
+                    thread_name_prefix=f"{self.agent_name}-tool"
+                )
+            return self._tool_executor
+
+    def run_tool_calls_parallel(self, tool_calls) -> List[str]:
+        """
+        Execute the tool calls of one turn on the agent's thread pool.
+
+        Each call's timeout is counted from when it starts running, not from
+        when it was queued, but a call still queued once its timeout has
+        passed is dropped, so tools hung on every worker cannot stall the
+        turn. A tool that times out cannot be interrupted: its thread
+        finishes in the background and its result is discarded.
+
+        Args:
+            tool_calls (list): Tool calls as returned by the model.
+
+        Returns:
+            list: Tool outputs in the same order as tool_calls.
+        """
+        started = [threading.Event() for _ in tool_calls]
+        start_times = [0.0] * len(tool_calls)
+
+        def run(index, tool_call):
+            start_times[index] = time.monotonic()
+            started[index].set()
+            return self.handle_tool_call(tool_call)
+
+        executor = self.tool_executor
+        futures = [executor.submit(run, i, tool_call) for i, tool_call in enumerate(tool_calls)]
+
+        results = []
+        for i, (tool_call, future) in enumerate(zip(tool_calls, futures)):
+            timeout = self.get_tool_timeout(tool_call)
+            if timeout is None:
+                results.append(future.result())
+                continue
+            if not started[i].wait(timeout):
+                if future.cancel():
+                    results.append(self._timeout_message(tool_call, timeout))
+                    continue
+                # It began running just now
+                started[i].wait()
+            remaining = start_times[i] + timeout - time.monotonic()
+            try:
+                results.append(future.result(timeout=max(0.0, remaining)))
+            except TimeoutError:
+                results.append(self._timeout_message(tool_call, timeout))
+        return results
+
+    async def run_tool_calls_parallel_async(self, tool_calls) -> List[str]:
+        """
+        Coroutine variant of run_tool_calls_parallel(): runs the tool calls
+        of one turn concurrently in worker threads, at most
+        max_tool_concurrency at a time.
+
+        Args:
+            tool_calls (list): Tool calls as returned by the model.
+
+        Returns:
+            list: Tool outputs in the same order as tool_calls.
+        """
+        semaphore = asyncio.Semaphore(self.max_tool_concurrency)
+
+        async def run(tool_call):
+            timeout = self.get_tool_timeout(tool_call)
+            try:
+                await asyncio.wait_for(semaphore.acquire(), timeout)
+            except asyncio.TimeoutError:
+                return self._timeout_message(tool_call, timeout)
+            try:
+                return await asyncio.wait_for(
+                    asyncio.to_thread(self.handle_tool_call, tool_call),
+                    timeout
+                )
+            except asyncio.TimeoutError:
+                return self._timeout_message(tool_call, timeout)
+            finally:
+                semaphore.release()
+
+        return list(await asyncio.gather(*(run(tool_call) for tool_call in tool_calls)))
 
     def handle_tool_call(self, tool_call):
         """
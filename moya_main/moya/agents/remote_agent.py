@@ -2,12 +2,34 @@
 RemoteAgent for Moya.
 
 An Agent that communicates with a remote API endpoint to generate responses.
+
+By default each call is its own HTTP request. With ``transport="websocket"``
+calls are multiplexed over one shared WebSocket connection per server (see
+moya.utils.multiplexed_transport), which the server in moya.server accepts at
+/ws.
 """
 
+import asyncio
+import httpx
 import requests
+from contextlib import aclosing
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional, Iterator
+from typing import Any, AsyncIterator, Dict, Optional, Iterator, Tuple
 from moya.agents.base_agent import Agent, AgentConfig
+from moya.utils.multiplexed_transport import (
+    DEFAULT_MAX_STREAMS,
+    DEFAULT_WINDOW,
+    MultiplexedTransport,
+    get_multiplexed_transport
+)
+from moya.utils.sse import SSEDecoder, SSEEvent
+from moya.utils.wire_format import (
+    DEFAULT_COMPRESS_THRESHOLD,
+    WIRE_FORMATS,
+    ZSTD,
+    decode_body,
+    encode_body
+)
 
 
 @dataclass
@@ -16,6 +38,14 @@ class RemoteAgentConfig(AgentConfig):
     base_url: str = None
     verify_ssl: bool = True
     auth_token: Optional[str] = None
+    # "http" for one request per call, "websocket" for a shared multiplexed connection
+    transport: str = "http"
+    max_streams: int = DEFAULT_MAX_STREAMS
+    stream_window: int = DEFAULT_WINDOW
+    # "json" or "msgpack"; compression="zstd" compresses bodies over compress_threshold bytes
+    wire_format: str = "json"
+    compression: Optional[str] = None
+    compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD
 
 
 class RemoteAgent(Agent):
@@ -40,6 +70,12 @@ class RemoteAgent(Agent):
 
         if not config.base_url:
             raise ValueError("RemoteAgent base URL is required.")
+        if config.transport not in ("http", "websocket"):
+            raise ValueError(f"Unknown RemoteAgent transport: {config.transport}")
+        if config.wire_format not in WIRE_FORMATS:
+            raise ValueError(f"Unknown RemoteAgent wire format: {config.wire_format}")
+        if config.compression not in (None, ZSTD):
+            raise ValueError(f"Unsupported RemoteAgent compression: {config.compression}")
                    
         self.base_url = config.base_url.rstrip('/')
         self.system_prompt = config.system_prompt
@@ -54,6 +90,48 @@ class RemoteAgent(Agent):
         # Configure SSL verification
         self.session.verify = config.verify_ssl
 
+        self.auth_token = config.auth_token
+        self.verify_ssl = config.verify_ssl
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_client_loop = None
+
+        self.content_type = WIRE_FORMATS[config.wire_format]
+        self.compression = config.compression
+        self.compress_threshold = config.compress_threshold
+
+        self.multiplexed_transport: Optional[MultiplexedTransport] = None
+        if config.transport == "websocket":
+            ws_url = "ws" + self.base_url[4:] if self.base_url.startswith("http") else self.base_url
+            self.multiplexed_transport = get_multiplexed_transport(
+                f"{ws_url}/ws",
+                self.auth_token,
+                self.verify_ssl,
+                config.max_streams,
+                config.stream_window,
+                config.wire_format
+            )
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """
+        Return this agent's httpx.AsyncClient, creating it on first use. The
+        client is bound to the event loop it was created on, so a new one is
+        made if the agent is later used from a different loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            headers = {}
+            if self.auth_token:
+                headers["Authorization"] = f"Bearer {self.auth_token}"
+            self._async_client = httpx.AsyncClient(headers=headers, verify=self.verify_ssl, timeout=None)
+            self._async_client_loop = loop
+        return self._async_client
+
+    async def aclose(self) -> None:
+        """Close the async client, if one was created."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
     def setup(self) -> None:
         """
         Set up the remote agent - test connection and configure session.
@@ -74,92 +152,198 @@ class RemoteAgent(Agent):
         :return: Response from the remote agent
         """
         try:
-            endpoint = f"{self.base_url}/chat"
-            data = {
-                "message": message,
-                "thread_id": kwargs.get("thread_id"),
-                **kwargs
-            }
-            
-            response = self.session.post(endpoint, json=data)
-            response.raise_for_status()
-            return response.json()["response"]
-            
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 401:
-                return "[RemoteAgent error: Authentication failed]"
-            return f"[RemoteAgent error: {str(e)}]"
+            return self.send_message(message, **kwargs)
         except Exception as e:
-            return f"[RemoteAgent error: {str(e)}]"
+            return self._error_message(e)
 
     def handle_message_stream(self, message: str, **kwargs) -> Iterator[str]:
         """
         Send message to remote endpoint and stream the response.
         """
         try:
-            endpoint = f"{self.base_url}/chat/stream"
-            data = {
-                "message": message,
-                "thread_id": kwargs.get("thread_id"),
-                **kwargs
-            }
-            
-            with self.session.post(
-                endpoint,
-                json=data,
-                stream=True,
-                headers={"Accept": "text/event-stream"}
-            ) as response:
-                response.raise_for_status()
-                current_text = ""
-                
-                for line in response.iter_lines(decode_unicode=True):
-                    if line and line.startswith("data:"):
-                        content = line[5:].strip()
-                        if content and content != "done":
-                            # Clean up content
-                            clean_content = (
-                                content
-                                .encode('utf-8')
-                                .decode('utf-8')
-                                .replace('\u00A0', ' ')
-                            )
-                            
-                            # Add to current text
-                            current_text += clean_content
-                            
-                            # Find word boundaries
-                            words = []
-                            remaining = ""
-                            
-                            # Split into words while preserving punctuation
-                            for word in current_text.split(' '):
-                                if word:
-                                    if any(c.isalnum() for c in word):
-                                        words.append(word)
-                                    else:
-                                        # Handle punctuation
-                                        if words:
-                                            last_word = words[-1]
-                                            words[-1] = last_word + word
-                                        else:
-                                            words.append(word)
-                            
-                            # If we have complete words, yield them
-                            if words:
-                                text_to_yield = ' '.join(words)
-                                yield text_to_yield + ' '
-                                current_text = ""
-                
-                # Yield any remaining text
-                if current_text.strip():
-                    yield current_text
-                            
+            yield from self.stream_message(message, **kwargs)
+        except Exception as e:
+            error_message = self._error_message(e)
+            print(error_message)
+            yield error_message
+
+    async def handle_message_async(self, message: str, **kwargs) -> str:
+        """
+        Send message to remote endpoint through the async client and get response.
+
+        :param message: The message to process
+        :param kwargs: Additional parameters to pass to the remote API
+        :return: Response from the remote agent
+        """
+        try:
+            return await self.send_message_async(message, **kwargs)
         except Exception as e:
-            error_message = f"[RemoteAgent error: {str(e)}]"
+            return self._error_message(e)
+
+    async def handle_message_stream_async(self, message: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Send message to remote endpoint through the async client and stream the response.
+        """
+        try:
+            async with aclosing(self.stream_message_async(message, **kwargs)) as chunks:
+                async for chunk in chunks:
+                    yield chunk
+        except Exception as e:
+            error_message = self._error_message(e)
             print(error_message)
             yield error_message
 
+    def send_message(self, message: str, **kwargs) -> str:
+        """
+        Like handle_message(), but raises on failure instead of returning an
+        error string, so callers such as RemoteAgentPool can retry elsewhere.
+
+        :param message: The message to process
+        :param kwargs: Additional parameters to pass to the remote API
+        :return: Response from the remote agent
+        """
+        endpoint = f"{self.base_url}/chat"
+        data = self._request_body(message, kwargs)
+
+        if self.multiplexed_transport is not None:
+            return self.multiplexed_transport.request(data)
+
+        body, headers = self._encode_request(data)
+        response = self.session.post(endpoint, data=body, headers=headers)
+        response.raise_for_status()
+        return self._decode_response(response)["response"]
+
+    def stream_message(self, message: str, **kwargs) -> Iterator[str]:
+        """
+        Like handle_message_stream(), but raises on failure instead of
+        yielding an error string.
+        """
+        endpoint = f"{self.base_url}/chat/stream"
+        data = self._request_body(message, kwargs)
+
+        if self.multiplexed_transport is not None:
+            yield from self.multiplexed_transport.stream(data)
+            return
+
+        body, headers = self._encode_request(data)
+        headers["Accept"] = "text/event-stream"
+        with self.session.post(
+            endpoint,
+            data=body,
+            stream=True,
+            headers=headers
+        ) as response:
+            response.raise_for_status()
+            # SSE is always UTF-8; decode incrementally as bytes arrive
+            response.encoding = "utf-8"
+            decoder = SSEDecoder()
+            for chunk in response.iter_content(chunk_size=None, decode_unicode=True):
+                for event in decoder.feed(chunk):
+                    if event.event == "done":
+                        return
+                    text = self._event_text(event)
+                    if text:
+                        yield text
+
+    async def send_message_async(self, message: str, **kwargs) -> str:
+        """
+        Awaitable variant of send_message() using the async client.
+        """
+        endpoint = f"{self.base_url}/chat"
+        data = self._request_body(message, kwargs)
+
+        if self.multiplexed_transport is not None:
+            return await self.multiplexed_transport.request_async(data)
+
+        body, headers = self._encode_request(data)
+        response = await self._get_async_client().post(endpoint, content=body, headers=headers)
+        response.raise_for_status()
+        return self._decode_response(response)["response"]
+
+    async def stream_message_async(self, message: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Async-generator variant of stream_message() using the async client.
+        """
+        endpoint = f"{self.base_url}/chat/stream"
+        data = self._request_body(message, kwargs)
+
+        if self.multiplexed_transport is not None:
+            async with aclosing(self.multiplexed_transport.stream_async(data)) as chunks:
+                async for chunk in chunks:
+                    yield chunk
+            return
+
+        body, headers = self._encode_request(data)
+        headers["Accept"] = "text/event-stream"
+        async with self._get_async_client().stream(
+            "POST",
+            endpoint,
+            content=body,
+            headers=headers
+        ) as response:
+            response.raise_for_status()
+
+            decoder = SSEDecoder()
+            async for chunk in response.aiter_text():
+                for event in decoder.feed(chunk):
+                    if event.event == "done":
+                        return
+                    text = self._event_text(event)
+                    if text:
+                        yield text
+
+    @staticmethod
+    def _error_message(error: Exception) -> str:
+        """
+        Format a failed call as the error string handle_message() returns.
+        """
+        response = getattr(error, "response", None)
+        if getattr(response, "status_code", None) == 401:
+            return "[RemoteAgent error: Authentication failed]"
+        return f"[RemoteAgent error: {str(error)}]"
+
+    @staticmethod
+    def _request_body(message: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the request body, leaving out parameters that were not set.
+        """
+        return {"message": message, **{key: value for key, value in kwargs.items() if value is not None}}
+
+    def _encode_request(self, data: Dict[str, Any]) -> Tuple[bytes, Dict[str, str]]:
+        """
+        Serialize a request body in the configured wire format, asking for
+        the response in the same format.
+        """
+        body, headers = encode_body(data, self.content_type, self.compression, self.compress_threshold)
+        headers["Accept"] = self.content_type
+        if self.compression:
+            headers["Accept-Encoding"] = f"{self.compression}, gzip, deflate"
+        return body, headers
+
+    @staticmethod
+    def _decode_response(response) -> Dict[str, Any]:
+        """
+        Deserialize a response body in whichever format the server chose.
+        """
+        return decode_body(
+            response.content,
+            response.headers.get("Content-Type"),
+            response.headers.get("Content-Encoding")
+        )
+
+    @staticmethod
+    def _event_text(event: SSEEvent) -> str:
+        """
+        Return the text to yield for one stream event. Message data is passed
+        through unchanged; the server already sends whole-word chunks.
+        """
+        if event.event == "error":
+            return f"[RemoteAgent error: {event.data}]"
+        # Older servers send a bare "done" data line before closing
+        if event.data == "done":
+            return ""
+        return event.data
+
     def __del__(self):
         """Cleanup the session when the agent is destroyed."""
         if hasattr(self, 'session'):
@@ -0,0 +1,450 @@
+"""
+RemoteAgentPool for Moya.
+
+An Agent that spreads requests over several replicas of a remote agent
+server, so no external load balancer is needed:
+
+- Each endpoint's /health is probed every ``health_interval`` seconds.
+- Requests go to the available endpoint with the fewest requests in flight
+  ("least_outstanding"), or with the lowest EWMA latency weighted by its
+  requests in flight ("ewma").
+- An endpoint is ejected after ``failure_threshold`` consecutive failed
+  requests or probes, and readmitted by the first successful probe after
+  ``ejection_time`` seconds (or then without a probe when probing is off).
+- Non-streaming calls that fail with a connection error or a retryable
+  status (429 or 5xx) are retried on another endpoint. Streams fail over
+  only until their first chunk has arrived.
+"""
+
+import random
+import threading
+import time
+import httpx
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from dataclasses import dataclass, field, fields
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Set
+from moya.agents.base_agent import Agent
+from moya.agents.remote_agent import RemoteAgent, RemoteAgentConfig
+from moya.utils.multiplexed_transport import MultiplexedRequestError
+
+
+ROUTING_POLICIES = ("least_outstanding", "ewma")
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Return True if a failed call may succeed on another endpoint: the
+    connection failed, or the server answered 429 or 5xx (over HTTP or in a
+    WebSocket error frame).
+    """
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is None and isinstance(error, MultiplexedRequestError):
+        status = error.status
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(error, (OSError, TimeoutError, httpx.TransportError))
+
+
+@dataclass
+class RemoteAgentPoolConfig(RemoteAgentConfig):
+    """
+    Configuration for RemoteAgentPool. The RemoteAgentConfig settings
+    (auth_token, transport, wire_format, ...) apply to every endpoint;
+    base_url is not used.
+    """
+    endpoints: List[str] = field(default_factory=list)
+    routing: str = "least_outstanding"
+    # Seconds between /health probes; None disables probing
+    health_interval: Optional[float] = 5.0
+    health_timeout: float = 2.0
+    failure_threshold: int = 3
+    ejection_time: float = 30.0
+    # Endpoints tried per call; None tries each endpoint once
+    max_attempts: Optional[int] = None
+    ewma_alpha: float = 0.3
+
+
+class PoolEndpoint:
+    """
+    One server in a RemoteAgentPool, with its load and health.
+    """
+
+    __slots__ = ("url", "agent", "outstanding", "latency", "failures", "healthy", "ejected_until")
+
+    def __init__(self, url: str, agent: RemoteAgent):
+        self.url = url
+        self.agent = agent
+        self.outstanding = 0
+        # EWMA of request latency in seconds; None until the first success
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.healthy = True
+        self.ejected_until = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "latency_ms": None if self.latency is None else round(self.latency * 1000, 1),
+            "failures": self.failures
+        }
+
+
+class RemoteAgentPool(Agent):
+    """
+    An agent that forwards requests to the least loaded of several remote
+    agent servers.
+    """
+
+    def __init__(self, config: RemoteAgentPoolConfig):
+        """
+        Initialize a RemoteAgentPool.
+
+        :param config: Configuration for the pool, including its endpoints
+                       and the RemoteAgent settings used for each of them.
+        """
+        super().__init__(config=config)
+
+        if not config.endpoints:
+            raise ValueError("RemoteAgentPool requires at least one endpoint.")
+        if config.routing not in ROUTING_POLICIES:
+            raise ValueError(f"Unknown RemoteAgentPool routing policy: {config.routing}")
+        if config.failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1.")
+
+        self.pool_config = config
+        self.routing = config.routing
+        self.max_attempts = config.max_attempts or len(config.endpoints)
+
+        remote_settings = {f.name: getattr(config, f.name) for f in fields(RemoteAgentConfig)}
+        self.endpoints = [
+            PoolEndpoint(url, RemoteAgent(RemoteAgentConfig(**{**remote_settings, "base_url": url})))
+            for url in config.endpoints
+        ]
+
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._probe_thread: Optional[threading.Thread] = None
+        self._probe_executor: Optional[ThreadPoolExecutor] = None
+
+    def setup(self) -> None:
+        """
+        Probe every endpoint and start the periodic health checks.
+        """
+        results = self.check_health()
+        if not any(results.values()):
+            raise ConnectionError(f"No remote agent endpoint is healthy: {', '.join(results)}")
+        self._ensure_probing()
+
+    def check_health(self) -> Dict[str, bool]:
+        """
+        Probe every endpoint's /health once, in parallel.
+
+        :return: Whether each endpoint answered, keyed by URL.
+        """
+        if self._probe_executor is None:
+            with self._lock:
+                if self._probe_executor is None:
+                    self._probe_executor = ThreadPoolExecutor(
+                        max_workers=len(self.endpoints), thread_name_prefix="moya-pool-probe"
+                    )
+        return dict(zip(
+            (endpoint.url for endpoint in self.endpoints),
+            self._probe_executor.map(self._probe, self.endpoints)
+        ))
+
+    def _probe(self, endpoint: PoolEndpoint) -> bool:
+        try:
+            response = endpoint.agent.session.get(
+                f"{endpoint.url.rstrip('/')}/health", timeout=self.pool_config.health_timeout
+            )
+            response.raise_for_status()
+        except Exception:
+            self._finish(endpoint, failed=True, in_flight=False)
+            return False
+        with self._lock:
+            # Readmit an ejected endpoint, but not before its ejection time is
+            # up, so one that passes probes yet fails requests cannot flap
+            if not endpoint.healthy and time.monotonic() >= endpoint.ejected_until:
+                endpoint.healthy = True
+                endpoint.failures = 0
+        return True
+
+    def _ensure_probing(self) -> None:
+        if self.pool_config.health_interval and self._probe_thread is None:
+            with self._lock:
+                if self._probe_thread is None:
+                    self._probe_thread = threading.Thread(
+                        target=self._probe_loop, name="moya-pool-health", daemon=True
+                    )
+                    self._probe_thread.start()
+
+    def _probe_loop(self) -> None:
+        while not self._closed.wait(self.pool_config.health_interval):
+            self.check_health()
+
+    def close(self) -> None:
+        """Stop the health checks."""
+        self._closed.set()
+        if self._probe_executor is not None:
+            self._probe_executor.shutdown(wait=False)
+
+    def endpoint_stats(self) -> List[Dict[str, Any]]:
+        """
+        Return the load and health of every endpoint.
+        """
+        with self._lock:
+            return [endpoint.to_dict() for endpoint in self.endpoints]
+
+    def _pick(self, tried: Set[PoolEndpoint]) -> Optional[PoolEndpoint]:
+        """
+        Choose the endpoint for the next attempt and count the request
+        against it. Returns None once every endpoint has been tried.
+        """
+        now = time.monotonic()
+        with self._lock:
+            untried = [endpoint for endpoint in self.endpoints if endpoint not in tried]
+            if not untried:
+                return None
+            candidates = [endpoint for endpoint in untried if self._available(endpoint, now)]
+            # With every endpoint ejected, trying one beats failing outright
+            candidates = candidates or untried
+
+            if self.routing == "ewma":
+                measured = [e.latency for e in candidates if e.latency is not None]
+                # Unmeasured endpoints are assumed as fast as the fastest one
+                default = min(measured) if measured else 0.0
+
+                def cost(endpoint):
+                    latency = endpoint.latency if endpoint.latency is not None else default
+                    return latency * (endpoint.outstanding + 1)
+            else:
+                def cost(endpoint):
+                    return endpoint.outstanding
+
+            lowest = min(cost(endpoint) for endpoint in candidates)
+            endpoint = random.choice([e for e in candidates if cost(e) == lowest])
+            endpoint.outstanding += 1
+            return endpoint
+
+    def _available(self, endpoint: PoolEndpoint, now: float) -> bool:
+        if endpoint.healthy:
+            return True
+        if not self.pool_config.health_interval and now >= endpoint.ejected_until:
+            # Without probes, readmit after the ejection time and let traffic decide
+            endpoint.healthy = True
+            endpoint.failures = 0
+            return True
+        return False
+
+    def _finish(
+        self,
+        endpoint: PoolEndpoint,
+        latency: Optional[float] = None,
+        failed: bool = False,
+        in_flight: bool = True
+    ) -> None:
+        """
+        Record the outcome of a request (or probe) on an endpoint.
+        """
+        with self._lock:
+            if in_flight:
+                endpoint.outstanding -= 1
+            if failed:
+                endpoint.failures += 1
+                if endpoint.healthy and endpoint.failures >= self.pool_config.failure_threshold:
+                    endpoint.healthy = False
+                    endpoint.ejected_until = time.monotonic() + self.pool_config.ejection_time
+                    print(f"RemoteAgentPool: ejected {endpoint.url} after {endpoint.failures} failures")
+                return
+            endpoint.failures = 0
+            if latency is not None:
+                if endpoint.latency is None:
+                    endpoint.latency = latency
+                else:
+                    endpoint.latency += self.pool_config.ewma_alpha * (latency - endpoint.latency)
+
+    @staticmethod
+    def _error_message(error: Exception) -> str:
+        response = getattr(error, "response", None)
+        if getattr(response, "status_code", None) == 401:
+            return "[RemoteAgentPool error: Authentication failed]"
+        return f"[RemoteAgentPool error: {str(error)}]"
+
+    def handle_message(self, message: str, **kwargs) -> str:
+        """
+        Send message to the least loaded endpoint, failing over to others.
+
+        :param message: The message to process
+        :param kwargs: Additional parameters to pass to the remote API
+        :return: Response from the remote agent
+        """
+        try:
+            return self.send_message(message, **kwargs)
+        except Exception as e:
+            return self._error_message(e)
+
+    def handle_message_stream(self, message: str, **kwargs) -> Iterator[str]:
+        """
+        Stream the response from the least loaded endpoint.
+        """
+        try:
+            yield from self.stream_message(message, **kwargs)
+        except Exception as e:
+            error_message = self._error_message(e)
+            print(error_message)
+            yield error_message
+
+    async def handle_message_async(self, message: str, **kwargs) -> str:
+        """
+        Awaitable variant of handle_message().
+        """
+        try:
+            return await self.send_message_async(message, **kwargs)
+        except Exception as e:
+            return self._error_message(e)
+
+    async def handle_message_stream_async(self, message: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Async-generator variant of handle_message_stream().
+        """
+        try:
+            async with aclosing(self.stream_message_async(message, **kwargs)) as chunks:
+                async for chunk in chunks:
+                    yield chunk
+        except Exception as e:
+            error_message = self._error_message(e)
+            print(error_message)
+            yield error_message
+
+    def send_message(self, message: str, **kwargs) -> str:
+        """
+        Send message to the least loaded endpoint, retrying retryable
+        failures on other endpoints. Raises the last error if every attempt
+        fails.
+        """
+        self._ensure_probing()
+        tried: Set[PoolEndpoint] = set()
+        error: Exception = ConnectionError("No remote agent endpoint is available.")
+        for _ in range(self.max_attempts):
+            endpoint = self._pick(tried)
+            if endpoint is None:
+                break
+            tried.add(endpoint)
+            start = time.monotonic()
+            try:
+                response = endpoint.agent.send_message(message, **kwargs)
+            except Exception as e:
+                retryable = is_retryable(e)
+                self._finish(endpoint, failed=retryable)
+                if not retryable:
+                    raise
+                error = e
+                continue
+            except BaseException:
+                self._finish(endpoint)
+                raise
+            self._finish(endpoint, latency=time.monotonic() - start)
+            return response
+        raise error
+
+    def stream_message(self, message: str, **kwargs) -> Iterator[str]:
+        """
+        Stream the response from the least loaded endpoint. A retryable
+        failure before the first chunk moves the request to another endpoint;
+        after that it is raised, since the chunks already yielded cannot be
+        taken back.
+        """
+        self._ensure_probing()
+        tried: Set[PoolEndpoint] = set()
+        error: Exception = ConnectionError("No remote agent endpoint is available.")
+        for _ in range(self.max_attempts):
+            endpoint = self._pick(tried)
+            if endpoint is None:
+                break
+            tried.add(endpoint)
+            start = time.monotonic()
+            first_chunk = None
+            failed = False
+            stream = endpoint.agent.stream_message(message, **kwargs)
+            try:
+                for chunk in stream:
+                    if first_chunk is None:
+                        first_chunk = time.monotonic() - start
+                    yield chunk
+            except Exception as e:
+                failed = is_retryable(e)
+                if first_chunk is not None or not failed:
+                    raise
+                error = e
+                continue
+            finally:
+                stream.close()
+                self._finish(endpoint, latency=first_chunk, failed=failed)
+            return
+        raise error
+
+    async def send_message_async(self, message: str, **kwargs) -> str:
+        """
+        Awaitable variant of send_message().
+        """
+        self._ensure_probing()
+        tried: Set[PoolEndpoint] = set()
+        error: Exception = ConnectionError("No remote agent endpoint is available.")
+        for _ in range(self.max_attempts):
+            endpoint = self._pick(tried)
+            if endpoint is None:
+                break
+            tried.add(endpoint)
+            start = time.monotonic()
+            try:
+                response = await endpoint.agent.send_message_async(message, **kwargs)
+            except Exception as e:
+                retryable = is_retryable(e)
+                self._finish(endpoint, failed=retryable)
+                if not retryable:
+                    raise
+                error = e
+                continue
+            except BaseException:
+                # Cancelled, which is not the endpoint's fault
+                self._finish(endpoint)
+                raise
+            self._finish(endpoint, latency=time.monotonic() - start)
+            return response
+        raise error
+
+    async def stream_message_async(self, message: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Async-generator variant of stream_message().
+        """
+        self._ensure_probing()
+        tried: Set[PoolEndpoint] = set()
+        error: Exception = ConnectionError("No remote agent endpoint is available.")
+        for _ in range(self.max_attempts):
+            endpoint = self._pick(tried)
+            if endpoint is None:
+                break
+            tried.add(endpoint)
+            start = time.monotonic()
+            first_chunk = None
+            failed = False
+            stream = endpoint.agent.stream_message_async(message, **kwargs)
+            try:
+                async for chunk in stream:
+                    if first_chunk is None:
+                        first_chunk = time.monotonic() - start
+                    yield chunk
+            except Exception as e:
+                failed = is_retryable(e)
+                if first_chunk is not None or not failed:
+                    raise
+                error = e
+                continue
+            finally:
+                await stream.aclose()
+                self._finish(endpoint, latency=first_chunk, failed=failed)
+            return
+        raise error
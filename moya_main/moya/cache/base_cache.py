@@ -0,0 +1,92 @@
+"""
+BaseResponseCache for Moya.
+
+Defines the interface for caches that store agent responses keyed by a
+normalized request, plus the hit/miss counters every backend keeps.
+"""
+
+import abc
+import threading
+from dataclasses import dataclass, field, fields
+from typing import Dict, Optional
+
+
+@dataclass
+class CacheStats:
+    """
+    Counters describing how a response cache has been used.
+    """
+    hits: int = 0
+    misses: int = 0
+    # Requests that skipped the cache, e.g. because temperature > 0
+    bypasses: int = 0
+    sets: int = 0
+    # Entries dropped to stay within the size limit
+    evictions: int = 0
+    # Lookups that found an entry past its TTL
+    expirations: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of cache lookups that were hits (0.0 if there were none)."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        data = {f.name: getattr(self, f.name) for f in fields(self) if not f.name.startswith("_")}
+        data["hit_rate"] = self.hit_rate
+        return data
+
+
+class BaseResponseCache(abc.ABC):
+    """
+    Abstract interface for a response cache. Keys are opaque strings built
+    by the caller (see AgentWrapper.request_key); values are response strings.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        """
+        :param ttl: Seconds an entry stays valid, or None for no expiry.
+        """
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive or None.")
+        self.ttl = ttl
+        self.stats = CacheStats()
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached response for key, or None if it is missing or expired.
+        Implementations record a hit or a miss in self.stats.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def set(self, key: str, response: str) -> None:
+        """
+        Store a response under key, replacing any existing entry.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        Remove the entry for key, if any.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """
+        Remove all entries.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        raise NotImplementedError
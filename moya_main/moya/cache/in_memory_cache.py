@@ -0,0 +1,69 @@
+"""
+InMemoryResponseCache for Moya.
+
+A bounded, thread-safe LRU cache with an optional TTL, held in process memory.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from moya.cache.base_cache import BaseResponseCache
+
+
+class InMemoryResponseCache(BaseResponseCache):
+    """
+    Keeps up to max_entries responses, evicting the least recently used
+    one when full. Expired entries are dropped when they are looked up.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        """
+        :param max_entries: Maximum number of cached responses.
+        :param ttl: Seconds an entry stays valid, or None for no expiry.
+        """
+        super().__init__(ttl=ttl)
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self.max_entries = max_entries
+        # key -> (expires_at, response); expires_at is None without a TTL
+        self._entries: "OrderedDict[str, Tuple[Optional[float], str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, response = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.stats.record("hits")
+                    return response
+                del self._entries[key]
+                self.stats.record("expirations")
+        self.stats.record("misses")
+        return None
+
+    def set(self, key: str, response: str) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        evicted = 0
+        with self._lock:
+            self._entries[key] = (expires_at, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        self.stats.record("sets")
+        if evicted:
+            self.stats.record("evictions", evicted)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,126 @@
+"""
+SQLiteResponseCache for Moya.
+
+A response cache persisted in a SQLite database, so cached responses
+survive restarts and can be shared by processes on the same machine.
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Optional
+from moya.cache.base_cache import BaseResponseCache
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key         TEXT PRIMARY KEY,
+    response    TEXT NOT NULL,
+    expires_at  REAL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+_SELECT = "SELECT response, expires_at FROM responses WHERE key = ?"
+_TOUCH = "UPDATE responses SET accessed_at = ? WHERE key = ?"
+_UPSERT = "INSERT OR REPLACE INTO responses (key, response, expires_at, accessed_at) VALUES (?, ?, ?, ?)"
+_DELETE = "DELETE FROM responses WHERE key = ?"
+_DELETE_ALL = "DELETE FROM responses"
+_DELETE_EXPIRED = "DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?"
+_DELETE_LEAST_RECENT = (
+    "DELETE FROM responses WHERE key IN "
+    "(SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)"
+)
+_COUNT = "SELECT COUNT(*) FROM responses"
+
+
+class SQLiteResponseCache(BaseResponseCache):
+    """
+    Stores responses in a SQLite table. Expiry uses wall-clock time so it
+    holds across restarts. When max_entries is set, the least recently used
+    entries are pruned every prune_interval writes, so the table may briefly
+    exceed the limit by up to that many rows.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        prune_interval: int = 64
+    ):
+        """
+        :param db_path: Path of the SQLite database file (":memory:" for a private in-memory database).
+        :param ttl: Seconds an entry stays valid, or None for no expiry.
+        :param max_entries: Maximum number of cached responses, or None for no limit.
+        :param prune_interval: Number of writes between pruning passes.
+        """
+        super().__init__(ttl=ttl)
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("max_entries must be at least 1 or None.")
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.prune_interval = max(1, prune_interval)
+        self._writes = 0
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(_SELECT, (key,)).fetchone()
+            if row is not None:
+                response, expires_at = row
+                if expires_at is None or expires_at > now:
+                    self._conn.execute(_TOUCH, (now, key))
+                    self.stats.record("hits")
+                    return response
+                self._conn.execute(_DELETE, (key,))
+                self.stats.record("expirations")
+        self.stats.record("misses")
+        return None
+
+    def set(self, key: str, response: str) -> None:
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._conn.execute(_UPSERT, (key, response, expires_at, now))
+            self._writes += 1
+            if self._writes % self.prune_interval == 0:
+                self.prune()
+        self.stats.record("sets")
+
+    def prune(self) -> None:
+        """
+        Delete expired entries and, if max_entries is set, the least recently
+        used entries beyond it.
+        """
+        with self._lock:
+            self._conn.execute(_DELETE_EXPIRED, (time.time(),))
+            if self.max_entries is not None:
+                evicted = self._conn.execute(_DELETE_LEAST_RECENT, (self.max_entries,)).rowcount
+                if evicted > 0:
+                    self.stats.record("evictions", evicted)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(_DELETE, (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(_DELETE_ALL)
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(_COUNT).fetchone()[0]
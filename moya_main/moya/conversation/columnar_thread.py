@@ -0,0 +1,164 @@
+"""
+ColumnarThread model for Moya.
+
+A Thread that stores its messages column by column instead of as a list of
+Message objects, for long-lived "hot" threads that stay resident in memory:
+
+- sender names are interned to small integer ids,
+- timestamps live in an ``array('q')`` of epoch microseconds,
+- contents are concatenated into one UTF-8 buffer indexed by an offsets array,
+- message ids, metadata and the time zones of aware timestamps are stored
+  sparsely, since most messages have none.
+
+Messages are materialized on access as FrozenMessage objects, so code that
+works on ``thread.messages`` (slicing, iterating, ``len``) runs unchanged.
+"""
+
+import json
+from array import array
+from collections.abc import Sequence
+from datetime import tzinfo
+from typing import Dict, List, Optional, Union
+from moya.conversation.message import Message, FrozenMessage, _from_epoch_us
+from moya.conversation.thread import Thread
+
+
+class _MessageColumns(Sequence):
+    """
+    Read-only sequence view over a ColumnarThread's columns. Indexing builds
+    a single message; slicing builds only the messages in the slice.
+    """
+
+    __slots__ = ("_thread",)
+
+    def __init__(self, thread: "ColumnarThread"):
+        self._thread = thread
+
+    def __len__(self) -> int:
+        return len(self._thread._timestamps)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self._thread._message_at(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("message index out of range")
+        return self._thread._message_at(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._thread._message_at(i)
+
+
+class ColumnarThread(Thread):
+    """
+    A conversation thread backed by compact columns rather than Message objects.
+
+    Exposes the same API as Thread. ``messages`` is a read-only sequence view;
+    add messages with add_message(). Messages read back are immutable copies.
+    """
+
+    __slots__ = (
+        "_sender_ids", "_sender_names", "_senders", "_timestamps",
+        "_content", "_content_offsets", "_char_offsets",
+        "_structured", "_message_ids", "_message_metadata", "_timezones",
+    )
+
+    def _reset_columns(self) -> None:
+        self._sender_ids: Dict[str, int] = {}
+        self._sender_names: List[str] = []
+        self._senders = array('I')
+        self._timestamps = array('q')
+        self._content = bytearray()
+        # Both offset arrays hold one more entry than there are messages, so
+        # message i spans [offsets[i], offsets[i + 1]).
+        self._content_offsets = array('q', [0])
+        self._char_offsets = array('q', [0])
+        # Sparse columns, keyed by message ordinal
+        self._structured = set()
+        self._message_ids: Dict[int, str] = {}
+        self._message_metadata: Dict[int, dict] = {}
+        # Time zones of aware timestamps
+        self._timezones: Dict[int, tzinfo] = {}
+
+    @property
+    def messages(self) -> Sequence:
+        return _MessageColumns(self)
+
+    @messages.setter
+    def messages(self, messages: List[Message]) -> None:
+        self._reset_columns()
+        for message in messages:
+            self._append(message)
+
+    def _append(self, message: Message) -> None:
+        ordinal = len(self._timestamps)
+
+        sender_id = self._sender_ids.get(message.sender)
+        if sender_id is None:
+            sender_id = self._sender_ids[message.sender] = len(self._sender_names)
+            self._sender_names.append(message.sender)
+
+        content = message.content
+        if not isinstance(content, str):
+            # Structured content (list/dict) is stored as JSON text
+            content = json.dumps(content)
+            self._structured.add(ordinal)
+        self._content += content.encode("utf-8")
+        self._content_offsets.append(len(self._content))
+        self._char_offsets.append(self._char_offsets[-1] + len(content))
+
+        if message.message_id is not None:
+            self._message_ids[ordinal] = message.message_id
+        if message._tzinfo is not None:
+            self._timezones[ordinal] = message._tzinfo
+        if message._metadata:
+            # Copied, so later changes to the caller's dict do not reach the thread
+            self._message_metadata[ordinal] = dict(message._metadata)
+
+        # The timestamps column defines the thread length, so it is extended
+        # last: readers never see a message whose other columns are missing.
+        self._senders.append(sender_id)
+        self._timestamps.append(message.timestamp_us)
+
+    def _message_at(self, ordinal: int) -> FrozenMessage:
+        content = self._content[self._content_offsets[ordinal]:self._content_offsets[ordinal + 1]].decode("utf-8")
+        if ordinal in self._structured:
+            content = json.loads(content)
+        return FrozenMessage(
+            thread_id=self.thread_id,
+            sender=self._sender_names[self._senders[ordinal]],
+            content=content,
+            message_id=self._message_ids.get(ordinal),
+            timestamp=_from_epoch_us(self._timestamps[ordinal], self._timezones.get(ordinal)),
+            metadata=self._message_metadata.get(ordinal)
+        )
+
+    def add_message(self, message: Message) -> None:
+        """
+        Append a new message to this thread. The message must
+        have a matching thread_id.
+        """
+        if message.thread_id != self.thread_id:
+            raise ValueError(
+                f"Message thread_id {message.thread_id} does not match "
+                f"this Thread's thread_id {self.thread_id}."
+            )
+        self._append(message)
+
+    def char_count(self, start: int = 0, end: Optional[int] = None) -> int:
+        """
+        Return the number of content characters in messages [start, end),
+        in O(1) using prefix sums. Structured content counts as its JSON text.
+        """
+        start, end, _ = slice(start, end).indices(len(self._timestamps))
+        if start >= end:
+            return 0
+        return self._char_offsets[end] - self._char_offsets[start]
+
+    def senders(self) -> List[str]:
+        """
+        Return the distinct senders in this thread, in order of first appearance.
+        """
+        return list(self._sender_names)
@@ -2,16 +2,45 @@
 Message model for Moya.
 
 Represents a single message within a conversation thread.
+
+Messages are slotted to keep resident conversation history compact: the
+timestamp is held as integer microseconds since the Unix epoch (UTC) and
+the metadata dict is only allocated when it is first needed.
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta, timezone, tzinfo
+from types import MappingProxyType
 import json
 from typing import Optional, Dict, Any, Union
 
+# Naive UTC epoch, matching the naive UTC datetimes produced by utcnow()
+_EPOCH = datetime(1970, 1, 1)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+_EMPTY_METADATA = MappingProxyType({})
+
+
+def _to_epoch_us(timestamp: datetime) -> int:
+    """Convert a datetime to integer microseconds since the Unix epoch (UTC)."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return (timestamp - _EPOCH) // _ONE_MICROSECOND
+
+
+def _from_epoch_us(timestamp_us: int, tzinfo: Optional[tzinfo] = None) -> datetime:
+    """
+    Convert microseconds since the Unix epoch back to a datetime: naive UTC,
+    or in the given time zone.
+    """
+    timestamp = _EPOCH + timedelta(microseconds=timestamp_us)
+    if tzinfo is None:
+        return timestamp
+    return timestamp.replace(tzinfo=timezone.utc).astimezone(tzinfo)
+
+
 class Message:
     """
     A single message in a conversation thread.
-    
+
     Attributes:
         message_id (str): A unique identifier for this message (optional).
         thread_id (str): The ID of the thread this message belongs to.
@@ -19,11 +48,15 @@ class Message:
                       (e.g., "user", "system", "agent_name").
         content (Union[str, list, dict]): The content of the message, can be a string
                                           or structured content.
-        timestamp (datetime): When the message was created.
-        metadata (dict): Any additional structured data for this message 
+        timestamp (datetime): When the message was created. Naive datetimes are
+                              taken as UTC; aware ones keep their time zone.
+        timestamp_us (int): The same instant as microseconds since the Unix epoch.
+        metadata (dict): Any additional structured data for this message
                          (e.g., role info, model parameters, etc.).
     """
 
+    __slots__ = ("message_id", "thread_id", "sender", "content", "timestamp_us", "_tzinfo", "_metadata")
+
     def __init__(
         self,
         thread_id: str,
@@ -37,18 +70,41 @@ class Message:
         self.thread_id = thread_id
         self.sender = sender
         self.content = content
-        self.timestamp = timestamp or datetime.utcnow()
-        self.metadata = metadata or {}
+        timestamp = timestamp or datetime.utcnow()
+        self.timestamp_us = _to_epoch_us(timestamp)
+        # Time zone of an aware timestamp, restored when it is read back
+        self._tzinfo = timestamp.tzinfo
+        # Empty metadata is stored as None until someone asks for the dict
+        self._metadata = metadata or None
+
+    @property
+    def timestamp(self) -> datetime:
+        return _from_epoch_us(self.timestamp_us, self._tzinfo)
+
+    @timestamp.setter
+    def timestamp(self, value: datetime) -> None:
+        self.timestamp_us = _to_epoch_us(value)
+        self._tzinfo = value.tzinfo
+
+    @property
+    def metadata(self) -> dict:
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, value: Optional[dict]) -> None:
+        self._metadata = value or None
 
     def __repr__(self) -> str:
         return (
-            f"Message("
+            f"{type(self).__name__}("
             f"thread_id={self.thread_id!r}, "
             f"sender={self.sender!r}, "
             f"content={self.content!r}, "
             f"timestamp={self.timestamp.isoformat()!r}, "
             f"message_id={self.message_id!r}, "
-            f"metadata={self.metadata!r}"
+            f"metadata={dict(self._metadata or {})!r}"
             f")"
         )
 
@@ -63,10 +119,40 @@ class Message:
             formatted_content = self.content
         else:
             formatted_content = str(self.content)
-            
+
         return {
             "role": self.sender.lower(),  # Ensure role is lowercase
             "content": formatted_content,  # Use the content as-is
             "timestamp": self.timestamp.isoformat(),  # Convert datetime to string
-            "metadata": self.metadata  # Keep metadata as-is
-        }
\ No newline at end of file
+            "metadata": self._metadata or {}  # Keep metadata as-is
+        }
+
+
+class FrozenMessage(Message):
+    """
+    An immutable Message. Attributes cannot be reassigned after construction
+    and metadata is copied into a read-only mapping, so frozen messages can
+    be shared safely between threads and caches.
+    """
+
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # _metadata is the last slot Message.__init__ assigns
+        if hasattr(self, "_metadata"):
+            raise AttributeError(f"{type(self).__name__} is immutable.")
+        if name == "_metadata" and value is not None:
+            value = MappingProxyType(dict(value))
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable.")
+
+    @property
+    def metadata(self) -> MappingProxyType:
+        return self._metadata if self._metadata is not None else _EMPTY_METADATA
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        data["metadata"] = dict(data["metadata"])
+        return data
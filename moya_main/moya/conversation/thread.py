@@ -21,6 +21,8 @@ class Thread:
         metadata (dict): Any additional info or context about this thread.
     """
 
+    __slots__ = ("thread_id", "created_at", "messages", "participants", "metadata")
+
     def __init__(
         self,
         thread_id: str,
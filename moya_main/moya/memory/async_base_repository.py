@@ -0,0 +1,110 @@
+"""
+Async base repository for conversation memory in Moya.
+
+Defines the coroutine counterpart of BaseMemoryRepository, for use from
+asyncio applications where blocking I/O on the event loop thread would
+stall every other in-flight request.
+"""
+
+import abc
+from typing import AsyncIterator, Optional, List
+from moya.conversation.thread import Thread
+from moya.conversation.message import Message
+
+
+class AsyncBaseMemoryRepository(abc.ABC):
+    """
+    Abstract async interface for storing and retrieving conversation threads
+    (and messages within those threads). Mirrors BaseMemoryRepository method
+    for method, with every operation awaitable.
+    """
+
+    @abc.abstractmethod
+    async def create_thread(self, thread: Thread) -> None:
+        """
+        Store a new thread in the repository.
+        """
+        pass
+
+    async def ensure_thread(self, thread_id: str) -> None:
+        """
+        Create an empty thread with this ID unless one already exists.
+
+        :param thread_id: The ID of the thread that must exist.
+        """
+        if await self.get_thread(thread_id) is None:
+            try:
+                await self.create_thread(Thread(thread_id=thread_id))
+            except ValueError:
+                # Created by a concurrent caller in the meantime
+                pass
+
+    @abc.abstractmethod
+    async def get_thread(self, thread_id: str) -> Optional[Thread]:
+        """
+        Retrieve a thread by its ID.
+
+        :param thread_id: The unique ID of the thread to fetch.
+        :return: The Thread object if found, else None.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def append_message(self, thread_id: str, message: Message) -> None:
+        """
+        Add a new message to an existing thread.
+
+        :param thread_id: The ID of the thread to which we add a message.
+        :param message: The message to append.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def list_threads(self) -> List[str]:
+        """
+        List the IDs of all threads currently stored.
+
+        :return: A list of thread_id strings.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def delete_thread(self, thread_id: str) -> None:
+        """
+        Remove a thread (and its messages) from the repository.
+
+        :param thread_id: The ID of the thread to remove.
+        """
+        pass
+
+    async def get_last_n_messages(self, thread_id: str, n: int = 5) -> List[Message]:
+        """
+        Retrieve the last n messages of a thread.
+
+        :param thread_id: The ID of the thread to read from.
+        :param n: The number of most recent messages to return.
+        :return: Up to n messages, oldest first. Empty if the thread is missing.
+        """
+        if n <= 0:
+            return []
+        return [message async for message in self.iter_messages(thread_id, -n)]
+
+    async def iter_messages(
+        self,
+        thread_id: str,
+        start: int = 0,
+        end: Optional[int] = None
+    ) -> AsyncIterator[Message]:
+        """
+        Iterate over the messages of a thread with ordinals in [start, end).
+        Negative indices count from the end of the thread, as in slicing.
+
+        :param thread_id: The ID of the thread to read from.
+        :param start: Ordinal of the first message to return.
+        :param end: Ordinal one past the last message to return (None for the end).
+        :return: An async iterator over the selected messages, oldest first.
+        """
+        thread = await self.get_thread(thread_id)
+        if thread:
+            for message in thread.messages[start:end]:
+                yield message
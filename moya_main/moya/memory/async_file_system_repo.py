@@ -0,0 +1,180 @@
+"""
+AsyncFileSystemRepository for conversation memory in Moya.
+
+An implementation of AsyncBaseMemoryRepository using aiofiles. It reads and
+writes the same on-disk layout as FileSystemRepository (JSON-lines thread
+files plus ``.idx`` offset indexes), so the two can be used interchangeably
+on one directory.
+"""
+
+import asyncio
+from array import array
+from typing import AsyncIterator, Optional, List
+
+import aiofiles
+import aiofiles.os
+
+from moya.conversation.thread import Thread
+from moya.conversation.message import Message
+from moya.memory.async_base_repository import AsyncBaseMemoryRepository
+from moya.memory.file_system_repo import FileSystemRepository, _OFFSET_SIZE
+
+
+class AsyncFileSystemRepository(AsyncBaseMemoryRepository):
+    """
+    Maintains threads as JSON files on disk without blocking the event loop.
+    Writes to the same thread are serialized by lock stripes keyed on
+    thread_id, so an append's data and index entries are never interleaved
+    with another append's.
+    """
+
+    def __init__(self, base_path: str, num_stripes: int = 64):
+        """Initialize the repository with a base directory path."""
+        self.base_path = base_path
+        # Shares the path layout and serialization with the sync repository
+        self._files = FileSystemRepository(base_path)
+        self._stripes = [asyncio.Lock() for _ in range(num_stripes)]
+
+    def _lock_for(self, thread_id: str) -> asyncio.Lock:
+        return self._stripes[hash(thread_id) % len(self._stripes)]
+
+    async def _rebuild_index(self, thread_id: str) -> array:
+        # Full rescans are rare (legacy or interrupted files); run them off the loop
+        return await asyncio.to_thread(self._files._rebuild_index, thread_id)
+
+    async def _create_thread(self, thread: Thread) -> None:
+        file_path = self._files._thread_file_path(thread.thread_id)
+        if await aiofiles.os.path.exists(file_path):
+            # Thread already exists, just return without error
+            return
+
+        data, offsets = self._files._encode_thread(thread)
+        async with aiofiles.open(file_path, 'wb') as f:
+            await f.write(data)
+        async with aiofiles.open(self._files._index_file_path(thread.thread_id), 'wb') as idx:
+            await idx.write(offsets.tobytes())
+
+    async def create_thread(self, thread: Thread) -> None:
+        """
+        Store a new thread. If the thread already exists, silently succeeds
+        without overwriting the existing thread.
+        """
+        async with self._lock_for(thread.thread_id):
+            await self._create_thread(thread)
+
+    async def ensure_thread(self, thread_id: str) -> None:
+        """
+        Create an empty thread file unless the thread already exists.
+        """
+        await self.create_thread(Thread(thread_id=thread_id))
+
+    async def get_thread(self, thread_id: str) -> Optional[Thread]:
+        """
+        Retrieve a thread by ID or return None if not found.
+        """
+        file_path = self._files._thread_file_path(thread_id)
+        if not await aiofiles.os.path.exists(file_path):
+            return None
+
+        try:
+            async with aiofiles.open(file_path, 'rb') as f:
+                data = await f.read()
+            return self._files._parse_thread(thread_id, data)
+        except Exception as e:
+            # Return an empty thread as fallback
+            print(f"Error loading thread {thread_id}: {e}")
+            return Thread(thread_id=thread_id, metadata={})
+
+    async def append_message(self, thread_id: str, message: Message) -> None:
+        """
+        Append a message to an existing thread. Creates the thread if it doesn't exist.
+        """
+        file_path = self._files._thread_file_path(thread_id)
+        index_path = self._files._index_file_path(thread_id)
+        line = self._files._encode_message(message)
+
+        async with self._lock_for(thread_id):
+            if not await aiofiles.os.path.exists(file_path):
+                await self._create_thread(Thread(thread_id=thread_id))
+            elif not await aiofiles.os.path.exists(index_path):
+                await self._rebuild_index(thread_id)
+
+            try:
+                async with aiofiles.open(file_path, 'ab') as f:
+                    offset = await f.tell()
+                    await f.write(line)
+                async with aiofiles.open(index_path, 'ab') as idx:
+                    await idx.write(array('q', [offset]).tobytes())
+            except Exception as e:
+                raise ValueError(f"Failed to append message to thread {thread_id}: {str(e)}")
+
+    async def _message_count(self, thread_id: str) -> int:
+        try:
+            size = await aiofiles.os.path.getsize(self._files._index_file_path(thread_id))
+        except OSError:
+            return len(await self._rebuild_index(thread_id))
+        return size // _OFFSET_SIZE
+
+    async def _read_lines(self, thread_id: str, start: int, end: int, count: int) -> Optional[List[bytes]]:
+        offsets = array('q')
+        async with aiofiles.open(self._files._index_file_path(thread_id), 'rb') as idx:
+            await idx.seek(start * _OFFSET_SIZE)
+            offsets.frombytes(await idx.read((min(end + 1, count) - start) * _OFFSET_SIZE))
+
+        async with aiofiles.open(self._files._thread_file_path(thread_id), 'rb') as f:
+            await f.seek(offsets[0])
+            if end < count:
+                data = await f.read(offsets[-1] - offsets[0])
+            else:
+                data = await f.read()
+
+        lines = self._files._range_lines(data, start, end, count)
+        if lines is None:
+            await self._rebuild_index(thread_id)
+        return lines
+
+    async def iter_messages(
+        self,
+        thread_id: str,
+        start: int = 0,
+        end: Optional[int] = None
+    ) -> AsyncIterator[Message]:
+        """
+        Iterate over messages with ordinals in [start, end) without loading the
+        rest of the thread. Negative indices count from the end, as in slicing.
+        """
+        if not await aiofiles.os.path.exists(self._files._thread_file_path(thread_id)):
+            return
+
+        requested = slice(start, end)
+        lines = None
+        while lines is None:
+            count = await self._message_count(thread_id)
+            start, end, _ = requested.indices(count)
+            if start >= end:
+                return
+            lines = await self._read_lines(thread_id, start, end, count)
+
+        for line in lines:
+            msg = self._files._decode_message(thread_id, line)
+            if msg is not None:
+                yield msg
+
+    async def list_threads(self) -> List[str]:
+        """Return a list of all thread IDs"""
+        try:
+            filenames = await aiofiles.os.listdir(self.base_path)
+        except OSError:
+            # Handle directory access errors
+            return []
+        return [filename[:-5] for filename in filenames if filename.endswith(".json")]
+
+    async def delete_thread(self, thread_id: str) -> None:
+        """Delete a thread file and its index if they exist"""
+        async with self._lock_for(thread_id):
+            for file_path in (self._files._thread_file_path(thread_id), self._files._index_file_path(thread_id)):
+                try:
+                    await aiofiles.os.remove(file_path)
+                except OSError:
+                    # Silently handle missing files and deletion errors
+                    pass
@@ -0,0 +1,249 @@
+"""
+AsyncSQLiteMemoryRepository for conversation memory in Moya.
+
+An implementation of AsyncBaseMemoryRepository using aiosqlite. It shares
+its schema and statements with SQLiteMemoryRepository, so a database written
+by one can be read by the other, and uses the same WAL mode and
+group-commit window for appends.
+"""
+
+import asyncio
+import json
+from typing import AsyncIterator, Dict, Optional, List
+
+import aiosqlite
+
+from moya.conversation.thread import Thread
+from moya.conversation.message import Message
+from moya.memory.async_base_repository import AsyncBaseMemoryRepository
+from moya.memory.sqlite_repository import (
+    SQLiteMemoryRepository,
+    _SCHEMA,
+    _INSERT_THREAD,
+    _SELECT_THREAD,
+    _INSERT_MESSAGE,
+    _SELECT_MAX_ORDINAL,
+    _SELECT_MESSAGES,
+    _SELECT_LAST_MESSAGES,
+    _MAX_ORDINAL,
+    _LIST_THREADS,
+    _DELETE_MESSAGES,
+    _DELETE_THREAD,
+)
+
+
+class AsyncSQLiteMemoryRepository(AsyncBaseMemoryRepository):
+    """
+    Maintains threads and messages in a SQLite database without blocking
+    the event loop. The connection is opened lazily on first use; call
+    close() on shutdown to commit any appends still in the window.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        commit_interval: float = 0.05,
+        commit_batch_size: int = 256
+    ):
+        """
+        Initialize the repository.
+
+        :param db_path: Path of the SQLite database file.
+        :param commit_interval: Maximum number of seconds an append may wait for
+                                its commit. 0 commits every append immediately.
+        :param commit_batch_size: Number of pending appends that forces a commit.
+        """
+        self.db_path = db_path
+        self.commit_interval = commit_interval
+        self.commit_batch_size = commit_batch_size
+
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._connect_lock = asyncio.Lock()
+        # Serializes ordinal assignment and commits across coroutines
+        self._write_lock = asyncio.Lock()
+        self._next_ordinal: Dict[str, int] = {}
+        self._pending = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def _connection(self) -> aiosqlite.Connection:
+        if self._conn is None:
+            async with self._connect_lock:
+                if self._conn is None:
+                    conn = await aiosqlite.connect(self.db_path, cached_statements=64)
+                    await conn.execute("PRAGMA journal_mode=WAL")
+                    await conn.execute("PRAGMA synchronous=NORMAL")
+                    await conn.executescript(_SCHEMA)
+                    await conn.commit()
+                    self._conn = conn
+        return self._conn
+
+    async def _ordinal_for(self, conn: aiosqlite.Connection, thread_id: str) -> int:
+        """Return the next message ordinal for a thread"""
+        ordinal = self._next_ordinal.get(thread_id)
+        if ordinal is None:
+            async with conn.execute(_SELECT_MAX_ORDINAL, (thread_id,)) as cursor:
+                (last,) = await cursor.fetchone()
+            ordinal = 0 if last is None else last + 1
+        return ordinal
+
+    async def _insert_thread(self, conn: aiosqlite.Connection, thread: Thread) -> bool:
+        """Insert a thread row, returning False if the thread already existed"""
+        async with conn.execute(
+            _INSERT_THREAD,
+            (thread.thread_id, thread.created_at.isoformat(), json.dumps(thread.metadata))
+        ) as cursor:
+            return cursor.rowcount > 0
+
+    async def _insert_message(self, conn: aiosqlite.Connection, thread_id: str, message: Message) -> None:
+        ordinal = await self._ordinal_for(conn, thread_id)
+        await conn.execute(_INSERT_MESSAGE, (
+            thread_id,
+            ordinal,
+            message.message_id,
+            message.sender,
+            json.dumps(message.content),  # Keep content in its original format
+            message.timestamp.isoformat(),
+            json.dumps(dict(message.metadata or {}))
+        ))
+        # Advanced only once the row is in, so a failed insert leaves no gap
+        self._next_ordinal[thread_id] = ordinal + 1
+
+    async def _write_done(self, conn: aiosqlite.Connection, count: int = 1) -> None:
+        """Record pending writes and commit them if the group-commit window is full."""
+        self._pending += count
+        if self.commit_interval <= 0 or self._pending >= self.commit_batch_size:
+            await self._commit(conn)
+        elif self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.commit_interval, self._schedule_flush)
+
+    def _schedule_flush(self) -> None:
+        self._flush_handle = None
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._flush_task = asyncio.ensure_future(self.flush())
+
+    async def _commit(self, conn: aiosqlite.Connection) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        await conn.commit()
+        self._pending = 0
+
+    async def flush(self) -> None:
+        """Commit any appends still waiting for their group commit."""
+        if self._conn is None:
+            return
+        async with self._write_lock:
+            if self._pending:
+                await self._commit(self._conn)
+
+    async def close(self) -> None:
+        """Commit pending appends and close the database connection."""
+        if self._conn is None:
+            return
+        await self.flush()
+        await self._conn.close()
+        self._conn = None
+
+    async def create_thread(self, thread: Thread) -> None:
+        """
+        Store a new thread. If the thread already exists, silently succeeds
+        without overwriting the existing thread.
+        """
+        conn = await self._connection()
+        async with self._write_lock:
+            if await self._insert_thread(conn, thread):
+                for msg in thread.messages:
+                    await self._insert_message(conn, thread.thread_id, msg)
+                await self._write_done(conn, 1 + len(thread.messages))
+
+    async def ensure_thread(self, thread_id: str) -> None:
+        """
+        Create an empty thread unless the thread already exists.
+        """
+        if thread_id in self._next_ordinal:
+            return
+        conn = await self._connection()
+        async with self._write_lock:
+            if await self._insert_thread(conn, Thread(thread_id=thread_id)):
+                await self._write_done(conn)
+
+    async def get_thread(self, thread_id: str) -> Optional[Thread]:
+        """
+        Retrieve a thread by ID or return None if not found.
+        """
+        conn = await self._connection()
+        async with conn.execute(_SELECT_THREAD, (thread_id,)) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        rows = await conn.execute_fetchall(_SELECT_MESSAGES, (thread_id, 0, _MAX_ORDINAL))
+
+        thread = Thread(thread_id=thread_id, metadata=json.loads(row[0]))
+        thread.messages = [SQLiteMemoryRepository._row_to_message(thread_id, r) for r in rows]
+        return thread
+
+    async def iter_messages(
+        self,
+        thread_id: str,
+        start: int = 0,
+        end: Optional[int] = None
+    ) -> AsyncIterator[Message]:
+        """
+        Iterate over messages with ordinals in [start, end). Negative indices
+        count from the end of the thread, as in slicing.
+        """
+        conn = await self._connection()
+        if start < 0 or (end is not None and end < 0):
+            count = self._next_ordinal.get(thread_id)
+            if count is None:
+                async with conn.execute(_SELECT_MAX_ORDINAL, (thread_id,)) as cursor:
+                    (last,) = await cursor.fetchone()
+                count = 0 if last is None else last + 1
+            start, end, _ = slice(start, end).indices(count)
+        elif end is None:
+            end = _MAX_ORDINAL
+
+        async with conn.execute(_SELECT_MESSAGES, (thread_id, start, end)) as cursor:
+            async for row in cursor:
+                yield SQLiteMemoryRepository._row_to_message(thread_id, row)
+
+    async def get_last_n_messages(self, thread_id: str, n: int = 5) -> List[Message]:
+        """
+        Return the last n messages of a thread.
+        """
+        if n <= 0:
+            return []
+        conn = await self._connection()
+        rows = await conn.execute_fetchall(_SELECT_LAST_MESSAGES, (thread_id, n))
+        return [SQLiteMemoryRepository._row_to_message(thread_id, r) for r in reversed(rows)]
+
+    async def append_message(self, thread_id: str, message: Message) -> None:
+        """
+        Append a message to an existing thread. Creates the thread if it doesn't exist.
+        """
+        conn = await self._connection()
+        try:
+            async with self._write_lock:
+                created = False
+                if thread_id not in self._next_ordinal:
+                    created = await self._insert_thread(conn, Thread(thread_id=thread_id))
+                await self._insert_message(conn, thread_id, message)
+                await self._write_done(conn, 2 if created else 1)
+        except aiosqlite.Error as e:
+            raise ValueError(f"Failed to append message to thread {thread_id}: {str(e)}")
+
+    async def list_threads(self) -> List[str]:
+        """Return a list of all thread IDs"""
+        conn = await self._connection()
+        return [row[0] for row in await conn.execute_fetchall(_LIST_THREADS)]
+
+    async def delete_thread(self, thread_id: str) -> None:
+        """Delete a thread and its messages if they exist"""
+        conn = await self._connection()
+        async with self._write_lock:
+            await conn.execute(_DELETE_MESSAGES, (thread_id,))
+            await conn.execute(_DELETE_THREAD, (thread_id,))
+            self._next_ordinal.pop(thread_id, None)
+            await self._write_done(conn)
@@ -6,7 +6,7 @@ Threads (and their Messages).
 """
 
 import abc
-from typing import Optional, List
+from typing import Iterator, Optional, List
 from moya.conversation.thread import Thread
 from moya.conversation.message import Message
 
@@ -26,6 +26,23 @@ class BaseMemoryRepository(abc.ABC):
         """
         pass
 
+    def ensure_thread(self, thread_id: str) -> None:
+        """
+        Create an empty thread with this ID unless one already exists.
+
+        The default implementation checks and then creates, tolerating a
+        concurrent creation of the same thread; repositories that can do
+        this atomically should override it.
+
+        :param thread_id: The ID of the thread that must exist.
+        """
+        if self.get_thread(thread_id) is None:
+            try:
+                self.create_thread(Thread(thread_id=thread_id))
+            except ValueError:
+                # Created by a concurrent caller in the meantime
+                pass
+
     @abc.abstractmethod
     def get_thread(self, thread_id: str) -> Optional[Thread]:
         """
@@ -63,3 +80,42 @@ class BaseMemoryRepository(abc.ABC):
         :param thread_id: The ID of the thread to remove.
         """
         pass
+
+    def get_last_n_messages(self, thread_id: str, n: int = 5) -> List[Message]:
+        """
+        Retrieve the last n messages of a thread.
+
+        The default implementation loads the whole thread; repositories that
+        can read the tail of a thread directly should override it so the cost
+        depends on n rather than on the thread length.
+
+        :param thread_id: The ID of the thread to read from.
+        :param n: The number of most recent messages to return.
+        :return: Up to n messages, oldest first. Empty if the thread is missing.
+        """
+        if n <= 0:
+            return []
+        return list(self.iter_messages(thread_id, -n))
+
+    def iter_messages(
+        self,
+        thread_id: str,
+        start: int = 0,
+        end: Optional[int] = None
+    ) -> Iterator[Message]:
+        """
+        Iterate over the messages of a thread with ordinals in [start, end).
+        Negative indices count from the end of the thread, as in slicing.
+
+        The default implementation loads the whole thread; repositories should
+        override it when they can read a range of messages directly.
+
+        :param thread_id: The ID of the thread to read from.
+        :param start: Ordinal of the first message to return.
+        :param end: Ordinal one past the last message to return (None for the end).
+        :return: An iterator over the selected messages, oldest first.
+        """
+        thread = self.get_thread(thread_id)
+        if not thread:
+            return iter(())
+        return iter(thread.messages[start:end])
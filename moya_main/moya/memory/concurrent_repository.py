@@ -0,0 +1,93 @@
+"""
+ConcurrentInMemoryRepository for conversation memory in Moya.
+
+A thread-safe variant of InMemoryRepository for servers that handle
+requests concurrently (e.g. FastAPI with a thread pool). Locks are striped
+by thread_id hash, so operations on unrelated threads never contend with
+each other while operations on the same thread are serialized.
+"""
+
+import threading
+from typing import Dict, Iterator, Optional, List
+from moya.conversation.thread import Thread
+from moya.conversation.message import Message
+from moya.memory.base_repository import BaseMemoryRepository
+
+
+class ConcurrentInMemoryRepository(BaseMemoryRepository):
+    """
+    Maintains an in-memory dictionary of Thread objects guarded by a
+    fixed pool of lock stripes.
+    Dictionary Key: thread_id, Value: Thread
+    """
+
+    def __init__(self, num_stripes: int = 64):
+        """
+        :param num_stripes: Number of locks to spread threads over. More stripes
+                            mean fewer unrelated threads share a lock.
+        """
+        if num_stripes < 1:
+            raise ValueError("num_stripes must be at least 1.")
+        self._threads: Dict[str, Thread] = {}
+        self._stripes = [threading.Lock() for _ in range(num_stripes)]
+
+    def _lock_for(self, thread_id: str) -> threading.Lock:
+        return self._stripes[hash(thread_id) % len(self._stripes)]
+
+    def create_thread(self, thread: Thread) -> None:
+        """
+        Store a new thread. Creation is atomic and idempotent: if a thread with
+        the same ID already exists, it is kept and this call has no effect.
+        """
+        with self._lock_for(thread.thread_id):
+            self._threads.setdefault(thread.thread_id, thread)
+
+    def ensure_thread(self, thread_id: str) -> None:
+        """
+        Atomically create the thread with this ID if it does not exist yet.
+        """
+        with self._lock_for(thread_id):
+            if thread_id not in self._threads:
+                self._threads[thread_id] = Thread(thread_id=thread_id)
+
+    def get_thread(self, thread_id: str) -> Optional[Thread]:
+        return self._threads.get(thread_id, None)
+
+    def append_message(self, thread_id: str, message: Message) -> None:
+        """
+        Append a message to an existing thread. Raises ValueError
+        if the thread does not exist.
+        """
+        with self._lock_for(thread_id):
+            thread = self._threads.get(thread_id)
+            if thread is None:
+                raise ValueError(f"Thread {thread_id} does not exist.")
+            thread.add_message(message)
+
+    def get_last_n_messages(self, thread_id: str, n: int = 5) -> List[Message]:
+        with self._lock_for(thread_id):
+            thread = self._threads.get(thread_id)
+            if not thread or n <= 0:
+                return []
+            return thread.messages[-n:]
+
+    def iter_messages(
+        self,
+        thread_id: str,
+        start: int = 0,
+        end: Optional[int] = None
+    ) -> Iterator[Message]:
+        # Copy the range under the lock so concurrent appends cannot shift it
+        with self._lock_for(thread_id):
+            thread = self._threads.get(thread_id)
+            if not thread:
+                return iter(())
+            return iter(thread.messages[start:end])
+
+    def list_threads(self) -> List[str]:
+        # Copying a dict's keys is atomic under the GIL
+        return list(self._threads)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock_for(thread_id):
+            self._threads.pop(thread_id, None)
@@ -3,33 +3,193 @@ FileSystemRepository for conversation memory in Moya.
 
 An implementation of BaseMemoryRepository that stores threads
 as JSON files and messages as JSON lines within those files.
+
+Each thread file has a sidecar offset index (``<thread_id>.idx``) holding
+the byte offset of every message line as a native int64, so message
+``i`` lives at index position ``8 * i``. This lets range and tail reads seek
+straight to the messages they need instead of scanning the whole thread.
 """
 
 import os
 import json
+from array import array
 from datetime import datetime
-from typing import Dict, Optional, List, Any, Union
+from typing import Dict, Iterator, Optional, List, Any, Tuple, Union
 from moya.conversation.thread import Thread
 from moya.conversation.message import Message
 from moya.memory.base_repository import BaseMemoryRepository
 
 
+# Size in bytes of a single offset entry in the sidecar index
+_OFFSET_SIZE = array('q').itemsize
+
+# Block size used when scanning a thread file backwards
+_TAIL_BLOCK_SIZE = 64 * 1024
+
+
 class FileSystemRepository(BaseMemoryRepository):
     """
     Maintains threads as JSON files on disk.
     Each thread is stored as a separate file with thread metadata at the top
-    and messages as JSON lines in the file.
+    and messages as JSON lines in the file, alongside an offset index that
+    maps message ordinals to byte offsets.
     """
 
     def __init__(self, base_path: str):
         """Initialize the repository with a base directory path."""
         self.base_path = base_path
         os.makedirs(base_path, exist_ok=True)
-    
+
     def _thread_file_path(self, thread_id: str) -> str:
         """Get the file path for a thread"""
         return os.path.join(self.base_path, f"{thread_id}.json")
-    
+
+    def _index_file_path(self, thread_id: str) -> str:
+        """Get the file path for a thread's offset index"""
+        return os.path.join(self.base_path, f"{thread_id}.idx")
+
+    @staticmethod
+    def _encode_message(message: Message) -> bytes:
+        """Serialize a message to a single JSON line"""
+        # Store raw message data format
+        raw_data = {
+            "message_id": message.message_id,
+            "thread_id": message.thread_id,
+            "sender": message.sender,
+            "content": message.content,  # Keep content in its original format
+            "timestamp": message.timestamp.isoformat() if hasattr(message, 'timestamp') else datetime.utcnow().isoformat(),
+            "metadata": dict(message.metadata or {})
+        }
+        return (json.dumps(raw_data) + "\n").encode("utf-8")
+
+    @classmethod
+    def _encode_thread(cls, thread: Thread) -> Tuple[bytes, array]:
+        """Serialize a new thread file, returning its bytes and message offsets"""
+        # Create the thread file with initial metadata
+        thread_data = {
+            "thread_id": thread.thread_id,
+            "metadata": thread.metadata
+        }
+        chunks = [(json.dumps(thread_data) + "\n").encode("utf-8")]
+        offsets = array('q')
+        position = len(chunks[0])
+        for msg in thread.messages:
+            line = cls._encode_message(msg)
+            offsets.append(position)
+            chunks.append(line)
+            position += len(line)
+        return b"".join(chunks), offsets
+
+    @staticmethod
+    def _decode_message(thread_id: str, line: bytes) -> Optional[Message]:
+        """Parse a stored JSON line back into a Message, or None if it is invalid"""
+        if not line.strip():  # Skip empty lines
+            return None
+
+        try:
+            msg_data = json.loads(line)
+            if "sender" in msg_data and "content" in msg_data:
+                timestamp = msg_data.get("timestamp")
+                # Reconstruct the message with original content
+                return Message(
+                    thread_id=thread_id,
+                    message_id=msg_data.get("message_id"),
+                    sender=msg_data["sender"],
+                    content=msg_data["content"],
+                    timestamp=datetime.fromisoformat(timestamp) if timestamp else None,
+                    metadata=msg_data.get("metadata", {})
+                )
+        except Exception as e:
+            # Skip invalid message lines
+            print(f"Error loading message: {e}")
+        return None
+
+    @classmethod
+    def _parse_thread(cls, thread_id: str, data: bytes) -> Thread:
+        """Rebuild a Thread from the full contents of its file"""
+        lines = data.split(b"\n")
+        if not lines[0]:
+            return Thread(thread_id=thread_id, metadata={})
+
+        # First line contains thread metadata
+        try:
+            thread_data = json.loads(lines[0])
+        except json.JSONDecodeError:
+            thread_data = {"thread_id": thread_id, "metadata": {}}
+
+        # Remaining lines are messages
+        thread = Thread(thread_id=thread_id, metadata=thread_data.get("metadata", {}))
+        for line in lines[1:]:
+            msg = cls._decode_message(thread_id, line)
+            if msg is not None:
+                thread.add_message(msg)
+        return thread
+
+    @staticmethod
+    def _range_lines(data: bytes, start: int, end: int, count: int) -> Optional[List[bytes]]:
+        """
+        Split the bytes read for message ordinals [start, end) into lines.
+        Returns None if the data holds more messages than the index knows of,
+        meaning the index is stale and must be rebuilt.
+        """
+        lines = [line for line in data.split(b"\n") if line.strip()]
+        if end >= count and len(lines) > end - start:
+            # Messages were appended without an index entry (e.g. an interrupted write)
+            return None
+        return lines
+
+    def _rebuild_index(self, thread_id: str) -> array:
+        """
+        Scan a thread file and rewrite its offset index. Used for files written
+        before the index existed, or when the index has fallen behind the data.
+        """
+        offsets = array('q')
+        with open(self._thread_file_path(thread_id), 'rb') as f:
+            f.readline()  # Thread metadata header
+            position = f.tell()
+            for line in f:
+                if line.strip():
+                    offsets.append(position)
+                position += len(line)
+
+        with open(self._index_file_path(thread_id), 'wb') as idx:
+            offsets.tofile(idx)
+        return offsets
+
+    def _message_count(self, thread_id: str) -> int:
+        """Return the number of indexed messages, rebuilding the index if missing."""
+        try:
+            return os.path.getsize(self._index_file_path(thread_id)) // _OFFSET_SIZE
+        except OSError:
+            return len(self._rebuild_index(thread_id))
+
+    def _read_offsets(self, thread_id: str, start: int, end: int) -> array:
+        """Read index entries for message ordinals [start, end)."""
+        offsets = array('q')
+        with open(self._index_file_path(thread_id), 'rb') as idx:
+            idx.seek(start * _OFFSET_SIZE)
+            offsets.frombytes(idx.read((end - start) * _OFFSET_SIZE))
+        return offsets
+
+    def _read_lines(self, thread_id: str, start: int, end: int, count: int) -> Optional[List[bytes]]:
+        """
+        Read the raw lines for message ordinals [start, end) of a thread holding
+        ``count`` indexed messages by seeking directly to their byte offsets.
+        Returns None if the index turned out to be stale and had to be rebuilt.
+        """
+        offsets = self._read_offsets(thread_id, start, min(end + 1, count))
+        with open(self._thread_file_path(thread_id), 'rb') as f:
+            f.seek(offsets[0])
+            if end < count:
+                data = f.read(offsets[-1] - offsets[0])
+            else:
+                data = f.read()
+
+        lines = self._range_lines(data, start, end, count)
+        if lines is None:
+            self._rebuild_index(thread_id)
+        return lines
+
     def create_thread(self, thread: Thread) -> None:
         """
         Store a new thread. If the thread already exists, silently succeeds
@@ -39,29 +199,20 @@ class FileSystemRepository(BaseMemoryRepository):
         if os.path.exists(file_path):
             # Thread already exists, just return without error
             return
-        
-        # Create the thread file with initial metadata
-        thread_data = {
-            "thread_id": thread.thread_id,
-            "metadata": thread.metadata
-        }
-        
+
         # Write thread metadata and initial messages if any
-        with open(file_path, 'w') as f:
-            json.dump(thread_data, f)
-            if thread.messages:
-                f.write("\n")
-                for msg in thread.messages:
-                    # Use raw message data for storage to preserve original format
-                    raw_data = {
-                        "message_id": msg.message_id,
-                        "thread_id": msg.thread_id,
-                        "sender": msg.sender,
-                        "content": msg.content,
-                        "timestamp": msg.timestamp.isoformat() if hasattr(msg, 'timestamp') else datetime.utcnow().isoformat(),
-                        "metadata": msg.metadata or {}
-                    }
-                    f.write(json.dumps(raw_data) + "\n")
+        data, offsets = self._encode_thread(thread)
+        with open(file_path, 'wb') as f:
+            f.write(data)
+
+        with open(self._index_file_path(thread.thread_id), 'wb') as idx:
+            offsets.tofile(idx)
+
+    def ensure_thread(self, thread_id: str) -> None:
+        """
+        Create an empty thread file unless the thread already exists.
+        """
+        self.create_thread(Thread(thread_id=thread_id))
 
     def get_thread(self, thread_id: str) -> Optional[Thread]:
         """
@@ -70,82 +221,108 @@ class FileSystemRepository(BaseMemoryRepository):
         file_path = self._thread_file_path(thread_id)
         if not os.path.exists(file_path):
             return None
-        
+
         try:
             # Read the thread file
-            messages = []
-            with open(file_path, 'r') as f:
-                lines = f.readlines()
-                
-                if not lines:
-                    return Thread(thread_id=thread_id, metadata={})
-                
-                # First line contains thread metadata
-                try:
-                    thread_data = json.loads(lines[0])
-                except (json.JSONDecodeError, IndexError):
-                    thread_data = {"thread_id": thread_id, "metadata": {}}
-                
-                # Remaining lines are messages
-                for line in lines[1:]:
-                    if not line.strip():  # Skip empty lines
-                        continue
-                    
-                    try:
-                        msg_data = json.loads(line)
-                        if "sender" in msg_data and "content" in msg_data:
-                            # Keep the content in its original format - don't convert to string
-                            content = msg_data["content"]
-                            
-                            # Reconstruct the message with original content
-                            messages.append(Message(
-                                thread_id=thread_id,
-                                message_id=msg_data.get("message_id"),
-                                sender=msg_data["sender"],
-                                content=content,
-                                metadata=msg_data.get("metadata", {})
-                            ))
-                    except Exception as e:
-                        # Skip invalid message lines
-                        print(f"Error loading message: {e}")
-                        continue
-            
-            # Recreate the thread
-            thread = Thread(thread_id=thread_id, metadata=thread_data.get("metadata", {}))
-            for msg in messages:
-                thread.add_message(msg)
-                
-            return thread
-            
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            return self._parse_thread(thread_id, data)
+
         except Exception as e:
             # Return an empty thread as fallback
             print(f"Error loading thread {thread_id}: {e}")
             return Thread(thread_id=thread_id, metadata={})
 
+    def _tail_lines(self, thread_id: str, n: int) -> List[bytes]:
+        """
+        Read the last n message lines of a thread file by scanning it backwards
+        in fixed-size blocks, stopping as soon as enough lines have been seen.
+        """
+        with open(self._thread_file_path(thread_id), 'rb') as f:
+            position = f.seek(0, os.SEEK_END)
+            data = b""
+            # n message lines plus the line preceding them (or the header)
+            while position > 0 and data.count(b"\n") <= n:
+                size = min(_TAIL_BLOCK_SIZE, position)
+                position -= size
+                f.seek(position)
+                data = f.read(size) + data
+
+        # The first line is either the thread metadata header or a partial
+        # line cut at the block boundary; neither is a message.
+        lines = [line for line in data.split(b"\n")[1:] if line.strip()]
+        return lines[-n:]
+
+    def iter_messages(
+        self,
+        thread_id: str,
+        start: int = 0,
+        end: Optional[int] = None
+    ) -> Iterator[Message]:
+        """
+        Iterate over messages with ordinals in [start, end) without loading the
+        rest of the thread. Negative indices count from the end, as in slicing.
+        """
+        if not os.path.exists(self._thread_file_path(thread_id)):
+            return iter(())
+
+        requested = slice(start, end)
+        lines = None
+        while lines is None:
+            count = self._message_count(thread_id)
+            start, end, _ = requested.indices(count)
+            if start >= end:
+                return iter(())
+            lines = self._read_lines(thread_id, start, end, count)
+
+        messages = []
+        for line in lines:
+            msg = self._decode_message(thread_id, line)
+            if msg is not None:
+                messages.append(msg)
+        return iter(messages)
+
+    def get_last_n_messages(self, thread_id: str, n: int = 5) -> List[Message]:
+        """
+        Return the last n messages of a thread. Seeks to their offsets when the
+        thread is indexed, otherwise reads the file backwards in blocks.
+        """
+        if n <= 0 or not os.path.exists(self._thread_file_path(thread_id)):
+            return []
+        if os.path.exists(self._index_file_path(thread_id)):
+            return list(self.iter_messages(thread_id, -n))
+
+        messages = []
+        for line in self._tail_lines(thread_id, n):
+            msg = self._decode_message(thread_id, line)
+            if msg is not None:
+                messages.append(msg)
+        return messages
+
     def append_message(self, thread_id: str, message: Message) -> None:
         """
         Append a message to an existing thread. Creates the thread if it doesn't exist.
         """
         file_path = self._thread_file_path(thread_id)
-        
+
         # Create thread file if it doesn't exist
         if not os.path.exists(file_path):
             thread = Thread(thread_id=thread_id)
             self.create_thread(thread)
-        
+        elif not os.path.exists(self._index_file_path(thread_id)):
+            self._rebuild_index(thread_id)
+
         try:
-            # Store raw message data format
-            raw_data = {
-                "message_id": message.message_id,
-                "thread_id": message.thread_id,
-                "sender": message.sender,
-                "content": message.content,  # Keep content in its original format
-                "timestamp": message.timestamp.isoformat() if hasattr(message, 'timestamp') else datetime.utcnow().isoformat(),
-                "metadata": message.metadata or {}
-            }
-            
-            with open(file_path, 'a') as f:
-                f.write(json.dumps(raw_data) + "\n")
+            line = self._encode_message(message)
+
+            with open(file_path, 'ab') as f:
+                offset = f.tell()
+                f.write(line)
+
+            # Index entry is written after the data so a crash can only leave
+            # the index behind the file, which readers detect and repair.
+            with open(self._index_file_path(thread_id), 'ab') as idx:
+                array('q', [offset]).tofile(idx)
         except Exception as e:
             raise ValueError(f"Failed to append message to thread {thread_id}: {str(e)}")
 
@@ -162,11 +339,11 @@ class FileSystemRepository(BaseMemoryRepository):
         return thread_ids
 
     def delete_thread(self, thread_id: str) -> None:
-        """Delete a thread file if it exists"""
-        file_path = self._thread_file_path(thread_id)
-        try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-        except OSError:
-            # Silently handle file deletion errors
-            pass
+        """Delete a thread file and its index if they exist"""
+        for file_path in (self._thread_file_path(thread_id), self._index_file_path(thread_id)):
+            try:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+            except OSError:
+                # Silently handle file deletion errors
+                pass
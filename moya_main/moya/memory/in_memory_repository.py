@@ -5,7 +5,7 @@ A simple implementation of BaseMemoryRepository that stores threads
 and messages in a Python dictionary (RAM only).
 """
 
-from typing import Dict, Optional, List
+from typing import Dict, Iterator, Optional, List
 from moya.conversation.thread import Thread
 from moya.conversation.message import Message
 from moya.memory.base_repository import BaseMemoryRepository
@@ -41,6 +41,24 @@ class InMemoryRepository(BaseMemoryRepository):
             raise ValueError(f"Thread {thread_id} does not exist.")
         self._threads[thread_id].add_message(message)
 
+    def get_last_n_messages(self, thread_id: str, n: int = 5) -> List[Message]:
+        thread = self._threads.get(thread_id)
+        if not thread or n <= 0:
+            return []
+        return thread.messages[-n:]
+
+    def iter_messages(
+        self,
+        thread_id: str,
+        start: int = 0,
+        end: Optional[int] = None
+    ) -> Iterator[Message]:
+        thread = self._threads.get(thread_id)
+        if not thread:
+            return iter(())
+        start, end, _ = slice(start, end).indices(len(thread.messages))
+        return map(thread.messages.__getitem__, range(start, end))
+
     def list_threads(self) -> List[str]:
         return list(self._threads.keys())
 
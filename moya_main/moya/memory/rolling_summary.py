@@ -0,0 +1,98 @@
+"""
+RollingSummary for conversation memory in Moya.
+
+Keeps a per-thread summary that is updated incrementally: each update only
+folds in messages appended since the previous one, and the summary is kept
+within a token budget by dropping (or, with a summarizer agent, compacting)
+its oldest lines.
+"""
+
+import threading
+from collections import deque
+from typing import Any, Deque, Iterable, Optional, Tuple
+from moya.conversation.message import Message
+from moya.utils.tokens import CHARS_PER_TOKEN, estimate_tokens
+
+
+COMPACTION_PROMPT = (
+    "Condense the following conversation summary into at most {tokens} tokens. "
+    "Keep names, decisions, open questions and facts that later turns may rely on.\n\n"
+    "{text}"
+)
+
+OMITTED_MARKER = "(earlier messages omitted)"
+
+
+class RollingSummary:
+    """
+    Incrementally maintained, token-budgeted summary of one thread.
+
+    Attributes:
+        message_count (int): Number of thread messages already folded in.
+        token_budget (int): Maximum estimated tokens the summary may hold.
+        summarizer (Agent): Optional agent used to compact evicted lines; any
+                            object with a handle_message(str) -> str method.
+    """
+
+    def __init__(self, token_budget: int, summarizer: Optional[Any] = None):
+        self.message_count = 0
+        self.token_budget = token_budget
+        self.summarizer = summarizer
+        # Serializes updates of this summary without blocking other threads'
+        self.lock = threading.Lock()
+        # Compacted text standing in for lines evicted from the window
+        self.compacted = ""
+        self._lines: Deque[Tuple[str, int]] = deque()
+        self._tokens = 0
+
+    @property
+    def tokens(self) -> int:
+        """Estimated token count of the current summary."""
+        return self._tokens + estimate_tokens(self.compacted)
+
+    def update(self, messages: Iterable[Message]) -> None:
+        """
+        Fold newly appended messages into the summary and enforce the budget.
+
+        :param messages: Messages appended since the last update, oldest first.
+        """
+        for msg in messages:
+            line = f"{msg.sender} said: {msg.content}"
+            tokens = estimate_tokens(line)
+            self._lines.append((line, tokens))
+            self._tokens += tokens
+            self.message_count += 1
+
+        if self.tokens <= self.token_budget:
+            return
+
+        evicted = []
+        while self._lines and self.tokens > self.token_budget:
+            line, tokens = self._lines.popleft()
+            self._tokens -= tokens
+            evicted.append(line)
+            if self.summarizer is None and not self.compacted:
+                # Reserve room for the omission marker
+                self.compacted = OMITTED_MARKER
+
+        if self.summarizer is not None and evicted:
+            self._compact(evicted)
+
+    def _compact(self, evicted: list) -> None:
+        # Compacted text gets a quarter of the budget so recent lines keep most of it
+        target = max(1, self.token_budget // 4)
+        text = "\n".join(([self.compacted] if self.compacted else []) + evicted)
+        compacted = self.summarizer.handle_message(COMPACTION_PROMPT.format(tokens=target, text=text))
+        # Never let a verbose summarizer break the budget
+        self.compacted = compacted[:target * CHARS_PER_TOKEN].strip()
+
+        while self._lines and self.tokens > self.token_budget:
+            _, tokens = self._lines.popleft()
+            self._tokens -= tokens
+
+    def text(self) -> str:
+        """Return the summary body (without the thread header)."""
+        lines = [line for line, _ in self._lines]
+        if self.compacted:
+            lines.insert(0, self.compacted)
+        return "\n".join(lines)
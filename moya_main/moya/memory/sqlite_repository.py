@@ -0,0 +1,269 @@
+"""
+SQLiteMemoryRepository for conversation memory in Moya.
+
+An implementation of BaseMemoryRepository that stores all threads and
+messages in a single SQLite database, so large numbers of threads do not
+each need their own file on disk.
+
+The database runs in WAL mode so readers never block the writer, and
+appends are group-committed: they are written immediately but only
+committed once ``commit_batch_size`` appends are pending or
+``commit_interval`` seconds have passed, whichever comes first.
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, Optional, List
+from moya.conversation.thread import Thread
+from moya.conversation.message import Message
+from moya.memory.base_repository import BaseMemoryRepository
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id  TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    metadata   TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    thread_id  TEXT    NOT NULL,
+    ordinal    INTEGER NOT NULL,
+    message_id TEXT,
+    sender     TEXT    NOT NULL,
+    content    TEXT    NOT NULL,
+    timestamp  TEXT    NOT NULL,
+    metadata   TEXT    NOT NULL,
+    PRIMARY KEY (thread_id, ordinal)
+) WITHOUT ROWID;
+"""
+
+# Statements are kept as module constants so sqlite3's statement cache
+# reuses the prepared form on every call.
+_INSERT_THREAD = "INSERT OR IGNORE INTO threads (thread_id, created_at, metadata) VALUES (?, ?, ?)"
+_SELECT_THREAD = "SELECT metadata FROM threads WHERE thread_id = ?"
+_INSERT_MESSAGE = (
+    "INSERT INTO messages (thread_id, ordinal, message_id, sender, content, timestamp, metadata) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+_SELECT_MAX_ORDINAL = "SELECT MAX(ordinal) FROM messages WHERE thread_id = ?"
+_SELECT_MESSAGES = (
+    "SELECT message_id, sender, content, timestamp, metadata FROM messages "
+    "WHERE thread_id = ? AND ordinal >= ? AND ordinal < ? ORDER BY ordinal"
+)
+_SELECT_LAST_MESSAGES = (
+    "SELECT message_id, sender, content, timestamp, metadata FROM messages "
+    "WHERE thread_id = ? ORDER BY ordinal DESC LIMIT ?"
+)
+
+# Upper bound used for open-ended ordinal ranges
+_MAX_ORDINAL = 2 ** 63 - 1
+
+_LIST_THREADS = "SELECT thread_id FROM threads"
+_DELETE_MESSAGES = "DELETE FROM messages WHERE thread_id = ?"
+_DELETE_THREAD = "DELETE FROM threads WHERE thread_id = ?"
+
+
+class SQLiteMemoryRepository(BaseMemoryRepository):
+    """
+    Maintains threads and messages in a SQLite database.
+    Messages are keyed by (thread_id, ordinal), so tail and range reads
+    are index lookups regardless of how long a thread grows.
+
+    Ordinals are assigned by the repository instance, so a database file
+    should have a single writing process; any number of processes may read.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        commit_interval: float = 0.05,
+        commit_batch_size: int = 256
+    ):
+        """
+        Initialize the repository.
+
+        :param db_path: Path of the SQLite database file (":memory:" for a transient database).
+        :param commit_interval: Maximum number of seconds an append may wait for
+                                its commit. 0 commits every append immediately.
+        :param commit_batch_size: Number of pending appends that forces a commit.
+        """
+        self.db_path = db_path
+        self.commit_interval = commit_interval
+        self.commit_batch_size = commit_batch_size
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=64)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+        self._next_ordinal: Dict[str, int] = {}
+        self._pending = 0
+        self._flush_timer: Optional[threading.Timer] = None
+
+    @staticmethod
+    def _row_to_message(thread_id: str, row: tuple) -> Message:
+        """Rebuild a Message from a messages table row"""
+        message_id, sender, content, timestamp, metadata = row
+        return Message(
+            thread_id=thread_id,
+            message_id=message_id,
+            sender=sender,
+            content=json.loads(content),
+            timestamp=datetime.fromisoformat(timestamp),
+            metadata=json.loads(metadata)
+        )
+
+    def _ordinal_for(self, thread_id: str) -> int:
+        """Return the next message ordinal for a thread"""
+        ordinal = self._next_ordinal.get(thread_id)
+        if ordinal is None:
+            (last,) = self._conn.execute(_SELECT_MAX_ORDINAL, (thread_id,)).fetchone()
+            ordinal = 0 if last is None else last + 1
+        return ordinal
+
+    def _insert_thread(self, thread: Thread) -> bool:
+        """Insert a thread row, returning False if the thread already existed"""
+        cursor = self._conn.execute(
+            _INSERT_THREAD,
+            (thread.thread_id, thread.created_at.isoformat(), json.dumps(thread.metadata))
+        )
+        return cursor.rowcount > 0
+
+    def _insert_message(self, thread_id: str, message: Message) -> None:
+        ordinal = self._ordinal_for(thread_id)
+        self._conn.execute(_INSERT_MESSAGE, (
+            thread_id,
+            ordinal,
+            message.message_id,
+            message.sender,
+            json.dumps(message.content),  # Keep content in its original format
+            message.timestamp.isoformat(),
+            json.dumps(dict(message.metadata or {}))
+        ))
+        # Advanced only once the row is in, so a failed insert leaves no gap
+        self._next_ordinal[thread_id] = ordinal + 1
+
+    def _write_done(self, count: int = 1) -> None:
+        """Record pending writes and commit them if the group-commit window is full."""
+        self._pending += count
+        if self.commit_interval <= 0 or self._pending >= self.commit_batch_size:
+            self._commit()
+        elif self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.commit_interval, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _commit(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        self._conn.commit()
+        self._pending = 0
+
+    def flush(self) -> None:
+        """Commit any appends still waiting for their group commit."""
+        with self._lock:
+            if self._pending:
+                self._commit()
+
+    def close(self) -> None:
+        """Commit pending appends and close the database connection."""
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+    def create_thread(self, thread: Thread) -> None:
+        """
+        Store a new thread. If the thread already exists, silently succeeds
+        without overwriting the existing thread.
+        """
+        with self._lock:
+            if self._insert_thread(thread):
+                for msg in thread.messages:
+                    self._insert_message(thread.thread_id, msg)
+                self._write_done(1 + len(thread.messages))
+
+    def ensure_thread(self, thread_id: str) -> None:
+        """
+        Create an empty thread unless the thread already exists.
+        """
+        with self._lock:
+            if thread_id not in self._next_ordinal and self._insert_thread(Thread(thread_id=thread_id)):
+                self._write_done()
+
+    def get_thread(self, thread_id: str) -> Optional[Thread]:
+        """
+        Retrieve a thread by ID or return None if not found.
+        """
+        with self._lock:
+            row = self._conn.execute(_SELECT_THREAD, (thread_id,)).fetchone()
+            if row is None:
+                return None
+            rows = self._conn.execute(_SELECT_MESSAGES, (thread_id, 0, _MAX_ORDINAL)).fetchall()
+
+        thread = Thread(thread_id=thread_id, metadata=json.loads(row[0]))
+        thread.messages = [self._row_to_message(thread_id, r) for r in rows]
+        return thread
+
+    def iter_messages(
+        self,
+        thread_id: str,
+        start: int = 0,
+        end: Optional[int] = None
+    ) -> Iterator[Message]:
+        """
+        Iterate over messages with ordinals in [start, end). Negative indices
+        count from the end of the thread, as in slicing.
+        """
+        with self._lock:
+            if start < 0 or (end is not None and end < 0):
+                count = self._next_ordinal.get(thread_id)
+                if count is None:
+                    (last,) = self._conn.execute(_SELECT_MAX_ORDINAL, (thread_id,)).fetchone()
+                    count = 0 if last is None else last + 1
+                start, end, _ = slice(start, end).indices(count)
+            elif end is None:
+                end = _MAX_ORDINAL
+            rows = self._conn.execute(_SELECT_MESSAGES, (thread_id, start, end)).fetchall()
+        return (self._row_to_message(thread_id, r) for r in rows)
+
+    def get_last_n_messages(self, thread_id: str, n: int = 5) -> List[Message]:
+        """
+        Return the last n messages of a thread.
+        """
+        if n <= 0:
+            return []
+        with self._lock:
+            rows = self._conn.execute(_SELECT_LAST_MESSAGES, (thread_id, n)).fetchall()
+        return [self._row_to_message(thread_id, r) for r in reversed(rows)]
+
+    def append_message(self, thread_id: str, message: Message) -> None:
+        """
+        Append a message to an existing thread. Creates the thread if it doesn't exist.
+        """
+        try:
+            with self._lock:
+                created = False
+                if thread_id not in self._next_ordinal:
+                    created = self._insert_thread(Thread(thread_id=thread_id))
+                self._insert_message(thread_id, message)
+                self._write_done(2 if created else 1)
+        except sqlite3.Error as e:
+            raise ValueError(f"Failed to append message to thread {thread_id}: {str(e)}")
+
+    def list_threads(self) -> List[str]:
+        """Return a list of all thread IDs"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute(_LIST_THREADS)]
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete a thread and its messages if they exist"""
+        with self._lock:
+            self._conn.execute(_DELETE_MESSAGES, (thread_id,))
+            self._conn.execute(_DELETE_THREAD, (thread_id,))
+            self._next_ordinal.pop(thread_id, None)
+            self._write_done()
@@ -0,0 +1,70 @@
+"""
+SyncToAsyncRepository for conversation memory in Moya.
+
+Adapts any BaseMemoryRepository to the AsyncBaseMemoryRepository interface
+by running its blocking calls in an executor, keeping the event loop free
+while the underlying repository does its I/O.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import Executor
+from typing import AsyncIterator, Optional, List
+from moya.conversation.thread import Thread
+from moya.conversation.message import Message
+from moya.memory.base_repository import BaseMemoryRepository
+from moya.memory.async_base_repository import AsyncBaseMemoryRepository
+
+
+class SyncToAsyncRepository(AsyncBaseMemoryRepository):
+    """
+    Wraps a synchronous repository so it can be awaited from asyncio code.
+    The wrapped repository must be safe to call from worker threads
+    (e.g. ConcurrentInMemoryRepository or SQLiteMemoryRepository).
+    """
+
+    def __init__(self, repository: BaseMemoryRepository, executor: Optional[Executor] = None):
+        """
+        :param repository: The synchronous repository to wrap.
+        :param executor: Executor to run calls in. Defaults to the loop's default executor.
+        """
+        self.repository = repository
+        self.executor = executor
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args))
+
+    async def create_thread(self, thread: Thread) -> None:
+        await self._run(self.repository.create_thread, thread)
+
+    async def ensure_thread(self, thread_id: str) -> None:
+        await self._run(self.repository.ensure_thread, thread_id)
+
+    async def get_thread(self, thread_id: str) -> Optional[Thread]:
+        return await self._run(self.repository.get_thread, thread_id)
+
+    async def append_message(self, thread_id: str, message: Message) -> None:
+        await self._run(self.repository.append_message, thread_id, message)
+
+    async def list_threads(self) -> List[str]:
+        return await self._run(self.repository.list_threads)
+
+    async def delete_thread(self, thread_id: str) -> None:
+        await self._run(self.repository.delete_thread, thread_id)
+
+    async def get_last_n_messages(self, thread_id: str, n: int = 5) -> List[Message]:
+        return await self._run(self.repository.get_last_n_messages, thread_id, n)
+
+    async def iter_messages(
+        self,
+        thread_id: str,
+        start: int = 0,
+        end: Optional[int] = None
+    ) -> AsyncIterator[Message]:
+        # Materialize the range in the worker so iteration never blocks the loop
+        messages = await self._run(
+            lambda: list(self.repository.iter_messages(thread_id, start, end))
+        )
+        for message in messages:
+            yield message
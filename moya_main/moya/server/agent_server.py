@@ -0,0 +1,469 @@
+"""
+AgentServer for Moya.
+
+Serves a Moya agent over HTTP for RemoteAgent clients:
+
+- GET /health reports the agent and the server's load,
+- POST /chat and POST /generate return a whole response as JSON,
+- POST /chat/stream streams the response as server-sent events,
+- WebSocket /ws carries many interleaved requests over one connection for
+  RemoteAgent's multiplexed transport (see moya.utils.multiplexed_transport).
+
+Request and response bodies may be JSON or msgpack, optionally zstd
+compressed, as negotiated through the usual HTTP headers (see
+moya.utils.wire_format); streamed responses are always text/event-stream.
+
+Agents run through their async API (handle_message_async and
+handle_message_stream_async), so a slow LLM call never blocks the event
+loop; agents without a native async client fall back to the loop's default
+executor, which the server bounds. At most ``max_concurrency`` requests run
+agent calls at once; others wait up to ``queue_timeout`` seconds for a slot
+and are then rejected with 503. Streams are pulled from the agent only as
+fast as the client reads them, and a client disconnect cancels the
+upstream LLM call.
+"""
+
+import asyncio
+import anyio
+import json
+import uvicorn
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import dataclass
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect, params
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+from starlette.types import Receive, Scope, Send
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from moya.agents.base_agent import Agent
+from moya.tools.ephemeral_memory import EphemeralMemory
+from moya.utils.multiplexed_transport import DEFAULT_WINDOW, StreamCredit
+from moya.utils.sse import encode_sse
+from moya.utils.wire_format import (
+    DEFAULT_COMPRESS_THRESHOLD,
+    MSGPACK,
+    ZSTD,
+    accepts_zstd,
+    decode,
+    decode_body,
+    encode,
+    encode_body,
+    negotiate
+)
+
+
+# Status code for a request the client abandoned before the response (nginx convention)
+CLIENT_CLOSED_REQUEST = 499
+
+
+@dataclass
+class AgentServerConfig:
+    """
+    Configuration for AgentServer.
+
+    Attributes:
+        max_concurrency (int): Requests allowed to run agent calls at once.
+        queue_timeout (float): Seconds a request waits for a free slot before
+                               it is rejected with 503.
+        store_messages (bool): Store each exchange in EphemeralMemory.
+        default_thread_id (str): Thread for requests that do not name one.
+        disconnect_poll_interval (float): Seconds between client disconnect
+                                          checks for non-streaming requests.
+        compress_threshold (int): Smallest response body compressed for
+                                  clients accepting zstd, in bytes.
+    """
+    max_concurrency: int = 32
+    queue_timeout: float = 5.0
+    store_messages: bool = True
+    default_thread_id: str = "default_thread"
+    disconnect_poll_interval: float = 0.5
+    compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD
+
+    def __post_init__(self):
+        if self.max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+        if self.queue_timeout < 0:
+            raise ValueError("queue_timeout must not be negative.")
+
+
+class Message(BaseModel):
+    content: str
+    thread_id: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+
+class EventStreamResponse(StreamingResponse):
+    """
+    A text/event-stream response that always watches for the client going
+    away. On disconnect the event generator is cancelled at its current
+    await and closed, and ``on_close`` runs however the response ended.
+    """
+
+    media_type = "text/event-stream"
+
+    def __init__(
+        self,
+        content: AsyncIterator[str],
+        on_close: Optional[Callable[[], None]] = None,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        super().__init__(content, headers=headers)
+        self.on_close = on_close
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            async with anyio.create_task_group() as task_group:
+
+                async def stream() -> None:
+                    try:
+                        await self.stream_response(send)
+                    except OSError:
+                        # The connection dropped while writing
+                        pass
+                    task_group.cancel_scope.cancel()
+
+                task_group.start_soon(stream)
+                await self.listen_for_disconnect(receive)
+                task_group.cancel_scope.cancel()
+        finally:
+            try:
+                await self.body_iterator.aclose()
+            finally:
+                if self.on_close is not None:
+                    self.on_close()
+
+
+class AgentServer:
+    """
+    Serves one agent over HTTP. The FastAPI application is available as
+    ``app`` for mounting or running under any ASGI server.
+    """
+
+    def __init__(
+        self,
+        agent: Agent,
+        config: Optional[AgentServerConfig] = None,
+        dependencies: Optional[List[params.Depends]] = None
+    ):
+        """
+        Initialize the AgentServer.
+
+        :param agent: The agent that handles requests.
+        :param config: Server settings; defaults to AgentServerConfig().
+        :param dependencies: FastAPI dependencies applied to every route,
+                             e.g. [Depends(verify_token)] for authentication.
+                             They also guard /ws, so they should take an
+                             HTTPConnection rather than a Request.
+        """
+        self.agent = agent
+        self.config = config or AgentServerConfig()
+        self._slots = asyncio.Semaphore(self.config.max_concurrency)
+        self.in_flight = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.app = FastAPI(lifespan=self._lifespan, dependencies=dependencies or [])
+        self._add_routes()
+
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI):
+        # Agents without a native async client run in the default executor;
+        # bound it, leaving a few threads for memory writes
+        executor = ThreadPoolExecutor(
+            max_workers=self.config.max_concurrency + 4,
+            thread_name_prefix="moya-server"
+        )
+        asyncio.get_running_loop().set_default_executor(executor)
+        try:
+            yield
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _add_routes(self) -> None:
+        app = self.app
+
+        @app.get("/health")
+        async def health():
+            """Health check endpoint."""
+            return {"status": "healthy", "agent": self.agent.agent_name, **self.metrics()}
+
+        @app.post("/chat")
+        async def chat(request: Request):
+            """Handle a chat request and return the whole response."""
+            message, thread_id = await self._read_request(request)
+            return await self._respond(request, message, thread_id)
+
+        @app.post("/generate")
+        async def generate(message: Message, request: Request):
+            """Handle a chat request given as a Message."""
+            return await self._respond(
+                request,
+                message.content,
+                message.thread_id or self.config.default_thread_id,
+                metadata=message.metadata
+            )
+
+        @app.post("/chat/stream")
+        async def chat_stream(request: Request):
+            """Handle a chat request and stream the response as server-sent events."""
+            message, thread_id = await self._read_request(request)
+            # Take the slot before responding, so a busy server can still answer 503
+            await self._acquire()
+            return EventStreamResponse(
+                self._event_stream(message, thread_id),
+                on_close=self._release,
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+
+        @app.websocket("/ws")
+        async def multiplexed(websocket: WebSocket):
+            """Serve many interleaved requests over one WebSocket connection."""
+            await self._serve_connection(websocket)
+
+    def metrics(self) -> Dict[str, int]:
+        """
+        Return the server's load counters.
+        """
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrency": self.config.max_concurrency,
+            "rejected": self.rejected,
+            "cancelled": self.cancelled
+        }
+
+    async def _read_request(self, request: Request) -> Tuple[str, str]:
+        encoding = request.headers.get("Content-Encoding")
+        if (encoding or "").strip().lower() not in ("", "identity", ZSTD):
+            raise HTTPException(status_code=415, detail=f"Unsupported content encoding: {encoding}")
+        try:
+            data = decode_body(await request.body(), request.headers.get("Content-Type"), encoding)
+        except Exception:
+            raise HTTPException(status_code=400, detail="Malformed request body.")
+        message = data.get("message") if isinstance(data, dict) else None
+        if not isinstance(message, str):
+            raise HTTPException(status_code=422, detail="Request must include a 'message' string.")
+        return message, data.get("thread_id") or self.config.default_thread_id
+
+    async def _acquire(self) -> None:
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.config.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Server busy", headers={"Retry-After": "1"})
+        self.in_flight += 1
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        self._slots.release()
+
+    async def _store(self, thread_id: str, sender: str, content: str) -> None:
+        if self.config.store_messages:
+            await EphemeralMemory.store_message_async(thread_id=thread_id, sender=sender, content=content)
+
+    async def _respond(self, request: Request, message: str, thread_id: str, **kwargs):
+        await self._acquire()
+        try:
+            await self._store(thread_id, "user", message)
+            response = await self._until_disconnected(
+                request, self.agent.handle_message_async(message, thread_id=thread_id, **kwargs)
+            )
+            if response is None:
+                return Response(status_code=CLIENT_CLOSED_REQUEST)
+            await self._store(thread_id, self.agent.agent_name, response)
+            return self._encode_response(request, {"response": response})
+        finally:
+            self._release()
+
+    def _encode_response(self, request: Request, payload: Dict[str, Any]) -> Response:
+        """
+        Serialize a response body in the format the client asked for.
+        """
+        compression = ZSTD if accepts_zstd(request.headers.get("Accept-Encoding")) else None
+        body, headers = encode_body(
+            payload,
+            negotiate(request.headers.get("Accept")),
+            compression,
+            self.config.compress_threshold
+        )
+        return Response(content=body, headers={**headers, "Vary": "Accept, Accept-Encoding"})
+
+    async def _until_disconnected(self, request: Request, call: Awaitable[str]) -> Optional[str]:
+        """
+        Await an agent call, cancelling it if the client disconnects first.
+        Returns None if the call was cancelled.
+        """
+        task = asyncio.ensure_future(call)
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=self.config.disconnect_poll_interval)
+                if done:
+                    return task.result()
+                if await request.is_disconnected():
+                    self.cancelled += 1
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+                    return None
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+
+    async def _event_stream(self, message: str, thread_id: str) -> AsyncIterator[str]:
+        """
+        Stream the agent's response as events. Each chunk is sent unchanged
+        and the next is only requested once the previous one was written, so
+        a slow client slows the upstream stream instead of filling memory.
+        """
+        chunks = []
+        try:
+            await self._store(thread_id, "user", message)
+            async with aclosing(self.agent.handle_message_stream_async(message, thread_id=thread_id)) as stream:
+                async for chunk in stream:
+                    if chunk:
+                        chunks.append(chunk)
+                        yield encode_sse(chunk)
+            await self._store(thread_id, self.agent.agent_name, "".join(chunks))
+            yield encode_sse("", event="done")
+        except (asyncio.CancelledError, GeneratorExit):
+            # The client went away mid-stream
+            self.cancelled += 1
+            raise
+        except Exception as e:
+            yield encode_sse(str(e), event="error")
+
+    async def _serve_connection(self, websocket: WebSocket) -> None:
+        """
+        Read request, credit and cancel frames from one multiplexed
+        connection, running each request as its own task. Closing the
+        connection cancels every request still open on it.
+        """
+        await websocket.accept()
+        tasks: Dict[int, asyncio.Task] = {}
+        credits: Dict[int, StreamCredit] = {}
+        send_lock = asyncio.Lock()
+        # Replies use msgpack binary frames once the client sends one
+        binary = False
+
+        async def send(frame: Dict[str, Any]) -> None:
+            async with send_lock:
+                if binary:
+                    await websocket.send_bytes(encode(frame, MSGPACK))
+                else:
+                    await websocket.send_text(json.dumps(frame))
+
+        def forget(stream_id: int) -> None:
+            tasks.pop(stream_id, None)
+            credits.pop(stream_id, None)
+
+        try:
+            while True:
+                received = await websocket.receive()
+                if received["type"] == "websocket.disconnect":
+                    break
+                if received.get("bytes") is not None:
+                    binary = True
+                    frame = decode(received["bytes"], MSGPACK)
+                else:
+                    frame = json.loads(received["text"])
+                stream_id, kind = frame.get("id"), frame.get("type")
+                if kind == "request" and stream_id not in tasks:
+                    credit = credits[stream_id] = StreamCredit(frame.get("window", DEFAULT_WINDOW))
+                    task = tasks[stream_id] = asyncio.create_task(self._serve_frame(send, frame, credit))
+                    task.add_done_callback(lambda _, stream_id=stream_id: forget(stream_id))
+                elif kind == "credit" and stream_id in credits:
+                    credits[stream_id].grant(int(frame.get("n", 0)))
+                elif kind == "cancel" and stream_id in tasks:
+                    self.cancelled += 1
+                    tasks[stream_id].cancel()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            self.cancelled += len(tasks)
+            for task in list(tasks.values()):
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    async def _serve_frame(
+        self,
+        send: Callable[[Dict[str, Any]], Awaitable[None]],
+        frame: Dict[str, Any],
+        credit: StreamCredit
+    ) -> None:
+        """
+        Answer one request frame. Stream chunks are sent only while the
+        client has credit for them, so one slow consumer never holds up the
+        other requests sharing its connection.
+        """
+        stream_id = frame["id"]
+        body = frame.get("body")
+        message = body.get("message") if isinstance(body, dict) else None
+        if not isinstance(message, str):
+            await send({"type": "error", "id": stream_id, "data": "Request must include a 'message' string.", "status": 422})
+            return
+        thread_id = body.get("thread_id") or self.config.default_thread_id
+
+        try:
+            await self._acquire()
+        except HTTPException as e:
+            await send({"type": "error", "id": stream_id, "data": e.detail, "status": e.status_code})
+            return
+        try:
+            await self._store(thread_id, "user", message)
+            if frame.get("stream"):
+                chunks = []
+                async with aclosing(self.agent.handle_message_stream_async(message, thread_id=thread_id)) as stream:
+                    async for chunk in stream:
+                        if chunk:
+                            await credit.take()
+                            chunks.append(chunk)
+                            await send({"type": "chunk", "id": stream_id, "data": chunk})
+                response = "".join(chunks)
+                reply = {"type": "done", "id": stream_id}
+            else:
+                response = await self.agent.handle_message_async(message, thread_id=thread_id)
+                reply = {"type": "response", "id": stream_id, "data": response}
+            await self._store(thread_id, self.agent.agent_name, response)
+            await send(reply)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            try:
+                await send({"type": "error", "id": stream_id, "data": str(e), "status": 500})
+            except Exception:
+                # The connection is gone; the reader cancels what is left
+                pass
+        finally:
+            self._release()
+
+
+def create_app(
+    agent: Agent,
+    config: Optional[AgentServerConfig] = None,
+    dependencies: Optional[List[params.Depends]] = None
+) -> FastAPI:
+    """
+    Create a FastAPI application serving the given agent.
+
+    :param agent: The agent that handles requests.
+    :param config: Server settings; defaults to AgentServerConfig().
+    :param dependencies: FastAPI dependencies applied to every route.
+    :return: The FastAPI application.
+    """
+    return AgentServer(agent, config, dependencies).app
+
+
+def serve(
+    agent: Agent,
+    host: str = "0.0.0.0",
+    port: int = 8000,
+    config: Optional[AgentServerConfig] = None,
+    dependencies: Optional[List[params.Depends]] = None
+) -> None:
+    """
+    Serve the given agent with uvicorn until interrupted.
+
+    :param agent: The agent that handles requests.
+    :param host: Interface to listen on.
+    :param port: Port to listen on.
+    :param config: Server settings; defaults to AgentServerConfig().
+    :param dependencies: FastAPI dependencies applied to every route.
+    """
+    uvicorn.run(create_app(agent, config, dependencies), host=host, port=port)
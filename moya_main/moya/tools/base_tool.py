@@ -8,6 +8,10 @@ import abc
 from dataclasses import dataclass
 from typing import Any, Callable, Dict, List, Optional, get_type_hints
 
+# Fields that tool definitions are built from
+_DEFINITION_FIELDS = frozenset(("name", "description", "parameters"))
+
+
 @dataclass
 class BaseTool():
     name: str
@@ -99,57 +103,69 @@ class BaseTool():
 
 
     
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Changing any field a definition is built from drops the memoized definitions
+        if name in _DEFINITION_FIELDS:
+            self.__dict__.pop("_definitions", None)
+        super().__setattr__(name, value)
+
+    def _memoized_definition(self, provider: str, build: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        definitions = self.__dict__.setdefault("_definitions", {})
+        definition = definitions.get(provider)
+        if definition is None:
+            definition = definitions[provider] = build()
+        return definition
+
+    def invalidate_definitions(self) -> None:
+        """
+        Drop the memoized definitions. Only needed after mutating
+        'parameters' in place; reassigning a field does this automatically.
+        """
+        self.__dict__.pop("_definitions", None)
+
+    def _parameters_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                name: {
+                    "type": info["type"],
+                    "description": info["description"]
+                } for name, info in self.parameters.items()
+            },
+            "required": [
+                name for name, info in self.parameters.items() 
+                if info.get("required", False)
+            ]
+        }
+
     def get_bedrock_definition(self) -> Dict[str, Any]:
         """
         Returns the tool definition in a format compatible with Bedrock.
+        The result is memoized and shared; treat it as read-only.
         """
-        return {
+        return self._memoized_definition("bedrock", lambda: {
             "name": self.name,
             "description": self.description,
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    name: {
-                        "type": info["type"],
-                        "description": info["description"]
-                    } for name, info in self.parameters.items()
-                },
-                "required": [
-                    name for name, info in self.parameters.items() 
-                    if info.get("required", False)
-                ]
-            }
-        }
+            "parameters": self._parameters_schema()
+        })
     
     def get_openai_definition(self) -> Dict[str, Any]:
         """
         Returns the tool definition in a format compatible with OpenAI.
+        The result is memoized and shared; treat it as read-only.
         """
-        return {
-            "name": self.name,
-            "description": self.description,
+        return self._memoized_definition("openai", lambda: {
+            "type": "function",
             "function": {
                 "name": self.name,
                 "description": self.description,
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        name: {
-                            "type": info["type"],
-                            "description": info["description"]
-                        } for name, info in self.parameters.items()
-                    },
-                    "required": [
-                        name for name, info in self.parameters.items() 
-                        if info.get("required", False)
-                    ]
-                }
+                "parameters": self._parameters_schema()
             }
-        }
+        })
     
     def get_ollama_definition(self) -> Dict[str, Any]:
         """
         Returns the tool definition in a format compatible with Ollama.
         """
         # Ollama follows OpenAI format
-        return self.get_openai_definition()
\ No newline at end of file
+        return self.get_openai_definition()
@@ -5,13 +5,16 @@ A tool that interacts with a BaseMemoryRepository to store and retrieve
 conversation data (threads, messages).
 """
 
+from collections import OrderedDict
 from typing import Optional, List, Dict, Any
 from moya.tools.tool_registry import ToolRegistry
 from moya.tools.base_tool import BaseTool
-from moya.memory.in_memory_repository import InMemoryRepository
-from moya.conversation.thread import Thread
+from moya.memory.concurrent_repository import ConcurrentInMemoryRepository
+from moya.memory.rolling_summary import RollingSummary
 from moya.conversation.message import Message
+import asyncio
 import json
+import threading
 
 
 class EphemeralMemory:
@@ -25,7 +28,19 @@ class EphemeralMemory:
     custom logic for concise conversation overviews.
     """
 
-    memory_repository = InMemoryRepository()
+    # Shared by every caller in the process, so it must be safe to use from
+    # concurrent request handlers.
+    memory_repository = ConcurrentInMemoryRepository()
+
+    # Incremental summary mode (see configure_summary); off by default.
+    incremental_summary = False
+    summary_token_budget = 2000
+    summary_agent = None
+    # Threads whose summaries are cached; the least recently used one is
+    # dropped beyond this and rebuilt from the repository if needed again
+    summary_max_threads = 1024
+    _summaries: "OrderedDict[str, RollingSummary]" = OrderedDict()
+    _summaries_lock = threading.Lock()
 
     @staticmethod
     def store_message(
@@ -44,11 +59,8 @@ class EphemeralMemory:
             - content: The message content.
             - metadata: Optional metadata dictionary.
         """
-        existing_thread = EphemeralMemory.memory_repository.get_thread(thread_id)
-        if not existing_thread:
-            # Create the thread on the fly if it doesn't exist
-            new_thread = Thread(thread_id=thread_id)
-            EphemeralMemory.memory_repository.create_thread(new_thread)
+        # Create the thread on the fly if it doesn't exist
+        EphemeralMemory.memory_repository.ensure_thread(thread_id)
 
         message = Message(
             thread_id=thread_id,
@@ -68,11 +80,8 @@ class EphemeralMemory:
             - thread_id: Unique identifier for the conversation thread.
             - n: Number of messages to retrieve (default: 5).
         """
-        thread = EphemeralMemory.memory_repository.get_thread(thread_id)
-        messages = []
-        if thread:
-            messages = list(thread.get_last_n_messages(n=n))
-        
+        messages = EphemeralMemory.memory_repository.get_last_n_messages(thread_id, n)
+
         # Return a JSON representation of the messages
         return json.dumps([message.to_dict() for message in messages])
     
@@ -86,6 +95,9 @@ class EphemeralMemory:
         Parameters:
             - thread_id: Unique identifier for the conversation thread.
         """
+        if EphemeralMemory.incremental_summary:
+            return EphemeralMemory._get_rolling_summary(thread_id)
+
         thread = EphemeralMemory.memory_repository.get_thread(thread_id)
         if not thread:
             return ""
@@ -98,6 +110,96 @@ class EphemeralMemory:
         summary = "\n".join(lines)
         return f"Summary of thread {thread_id}:\n{summary}"
 
+    @staticmethod
+    def _get_rolling_summary(thread_id: str) -> str:
+        """
+        Bring the cached summary of a thread up to date with only the messages
+        appended since the previous call, and return it.
+        """
+        summaries = EphemeralMemory._summaries
+        with EphemeralMemory._summaries_lock:
+            summary = summaries.get(thread_id)
+            if summary is None:
+                summary = summaries[thread_id] = RollingSummary(
+                    token_budget=EphemeralMemory.summary_token_budget,
+                    summarizer=EphemeralMemory.summary_agent
+                )
+                while len(summaries) > EphemeralMemory.summary_max_threads:
+                    summaries.popitem(last=False)
+            else:
+                summaries.move_to_end(thread_id)
+
+        with summary.lock:
+            summary.update(EphemeralMemory.memory_repository.iter_messages(
+                thread_id, start=summary.message_count
+            ))
+            if summary.message_count == 0:
+                return ""
+            return f"Summary of thread {thread_id}:\n{summary.text()}"
+
+    @staticmethod
+    def configure_summary(
+        incremental: bool = True,
+        token_budget: int = 2000,
+        summary_agent: Optional[Any] = None,
+        max_threads: int = 1024
+    ) -> None:
+        """
+        Configure how get_thread_summary builds summaries.
+
+        In incremental mode the summary of each thread is cached and only
+        updated with messages appended since the previous call, and it is kept
+        within token_budget (estimated tokens) by dropping its oldest lines.
+        If summary_agent is given, dropped lines are instead compacted into a
+        short running synopsis by calling summary_agent.handle_message().
+        Summaries are cached for at most max_threads threads, least recently
+        used first out; an evicted summary is rebuilt on its next use.
+
+        :param incremental: Enable the incremental summary mode.
+        :param token_budget: Maximum estimated tokens per summary.
+        :param summary_agent: Optional agent used to compact older lines.
+        :param max_threads: Maximum number of threads with a cached summary.
+        """
+        if max_threads < 1:
+            raise ValueError("max_threads must be at least 1.")
+        with EphemeralMemory._summaries_lock:
+            EphemeralMemory.incremental_summary = incremental
+            EphemeralMemory.summary_token_budget = token_budget
+            EphemeralMemory.summary_agent = summary_agent
+            EphemeralMemory.summary_max_threads = max_threads
+            EphemeralMemory._summaries.clear()
+
+    @staticmethod
+    def reset_summary(thread_id: str) -> None:
+        """
+        Drop the cached incremental summary of a thread, e.g. after the thread
+        was deleted or rewritten in the repository.
+        """
+        with EphemeralMemory._summaries_lock:
+            EphemeralMemory._summaries.pop(thread_id, None)
+
+    @staticmethod
+    async def store_message_async(
+        thread_id: str,
+        sender: str,
+        content: str,
+        metadata: Optional[dict] = None
+    ) -> str:
+        """
+        Awaitable variant of store_message for asyncio applications. The
+        repository call runs in a worker thread so it never blocks the event loop.
+        """
+        return await asyncio.to_thread(
+            EphemeralMemory.store_message, thread_id, sender, content, metadata
+        )
+
+    @staticmethod
+    async def get_last_n_messages_async(thread_id: str, n: int = 5) -> str:
+        """
+        Awaitable variant of get_last_n_messages for asyncio applications.
+        """
+        return await asyncio.to_thread(EphemeralMemory.get_last_n_messages, thread_id, n)
+
     @staticmethod
     def configure_memory_tools(tool_registry: ToolRegistry) -> None:
         """
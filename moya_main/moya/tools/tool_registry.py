@@ -5,7 +5,7 @@ A centralized place where tools (e.g., MemoryTool) can be registered
 and discovered by agents.
 """
 import json
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Optional, List, Tuple
 from moya.tools.base_tool import BaseTool
 from moya.utils.constants import LLMProviders
 
@@ -19,12 +19,26 @@ class ToolRegistry:
 
     def __init__(self):
         self._tools: Dict[str, BaseTool] = {}
+        # Bumped on every registration; cached definitions from an older
+        # generation are rebuilt on next use
+        self._generation = 0
+        # llm_provider -> (generation, definitions)
+        self._definitions: Dict[str, Tuple[int, List[Dict[str, Any]]]] = {}
+
+    @property
+    def generation(self) -> int:
+        """
+        Counter that changes whenever the set of registered tools changes.
+        """
+        return self._generation
 
     def register_tool(self, tool: BaseTool) -> None:
         """
         Register a tool. If a tool with the same name exists, it gets overwritten.
+        Re-register a tool after changing its fields so agents pick up the new definition.
         """
         self._tools[tool.name] = tool
+        self._generation += 1
 
     def get_tool(self, tool_name: str) -> Optional[BaseTool]:
         """
@@ -40,6 +54,32 @@ class ToolRegistry:
         :return: Tool definition as a dictionary
         """
         return self._tools.values() or []
+
+    def get_tool_definitions(self, llm_provider: str) -> List[Dict[str, Any]]:
+        """
+        Returns the definitions of all registered tools in the format of the
+        given LLM provider. The list is built once per registry generation and
+        shared between callers, so treat it as read-only.
+
+        :param llm_provider: LLM provider name (e.g., 'openai', 'bedrock', 'ollama')
+        :return: List of tool definitions
+        """
+        generation = self._generation
+        cached = self._definitions.get(llm_provider)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+
+        if llm_provider == LLMProviders.OPENAI:
+            definitions = [tool.get_openai_definition() for tool in list(self._tools.values())]
+        elif llm_provider == LLMProviders.BEDROCK:
+            definitions = [tool.get_bedrock_definition() for tool in list(self._tools.values())]
+        elif llm_provider == LLMProviders.OLLAMA:
+            definitions = [tool.get_ollama_definition() for tool in list(self._tools.values())]
+        else:
+            raise ValueError(f"Unsupported LLM provider: {llm_provider}")
+
+        self._definitions[llm_provider] = (generation, definitions)
+        return definitions
     
     
     def handle_tool_call(self, llm_response: Any, llm_provider: str) -> Dict[str, Any]:
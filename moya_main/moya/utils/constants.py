@@ -5,5 +5,6 @@ Constants for Moya.
 class LLMProviders:
     """Constants for LLM providers."""
     OPENAI = "openai"
+    AZURE_OPENAI = "azure_openai"
     BEDROCK = "bedrock"
     OLLAMA = "ollama"
@@ -0,0 +1,394 @@
+"""
+Multiplexed transport for RemoteAgent.
+
+Carries many concurrent requests to one agent server over a single
+persistent WebSocket, instead of one HTTP connection per call. Frames are
+JSON objects tagged with the id of the request they belong to:
+
+    client -> server
+        {"type": "request", "id": 1, "stream": true, "window": 16, "body": {...}}
+        {"type": "credit", "id": 1, "n": 8}
+        {"type": "cancel", "id": 1}
+    server -> client
+        {"type": "chunk", "id": 1, "data": "..."}
+        {"type": "done", "id": 1}
+        {"type": "response", "id": 1, "data": "..."}
+        {"type": "error", "id": 1, "data": "...", "status": 503}
+
+Frames are sent as JSON text, or as msgpack binary frames with
+``wire_format="msgpack"``; the server replies in the format it receives.
+
+Flow control is credit based, per stream: the server sends at most
+``window`` chunks the client has not consumed yet, and the client grants
+more credit as it consumes them. A transport also caps the requests open at
+once at ``max_streams``; further calls wait for one to finish.
+
+The connection is owned by a background event loop thread, so one transport
+serves synchronous callers on many threads and async callers on any loop.
+"""
+
+import asyncio
+import itertools
+import json
+import queue
+import ssl
+import threading
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Callable, Coroutine, Dict, Iterator, Optional, Tuple
+from websockets.asyncio.client import ClientConnection, connect
+from websockets.exceptions import ConnectionClosed
+from moya.utils.wire_format import MSGPACK, WIRE_FORMATS, decode, encode
+
+
+DEFAULT_MAX_STREAMS = 256
+DEFAULT_WINDOW = 16
+
+# Frames that end a request
+_FINAL_FRAMES = frozenset(("done", "response", "error"))
+
+_transports: Dict[Tuple[str, Optional[str], bool, int, int, str], "MultiplexedTransport"] = {}
+_lock = threading.Lock()
+
+
+def get_multiplexed_transport(
+    url: str,
+    auth_token: Optional[str] = None,
+    verify_ssl: bool = True,
+    max_streams: int = DEFAULT_MAX_STREAMS,
+    window: int = DEFAULT_WINDOW,
+    wire_format: str = "json"
+) -> "MultiplexedTransport":
+    """
+    Return the process-wide transport for the given WebSocket endpoint,
+    creating it on first use, so every RemoteAgent pointing at the same
+    server shares one connection.
+
+    :param url: The ws:// or wss:// URL of the server's multiplexed endpoint.
+    :param auth_token: Bearer token sent when connecting, if any.
+    :param verify_ssl: Verify the server certificate for wss:// URLs.
+    :param max_streams: Maximum requests open on the connection at once.
+    :param window: Chunks the server may send ahead of the consumer per stream.
+    :param wire_format: "json" or "msgpack".
+    :return: A shared MultiplexedTransport.
+    """
+    key = (url, auth_token, verify_ssl, max_streams, window, wire_format)
+    transport = _transports.get(key)
+    if transport is None:
+        with _lock:
+            transport = _transports.get(key)
+            if transport is None:
+                headers = {"Authorization": f"Bearer {auth_token}"} if auth_token else None
+                transport = _transports[key] = MultiplexedTransport(
+                    url,
+                    headers=headers,
+                    verify_ssl=verify_ssl,
+                    max_streams=max_streams,
+                    window=window,
+                    wire_format=wire_format
+                )
+    return transport
+
+
+class MultiplexedRequestError(RuntimeError):
+    """
+    A request refused or failed by the server, with the HTTP-style status
+    from its error frame (e.g. 503 when the server is busy).
+    """
+
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+
+class StreamCredit:
+    """
+    The number of chunks a sender may still send on one stream. The sender
+    takes one credit per chunk and waits when none are left; the receiver
+    grants more as it consumes chunks.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.available = window
+        self._granted = asyncio.Event()
+
+    def grant(self, n: int) -> None:
+        self.available += n
+        self._granted.set()
+
+    async def take(self) -> None:
+        while self.available <= 0:
+            self._granted.clear()
+            await self._granted.wait()
+        self.available -= 1
+
+
+class MultiplexedTransport:
+    """
+    One WebSocket connection to an agent server carrying many interleaved
+    requests. The connection is opened on first use and reopened after it
+    drops; requests open when it drops fail with a ConnectionError.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        verify_ssl: bool = True,
+        max_streams: int = DEFAULT_MAX_STREAMS,
+        window: int = DEFAULT_WINDOW,
+        open_timeout: float = 10.0,
+        wire_format: str = "json"
+    ):
+        """
+        Initialize the transport. No connection is made until the first request.
+
+        :param url: The ws:// or wss:// URL of the server's multiplexed endpoint.
+        :param headers: Extra headers sent when connecting, e.g. Authorization.
+        :param verify_ssl: Verify the server certificate for wss:// URLs.
+        :param max_streams: Maximum requests open on the connection at once.
+        :param window: Chunks the server may send ahead of the consumer per stream.
+        :param open_timeout: Seconds allowed for opening the connection.
+        :param wire_format: "json" for text frames or "msgpack" for binary frames.
+        """
+        if max_streams < 1:
+            raise ValueError("max_streams must be at least 1.")
+        if window < 1:
+            raise ValueError("window must be at least 1.")
+        if wire_format not in WIRE_FORMATS:
+            raise ValueError(f"Unknown wire format: {wire_format}")
+        self.url = url
+        self.headers = dict(headers or {})
+        self.verify_ssl = verify_ssl
+        self.max_streams = max_streams
+        self.window = window
+        self.open_timeout = open_timeout
+        self.wire_format = wire_format
+        self._binary = WIRE_FORMATS[wire_format] == MSGPACK
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._start_lock = threading.Lock()
+        self._connection: Optional[ClientConnection] = None
+        self._connecting = asyncio.Lock()
+        self._slots = asyncio.Semaphore(max_streams)
+        # Open requests: id -> (connection, callback receiving their frames)
+        self._streams: Dict[int, Tuple[ClientConnection, Callable[[Dict[str, Any]], None]]] = {}
+        self._ids = itertools.count(1)
+        # Credit is granted back once half the window has been consumed
+        self._grant_batch = max(1, window // 2)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The event loop owning the connection, started on first use."""
+        if self._loop is None:
+            with self._start_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name="moya-multiplex", daemon=True).start()
+                    self._loop = loop
+        return self._loop
+
+    @property
+    def open_streams(self) -> int:
+        """The number of requests currently open on the connection."""
+        return len(self._streams)
+
+    def _submit(self, coro: Coroutine) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def _connect(self) -> ClientConnection:
+        connection = self._connection
+        if connection is not None:
+            return connection
+        async with self._connecting:
+            if self._connection is None:
+                ssl_context = None
+                if self.url.startswith("wss:"):
+                    ssl_context = ssl.create_default_context()
+                    if not self.verify_ssl:
+                        ssl_context.check_hostname = False
+                        ssl_context.verify_mode = ssl.CERT_NONE
+                connection = await connect(
+                    self.url,
+                    additional_headers=self.headers,
+                    ssl=ssl_context,
+                    open_timeout=self.open_timeout,
+                    max_size=None
+                )
+                self._connection = connection
+                asyncio.create_task(self._read(connection))
+            return self._connection
+
+    async def _read(self, connection: ClientConnection) -> None:
+        """Route incoming frames to their requests until the connection closes."""
+        reason = "connection closed"
+        try:
+            async for raw in connection:
+                frame = decode(raw, MSGPACK) if isinstance(raw, bytes) else json.loads(raw)
+                entry = self._streams.get(frame.get("id"))
+                if entry is None:
+                    # A late frame for a cancelled request
+                    continue
+                if frame.get("type") in _FINAL_FRAMES:
+                    self._finish(frame["id"])
+                entry[1](frame)
+        except ConnectionClosed as e:
+            reason = str(e)
+        except Exception as e:
+            reason = f"bad frame: {e}"
+            await connection.close()
+        finally:
+            if self._connection is connection:
+                self._connection = None
+            for stream_id, (stream_connection, deliver) in list(self._streams.items()):
+                if stream_connection is connection:
+                    self._finish(stream_id)
+                    deliver({"type": "error", "id": stream_id, "data": f"Connection lost: {reason}"})
+
+    def _finish(self, stream_id: int) -> None:
+        if self._streams.pop(stream_id, None) is not None:
+            self._slots.release()
+
+    async def _open(
+        self,
+        stream_id: int,
+        body: Dict[str, Any],
+        stream: bool,
+        deliver: Callable[[Dict[str, Any]], None]
+    ) -> None:
+        await self._slots.acquire()
+        try:
+            connection = await self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+        self._streams[stream_id] = (connection, deliver)
+        try:
+            await connection.send(self._dumps({
+                "type": "request",
+                "id": stream_id,
+                "stream": stream,
+                "window": self.window,
+                "body": body
+            }))
+        except BaseException:
+            self._finish(stream_id)
+            raise
+
+    def _dumps(self, frame: Dict[str, Any]):
+        return encode(frame, MSGPACK) if self._binary else json.dumps(frame)
+
+    async def _send(self, frame: Dict[str, Any]) -> None:
+        entry = self._streams.get(frame["id"])
+        if entry is not None:
+            try:
+                await entry[0].send(self._dumps(frame))
+            except ConnectionClosed:
+                # The reader fails the request
+                pass
+
+    async def _cancel(self, stream_id: int) -> None:
+        await self._send({"type": "cancel", "id": stream_id})
+        self._finish(stream_id)
+
+    @staticmethod
+    def _check(frame: Dict[str, Any]) -> Dict[str, Any]:
+        if frame["type"] == "error":
+            if frame.get("status") is None:
+                raise ConnectionError(frame.get("data"))
+            raise MultiplexedRequestError(frame.get("data"), frame["status"])
+        return frame
+
+    def _frames(self, body: Dict[str, Any], stream: bool) -> Iterator[Dict[str, Any]]:
+        """
+        Open a request and yield its frames, up to and including the final one.
+        Closing the iterator early cancels the request.
+        """
+        stream_id = next(self._ids)
+        frames = queue.SimpleQueue()
+        self._submit(self._open(stream_id, body, stream, frames.put)).result()
+        finished = False
+        consumed = 0
+        try:
+            while True:
+                frame = self._check(frames.get())
+                if frame["type"] != "chunk":
+                    finished = True
+                    yield frame
+                    return
+                consumed += 1
+                if consumed >= self._grant_batch:
+                    self._submit(self._send({"type": "credit", "id": stream_id, "n": consumed}))
+                    consumed = 0
+                yield frame
+        finally:
+            if not finished:
+                self._submit(self._cancel(stream_id))
+
+    async def _frames_async(self, body: Dict[str, Any], stream: bool) -> AsyncIterator[Dict[str, Any]]:
+        """Async variant of _frames() for callers on any event loop."""
+        loop = asyncio.get_running_loop()
+        frames: asyncio.Queue = asyncio.Queue()
+
+        def deliver(frame: Dict[str, Any]) -> None:
+            loop.call_soon_threadsafe(frames.put_nowait, frame)
+
+        stream_id = next(self._ids)
+        await asyncio.wrap_future(self._submit(self._open(stream_id, body, stream, deliver)))
+        finished = False
+        consumed = 0
+        try:
+            while True:
+                frame = self._check(await frames.get())
+                if frame["type"] != "chunk":
+                    finished = True
+                    yield frame
+                    return
+                consumed += 1
+                if consumed >= self._grant_batch:
+                    self._submit(self._send({"type": "credit", "id": stream_id, "n": consumed}))
+                    consumed = 0
+                yield frame
+        finally:
+            if not finished:
+                self._submit(self._cancel(stream_id))
+
+    def request(self, body: Dict[str, Any]) -> str:
+        """
+        Send a request and return the whole response.
+
+        :param body: The request body, as sent to the server's /chat endpoint.
+        :return: The response text.
+        """
+        for frame in self._frames(body, stream=False):
+            return frame.get("data", "")
+
+    def stream(self, body: Dict[str, Any]) -> Iterator[str]:
+        """
+        Send a request and yield the response as it is streamed.
+
+        :param body: The request body, as sent to the server's /chat/stream endpoint.
+        :yield: Chunks of the response.
+        """
+        for frame in self._frames(body, stream=True):
+            if frame["type"] == "chunk":
+                yield frame["data"]
+
+    async def request_async(self, body: Dict[str, Any]) -> str:
+        """Awaitable variant of request()."""
+        async for frame in self._frames_async(body, stream=False):
+            return frame.get("data", "")
+
+    async def stream_async(self, body: Dict[str, Any]) -> AsyncIterator[str]:
+        """Async-generator variant of stream()."""
+        async for frame in self._frames_async(body, stream=True):
+            if frame["type"] == "chunk":
+                yield frame["data"]
+
+    def close(self) -> None:
+        """Close the connection and stop the background event loop."""
+        if self._loop is None:
+            return
+        if self._connection is not None:
+            self._submit(self._connection.close()).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
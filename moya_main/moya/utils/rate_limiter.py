@@ -0,0 +1,468 @@
+"""
+Client-side rate limiting for Moya's LLM agents.
+
+A RateLimiter combines three controls for one provider endpoint:
+
+- token buckets for requests-per-minute and tokens-per-minute budgets,
+- an optional adaptive concurrency limit (AIMD: additive increase on
+  success, multiplicative decrease when the provider throttles us),
+- retries of throttled calls after the provider's retry-after delay, with
+  jitter so that waiting callers do not retry in lockstep.
+
+Limiters are shared process-wide through get_rate_limiter(), keyed by
+(provider, model, deployment), so every agent talking to the same
+deployment draws from the same budget. Budgets and the concurrency limit
+are opt-in; without them a limiter only retries throttled calls.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+
+T = TypeVar("T")
+
+# llm_config keys read by rate_limiter_settings()
+RATE_LIMIT_CONFIG_KEYS = ("requests_per_minute", "tokens_per_minute", "max_concurrency", "max_retries")
+
+DEFAULT_MAX_RETRIES = 5
+# Backoff used when a throttled response carries no retry-after header
+DEFAULT_INITIAL_BACKOFF = 1.0
+DEFAULT_MAX_BACKOFF = 60.0
+# Extra random delay per caller, as a fraction of the retry-after delay
+DEFAULT_JITTER = 0.5
+
+# botocore error codes that mean "slow down"
+_THROTTLING_CODES = frozenset((
+    "ThrottlingException", "TooManyRequestsException", "Throttling", "RequestLimitExceeded",
+))
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_throttle_error(error: BaseException) -> bool:
+    """
+    Return True if an exception raised by a provider client means the request
+    was rate limited: an HTTP 429 from openai, httpx or requests, or a
+    botocore throttling error.
+    """
+    if _status_code(error) == 429:
+        return True
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        return response.get("Error", {}).get("Code") in _THROTTLING_CODES
+    return False
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """
+    Return the delay in seconds requested by a throttled response's
+    retry-after-ms or retry-after header, or None if it has none.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is None and isinstance(response, dict):
+        headers = response.get("ResponseMetadata", {}).get("HTTPHeaders")
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after") is not None:
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        # retry-after may also be an HTTP date; fall back to backoff
+        pass
+    return None
+
+
+class TokenBucket:
+    """
+    A bucket holding up to per_minute units that refills continuously at
+    per_minute / 60 units per second. Not thread-safe on its own.
+    """
+
+    def __init__(self, per_minute: float):
+        if per_minute <= 0:
+            raise ValueError("Rate limit budgets must be positive.")
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount units are available (0.0 if they are now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float, now: float) -> None:
+        """
+        Remove amount units (a negative amount returns them). The level may
+        go negative to record debt, which later calls wait out.
+        """
+        self._refill(now)
+        self.level = min(self.capacity, self.level - amount)
+
+
+class RateLimiter:
+    """
+    Rate limiter for one provider endpoint. Use run() / run_async() to call
+    the provider through it, or acquire() / release() directly.
+
+    The concurrency limit counts calls that are waiting for a response; for
+    streaming calls that is until the stream has been opened.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        min_concurrency: int = 1,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        initial_backoff: float = DEFAULT_INITIAL_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        jitter: float = DEFAULT_JITTER
+    ):
+        """
+        :param requests_per_minute: Request budget, or None for no limit.
+        :param tokens_per_minute: Token budget, or None for no limit.
+        :param max_concurrency: Upper bound (and starting value) of the adaptive concurrency
+                                limit, or None for no concurrency limit.
+        :param min_concurrency: Lower bound of the adaptive concurrency limit.
+        :param max_retries: Retries of a throttled call before its error is raised.
+        :param initial_backoff: First retry delay when the provider sends no retry-after.
+        :param max_backoff: Cap on the retry delay.
+        :param jitter: Extra random delay per caller, as a fraction of the retry delay.
+        """
+        if max_concurrency is not None and not 1 <= min_concurrency <= max_concurrency:
+            raise ValueError("Concurrency limits must satisfy 1 <= min_concurrency <= max_concurrency.")
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency_limit = None if max_concurrency is None else float(max_concurrency)
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+
+        self._condition = threading.Condition()
+        # Coroutines waiting for a concurrency slot, as (loop, future) in
+        # arrival order; release() resolves their futures to wake them
+        self._async_waiters = deque()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        # Metrics
+        self._queue_depth = 0
+        self._max_queue_depth = 0
+        self._acquired = 0
+        self._throttled = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _try_acquire(self, tokens: float, now: float) -> Optional[float]:
+        """
+        Take a slot and the budgets for one call if all are available and
+        return 0.0; otherwise return the seconds to wait, or None if the call
+        must wait for another call to finish. Called with the lock held.
+        """
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self.concurrency_limit is not None and self._in_flight >= int(self.concurrency_limit):
+            return None
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1, now))
+        if self.tokens is not None and tokens:
+            wait = max(wait, self.tokens.wait_time(tokens, now))
+        if wait > 0:
+            return wait
+
+        if self.requests is not None:
+            self.requests.take(1, now)
+        if self.tokens is not None and tokens:
+            self.tokens.take(tokens, now)
+        self._in_flight += 1
+        return 0.0
+
+    def _enqueue(self) -> None:
+        self._queue_depth += 1
+        self._max_queue_depth = max(self._max_queue_depth, self._queue_depth)
+
+    def _dequeue(self, waited: float) -> None:
+        self._queue_depth -= 1
+        self._acquired += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+
+    def acquire(self, tokens: float = 0) -> float:
+        """
+        Block until a call estimated to use `tokens` tokens may start.
+
+        :param tokens: Estimated tokens of the call, charged to the token budget.
+        :return: Seconds spent waiting.
+        """
+        start = time.monotonic()
+        with self._condition:
+            self._enqueue()
+            try:
+                while True:
+                    wait = self._try_acquire(tokens, time.monotonic())
+                    if wait == 0.0:
+                        break
+                    self._condition.wait(wait)
+            finally:
+                waited = time.monotonic() - start
+                self._dequeue(waited)
+        return waited
+
+    async def acquire_async(self, tokens: float = 0) -> float:
+        """
+        Coroutine variant of acquire(); waits without blocking the event loop.
+        """
+        start = time.monotonic()
+        loop = asyncio.get_running_loop()
+        with self._condition:
+            self._enqueue()
+        woken = False
+        try:
+            while True:
+                slot = None
+                with self._condition:
+                    wait = self._try_acquire(tokens, time.monotonic())
+                    if wait is None:
+                        # Registered under the lock, so no release() is missed.
+                        # A waiter that was woken but beaten to the slot keeps
+                        # its place at the front.
+                        slot = loop.create_future()
+                        if woken:
+                            self._async_waiters.appendleft((loop, slot))
+                        else:
+                            self._async_waiters.append((loop, slot))
+                if wait == 0.0:
+                    break
+                if slot is None:
+                    await asyncio.sleep(wait)
+                    continue
+                try:
+                    await slot
+                    woken = True
+                except asyncio.CancelledError:
+                    if slot.done() and not slot.cancelled():
+                        # Woken but cancelled before taking the slot: pass it on
+                        with self._condition:
+                            self._wake_async_waiters(1)
+                    raise
+        finally:
+            waited = time.monotonic() - start
+            with self._condition:
+                self._dequeue(waited)
+        return waited
+
+    def _wake_async_waiters(self, count: int) -> None:
+        """
+        Wake up to `count` coroutines waiting for a concurrency slot, oldest
+        first. Called with the lock held, from any thread.
+        """
+        while count > 0 and self._async_waiters:
+            loop, slot = self._async_waiters.popleft()
+            if slot.done():
+                # Its waiter was cancelled
+                continue
+            try:
+                loop.call_soon_threadsafe(self._deliver_wake_up, slot)
+            except RuntimeError:
+                # The waiter's event loop is closed
+                continue
+            count -= 1
+
+    def _deliver_wake_up(self, slot: asyncio.Future) -> None:
+        # Runs on the waiter's loop; a waiter cancelled in the meantime hands
+        # its wake-up to the next one
+        if slot.done():
+            with self._condition:
+                self._wake_async_waiters(1)
+        else:
+            slot.set_result(None)
+
+    def release(self, throttled: bool = False) -> None:
+        """
+        Return a call's concurrency slot and adapt the concurrency limit, if
+        there is one: +1/limit after a success (about +1 per limit calls),
+        halved after a throttle.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if throttled:
+                self._throttled += 1
+            if self.concurrency_limit is None:
+                return
+            if throttled:
+                self.concurrency_limit = max(float(self.min_concurrency), self.concurrency_limit / 2)
+            else:
+                self.concurrency_limit = min(
+                    float(self.max_concurrency), self.concurrency_limit + 1.0 / self.concurrency_limit
+                )
+            self._condition.notify_all()
+            self._wake_async_waiters(max(1, int(self.concurrency_limit) - self._in_flight))
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold back every new call for the given number of seconds, e.g. for a
+        provider's retry-after delay.
+        """
+        with self._condition:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._condition.notify_all()
+
+    def record_tokens(self, tokens: float) -> None:
+        """
+        Charge additional tokens to the token budget, e.g. the difference
+        between a call's estimate and the usage the provider reported.
+        """
+        if self.tokens is None or not tokens:
+            return
+        with self._condition:
+            self.tokens.take(tokens, time.monotonic())
+
+    def _retry_delay(self, error: BaseException, attempt: int) -> float:
+        delay = retry_after(error)
+        if delay is None:
+            delay = self.initial_backoff * (2 ** attempt)
+        return min(delay, self.max_backoff)
+
+    def _on_throttle(self, error: BaseException, attempt: int) -> float:
+        """Release a throttled call; return how long this caller should sleep."""
+        delay = self._retry_delay(error, attempt)
+        self.release(throttled=True)
+        # The provider's delay applies to everyone sharing this limiter; the
+        # jitter is per caller so waiting calls spread out afterwards.
+        self.pause(delay)
+        return delay + random.uniform(0, self.jitter * delay)
+
+    def run(self, function: Callable[..., T], *args, tokens: float = 0, **kwargs) -> T:
+        """
+        Call function(*args, **kwargs) within the limits, retrying it when
+        the provider throttles it.
+
+        :param function: The provider call.
+        :param tokens: Estimated tokens of the call.
+        :return: The function's result.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.acquire(tokens)
+            try:
+                result = function(*args, **kwargs)
+            except Exception as e:
+                if not is_throttle_error(e):
+                    self.release()
+                    raise
+                sleep = self._on_throttle(e, attempt)
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(sleep)
+            except BaseException:
+                self.release()
+                raise
+            else:
+                self.release()
+                return result
+
+    async def run_async(self, function: Callable[..., Awaitable[T]], *args, tokens: float = 0, **kwargs) -> T:
+        """
+        Coroutine variant of run() for async provider calls.
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.acquire_async(tokens)
+            try:
+                result = await function(*args, **kwargs)
+            except Exception as e:
+                if not is_throttle_error(e):
+                    self.release()
+                    raise
+                sleep = self._on_throttle(e, attempt)
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(sleep)
+            except BaseException:
+                # Cancelled while waiting for the provider
+                self.release()
+                raise
+            else:
+                self.release()
+                return result
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return a snapshot of the limiter's state: queue depth (current and
+        maximum), wait times in seconds, calls in flight, the current
+        concurrency limit (None if there is none) and the number of
+        throttled calls.
+        """
+        with self._condition:
+            return {
+                "queue_depth": self._queue_depth,
+                "max_queue_depth": self._max_queue_depth,
+                "in_flight": self._in_flight,
+                "concurrency_limit": None if self.concurrency_limit is None else int(self.concurrency_limit),
+                "acquired": self._acquired,
+                "throttled": self._throttled,
+                "total_wait_time": self._total_wait,
+                "max_wait_time": self._max_wait,
+                "average_wait_time": self._total_wait / self._acquired if self._acquired else 0.0,
+            }
+
+
+_limiters: Dict[Tuple[str, Optional[str], Optional[str]], RateLimiter] = {}
+_lock = threading.Lock()
+
+
+def get_rate_limiter(
+    provider: str,
+    model: Optional[str] = None,
+    deployment: Optional[str] = None,
+    **settings
+) -> RateLimiter:
+    """
+    Return the process-wide RateLimiter for (provider, model, deployment),
+    creating it with the given settings on first use. Later calls with the
+    same key share that limiter and its settings.
+
+    :param provider: LLM provider name (e.g., 'openai', 'bedrock', 'ollama').
+    :param model: Model name or id.
+    :param deployment: Endpoint, region or deployment the model is served from.
+    :param settings: RateLimiter keyword arguments.
+    """
+    key = (provider, model, deployment)
+    limiter = _limiters.get(key)
+    if limiter is None:
+        with _lock:
+            limiter = _limiters.get(key)
+            if limiter is None:
+                limiter = _limiters[key] = RateLimiter(**settings)
+    return limiter
+
+
+def rate_limiter_settings(llm_config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Extract the rate limiting settings (requests_per_minute, tokens_per_minute,
+    max_concurrency, max_retries) present in an agent's llm_config.
+    """
+    llm_config = llm_config or {}
+    return {key: llm_config[key] for key in RATE_LIMIT_CONFIG_KEYS if llm_config.get(key) is not None}
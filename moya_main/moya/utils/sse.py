@@ -0,0 +1,165 @@
+"""
+Server-sent events (SSE) encoding and decoding for Moya.
+
+SSEDecoder is an incremental parser for the text/event-stream format: feed it
+text as it arrives, in chunks of any size, and it returns each event once the
+blank line ending it has been received. It follows the WHATWG parsing rules:
+multi-line ``data:`` fields are joined with newlines, ``event:``, ``id:`` and
+``retry:`` fields are tracked, comments are skipped, and lines may end in
+LF, CR or CRLF. encode_sse() produces events in the same format.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+
+_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+
+@dataclass
+class SSEEvent:
+    """
+    One dispatched event.
+
+    Attributes:
+        data (str): The event data; multi-line data is joined with "\\n".
+        event (str): The event type ("message" unless the server set one).
+        id (str): The last event ID seen on the stream, if any.
+    """
+    data: str
+    event: str = "message"
+    id: Optional[str] = None
+
+
+class SSEDecoder:
+    """
+    Incremental decoder for a single event stream.
+
+    Attributes:
+        last_event_id (str): The most recent event ID sent by the server.
+        retry (int): The reconnection time in milliseconds sent by the server, if any.
+    """
+
+    def __init__(self):
+        self.last_event_id: Optional[str] = None
+        self.retry: Optional[int] = None
+        self._buffer = ""
+        self._data: List[str] = []
+        self._event = ""
+        self._started = False
+        # A chunk ended in CR, so a LF starting the next chunk belongs to it
+        self._pending_cr = False
+
+    def feed(self, text: str) -> List[SSEEvent]:
+        """
+        Parse the next piece of the stream.
+
+        :param text: Stream text of any length, as it arrives.
+        :return: The events completed by this text, in order.
+        """
+        if not text:
+            return []
+        if not self._started:
+            self._started = True
+            if text.startswith("\ufeff"):
+                text = text[1:]
+        if self._pending_cr:
+            self._pending_cr = False
+            if text.startswith("\n"):
+                text = text[1:]
+
+        buffer = self._buffer + text
+        if "\r" in buffer:
+            lines = _LINE_BREAK.split(buffer)
+            # A trailing CR ends its line, but may be half of a CRLF
+            self._pending_cr = buffer.endswith("\r")
+        else:
+            lines = buffer.split("\n")
+        # The last element is an incomplete line (or "" after a line break)
+        self._buffer = lines.pop()
+
+        events = []
+        data = self._data
+        for line in lines:
+            if line.startswith("data:"):
+                # Fast path for the common case
+                data.append(line[6:] if line[5:6] == " " else line[5:])
+            elif line:
+                self._process_line(line)
+            elif data:
+                events.append(SSEEvent(
+                    data[0] if len(data) == 1 else "\n".join(data),
+                    self._event or "message",
+                    self.last_event_id
+                ))
+                data.clear()
+                self._event = ""
+            else:
+                # A blank line with no data resets the event type
+                self._event = ""
+        return events
+
+    def flush(self) -> List[SSEEvent]:
+        """
+        Signal the end of the stream. Per the SSE rules an event that was
+        not terminated by a blank line is discarded, so this returns no
+        events; it exists so callers can reset the decoder explicitly.
+        """
+        self._buffer = ""
+        self._data.clear()
+        self._event = ""
+        self._pending_cr = False
+        return []
+
+    def _process_line(self, line: str) -> None:
+        if line[0] == ":":
+            # Comment, e.g. a keep-alive ping
+            return
+        field, colon, value = line.partition(":")
+        if colon and value[:1] == " ":
+            value = value[1:]
+
+        if field == "data":
+            self._data.append(value)
+        elif field == "event":
+            self._event = value
+        elif field == "id":
+            if "\0" not in value:
+                self.last_event_id = value
+        elif field == "retry":
+            if value.isdigit():
+                self.retry = int(value)
+        # Other field names are ignored
+
+
+def encode_sse(
+    data: str,
+    event: Optional[str] = None,
+    id: Optional[str] = None,
+    retry: Optional[int] = None
+) -> str:
+    """
+    Serialize one event in the text/event-stream format. Data containing
+    line breaks is sent as several ``data:`` lines, which SSEDecoder joins
+    back together.
+
+    :param data: The event data.
+    :param event: The event type, or None for the default "message".
+    :param id: The event ID, or None to send none.
+    :param retry: The reconnection time in milliseconds, or None to send none.
+    :return: The encoded event, ending with the blank line that dispatches it.
+    """
+    parts = []
+    if event:
+        parts.append(f"event: {event}\n")
+    if id is not None:
+        parts.append(f"id: {id}\n")
+    if retry is not None:
+        parts.append(f"retry: {retry}\n")
+    if "\n" in data or "\r" in data:
+        parts.extend(f"data: {line}\n" for line in _LINE_BREAK.split(data))
+    else:
+        parts.append(f"data: {data}\n")
+    parts.append("\n")
+    return "".join(parts)
@@ -0,0 +1,19 @@
+"""
+Token counting helpers for Moya.
+"""
+
+# Average number of characters per token for English text with common
+# BPE tokenizers; close enough for budgeting prompt context.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a piece of text without a tokenizer.
+
+    :param text: The text to measure.
+    :return: The approximate token count (at least 1 for non-empty text).
+    """
+    if not text:
+        return 0
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
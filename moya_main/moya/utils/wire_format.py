@@ -0,0 +1,166 @@
+"""
+Wire formats for RemoteAgent requests and responses.
+
+JSON is the default. msgpack is a compact binary alternative that is cheaper
+to encode and decode. zstd compression can be applied on top of either, for
+large bodies such as long conversation contexts. The format of a body is
+named by its Content-Type and the format wanted back by Accept; compression
+uses the standard Content-Encoding and Accept-Encoding headers.
+"""
+
+import json
+import threading
+import msgpack
+import zstandard
+from typing import Any, Dict, Optional, Tuple
+
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ZSTD = "zstd"
+
+# RemoteAgentConfig.wire_format values
+WIRE_FORMATS = {"json": JSON, "msgpack": MSGPACK}
+# Bodies smaller than this are sent uncompressed
+DEFAULT_COMPRESS_THRESHOLD = 1024
+
+_MSGPACK_TYPES = frozenset((MSGPACK, "application/x-msgpack", "application/vnd.msgpack"))
+# Every zstd frame starts with this magic number
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# zstandard compressors are not safe to share between threads
+_local = threading.local()
+
+
+def media_type(content_type: Optional[str]) -> str:
+    """
+    Return the bare media type of a Content-Type header, e.g.
+    "application/json" for "application/json; charset=utf-8".
+    """
+    if not content_type:
+        return JSON
+    media = content_type.split(";", 1)[0].strip().lower()
+    return MSGPACK if media in _MSGPACK_TYPES else media
+
+
+def encode(obj: Any, content_type: str = JSON) -> bytes:
+    """
+    Serialize an object in the given format.
+
+    :param obj: The object to serialize.
+    :param content_type: JSON or MSGPACK.
+    :return: The serialized bytes.
+    """
+    if content_type == MSGPACK:
+        return msgpack.packb(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def decode(data: bytes, content_type: str = JSON) -> Any:
+    """
+    Deserialize bytes in the given format. Anything other than msgpack is
+    read as JSON.
+
+    :param data: The serialized bytes.
+    :param content_type: A media type, as returned by media_type().
+    :return: The deserialized object.
+    """
+    if content_type == MSGPACK:
+        return msgpack.unpackb(data)
+    return json.loads(data)
+
+
+def compress(data: bytes) -> bytes:
+    """Compress bytes as a single zstd frame."""
+    compressor = getattr(_local, "compressor", None)
+    if compressor is None:
+        compressor = _local.compressor = zstandard.ZstdCompressor(level=3)
+    return compressor.compress(data)
+
+
+def decompress(data: bytes) -> bytes:
+    """Decompress a zstd frame produced by compress()."""
+    decompressor = getattr(_local, "decompressor", None)
+    if decompressor is None:
+        decompressor = _local.decompressor = zstandard.ZstdDecompressor()
+    return decompressor.decompress(data)
+
+
+def encode_body(
+    obj: Any,
+    content_type: str = JSON,
+    compression: Optional[str] = None,
+    threshold: int = DEFAULT_COMPRESS_THRESHOLD
+) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Serialize a request or response body and return it with its headers.
+
+    :param obj: The body to serialize.
+    :param content_type: JSON or MSGPACK.
+    :param compression: ZSTD to compress bodies of at least ``threshold`` bytes, or None.
+    :param threshold: The smallest body worth compressing, in bytes.
+    :return: The body bytes and the Content-Type (and Content-Encoding) headers.
+    """
+    data = encode(obj, content_type)
+    headers = {"Content-Type": content_type}
+    if compression == ZSTD and len(data) >= threshold:
+        data = compress(data)
+        headers["Content-Encoding"] = ZSTD
+    elif compression not in (None, ZSTD):
+        raise ValueError(f"Unsupported compression: {compression}")
+    return data, headers
+
+
+def decode_body(data: bytes, content_type: Optional[str] = None, content_encoding: Optional[str] = None) -> Any:
+    """
+    Deserialize a request or response body given its headers.
+
+    :param data: The body bytes.
+    :param content_type: The Content-Type header, if any.
+    :param content_encoding: The Content-Encoding header, if any.
+    :return: The deserialized body.
+    """
+    encoding = (content_encoding or "").strip().lower()
+    if encoding == ZSTD:
+        # HTTP clients that understand zstd have already decompressed it
+        if data[:4] == _ZSTD_MAGIC:
+            data = decompress(data)
+    elif encoding not in ("", "identity"):
+        raise ValueError(f"Unsupported content encoding: {content_encoding}")
+    return decode(data, media_type(content_type))
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """
+    Choose the response format from an Accept header: msgpack when the
+    client prefers it, otherwise JSON.
+
+    :param accept: The Accept header, if any.
+    :return: JSON or MSGPACK.
+    """
+    best, best_quality = JSON, 0.0
+    for part in (accept or "").split(","):
+        media, _, params = part.partition(";")
+        media = media_type(media)
+        if media not in (JSON, MSGPACK):
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > best_quality:
+            best, best_quality = media, quality
+    return best
+
+
+def accepts_zstd(accept_encoding: Optional[str]) -> bool:
+    """Return True if an Accept-Encoding header allows zstd."""
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.partition(";")
+        if coding.strip().lower() == ZSTD:
+            return params.replace(" ", "") not in ("q=0", "q=0.0")
+    return False